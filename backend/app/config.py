@@ -19,6 +19,7 @@ class Settings(BaseSettings):
     
     # Logging
     log_level: str = "INFO"
+    cli_log_file: str = "desensitization.log"  # CLI log file, relative to the working directory
     
     # CORS
     cors_origins: str = "http://localhost:80"
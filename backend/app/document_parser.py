@@ -5,12 +5,9 @@ This module provides functionality to parse various document formats
 and extract text content for desensitization processing.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, BinaryIO, Union
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
-import fitz  # PyMuPDF
-from docx import Document
-from openpyxl import load_workbook
 import chardet
 
 from app.exceptions import DocumentParsingError
@@ -18,6 +15,12 @@ from app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# PyMuPDF, python-docx and openpyxl are imported by the parse method that
+# needs them, so importing this module (and the API) does not load all three
+
+# A document source is either a filesystem path or a binary file-like object
+DocumentSource = Union[str, BinaryIO]
+
 
 @dataclass
 class ParsedDocument:
@@ -45,21 +48,54 @@ class DocumentParser:
         Returns:
             ParsedDocument containing extracted content and metadata
             
+        Raises:
+            DocumentParsingError: If parsing fails
+        """
+        logger.info("starting_document_parsing", file_path=file_path, file_type=file_type.lower())
+        return self._parse(file_path, file_type)
+    
+    def parse_stream(self, stream: BinaryIO, file_type: str) -> ParsedDocument:
+        """
+        Parse an in-memory document and extract text content.
+        
+        Args:
+            stream: Binary file-like object positioned at the start of the document
+            file_type: Type of the document (pdf, docx, xlsx, txt)
+            
+        Returns:
+            ParsedDocument containing extracted content and metadata
+            
+        Raises:
+            DocumentParsingError: If parsing fails
+        """
+        logger.info("starting_document_parsing", source="stream", file_type=file_type.lower())
+        return self._parse(stream, file_type)
+    
+    def _parse(self, source: DocumentSource, file_type: str) -> ParsedDocument:
+        """
+        Dispatch a document source to the parser for its file type.
+        
+        Args:
+            source: Path to the document file or a binary stream
+            file_type: Type of the document (pdf, docx, xlsx, txt)
+            
+        Returns:
+            ParsedDocument containing extracted content and metadata
+            
         Raises:
             DocumentParsingError: If parsing fails
         """
         file_type = file_type.lower()
-        logger.info("starting_document_parsing", file_path=file_path, file_type=file_type)
         
         try:
             if file_type == 'pdf':
-                result = self.parse_pdf(file_path)
+                result = self.parse_pdf(source)
             elif file_type == 'docx':
-                result = self.parse_docx(file_path)
+                result = self.parse_docx(source)
             elif file_type == 'xlsx':
-                result = self.parse_xlsx(file_path)
+                result = self.parse_xlsx(source)
             elif file_type == 'txt':
-                result = self.parse_txt(file_path)
+                result = self.parse_txt(source)
             else:
                 raise DocumentParsingError(
                     f"Unsupported file type: {file_type}",
@@ -93,12 +129,12 @@ class DocumentParser:
                 details={"original_error": str(e)}
             )
     
-    def parse_pdf(self, file_path: str) -> ParsedDocument:
+    def parse_pdf(self, file_path: DocumentSource) -> ParsedDocument:
         """
         Parse PDF document using PyMuPDF.
         
         Args:
-            file_path: Path to the PDF file
+            file_path: Path to the PDF file or a binary stream
             
         Returns:
             ParsedDocument with extracted text content
@@ -106,8 +142,13 @@ class DocumentParser:
         Raises:
             DocumentParsingError: If PDF parsing fails
         """
+        import fitz  # PyMuPDF
+        
         try:
-            doc = fitz.open(file_path)
+            if isinstance(file_path, str):
+                doc = fitz.open(file_path)
+            else:
+                doc = fitz.open(stream=file_path.read(), filetype="pdf")
             
             # Check if document is empty
             if doc.page_count == 0:
@@ -162,12 +203,12 @@ class DocumentParser:
                 error_code="FILE_NOT_FOUND"
             )
     
-    def parse_docx(self, file_path: str) -> ParsedDocument:
+    def parse_docx(self, file_path: DocumentSource) -> ParsedDocument:
         """
         Parse DOCX document using python-docx.
         
         Args:
-            file_path: Path to the DOCX file
+            file_path: Path to the DOCX file or a binary stream
             
         Returns:
             ParsedDocument with extracted text content including paragraphs and tables
@@ -175,6 +216,8 @@ class DocumentParser:
         Raises:
             DocumentParsingError: If DOCX parsing fails
         """
+        from docx import Document
+        
         try:
             doc = Document(file_path)
             
@@ -242,12 +285,12 @@ class DocumentParser:
                 details={"original_error": str(e)}
             )
     
-    def parse_xlsx(self, file_path: str) -> ParsedDocument:
+    def parse_xlsx(self, file_path: DocumentSource) -> ParsedDocument:
         """
         Parse XLSX document using openpyxl.
         
         Args:
-            file_path: Path to the XLSX file
+            file_path: Path to the XLSX file or a binary stream
             
         Returns:
             ParsedDocument with extracted cell content from all sheets
@@ -255,60 +298,75 @@ class DocumentParser:
         Raises:
             DocumentParsingError: If XLSX parsing fails
         """
+        from openpyxl import load_workbook
+        
         try:
-            workbook = load_workbook(file_path, data_only=True)
-            
-            if not workbook.sheetnames:
-                raise DocumentParsingError(
-                    "XLSX file contains no sheets",
-                    error_code="EMPTY_DOCUMENT"
-                )
-            
-            text_content = []
-            sheet_info = []
-            total_non_empty_cells = 0
-            
-            # Extract text from all sheets
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                sheet_text = []
+            # Stream rows instead of building the full cell graph; read-only
+            # workbooks hold the source open until closed
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                if not workbook.sheetnames:
+                    raise DocumentParsingError(
+                        "XLSX file contains no sheets",
+                        error_code="EMPTY_DOCUMENT"
+                    )
                 
-                # Add sheet name as header
-                sheet_text.append(f"=== Sheet: {sheet_name} ===")
+                text_content = []
+                sheet_info = []
+                total_non_empty_cells = 0
                 
-                # Extract cell values
-                for row in sheet.iter_rows(values_only=True):
-                    # Filter out None values and convert to strings
-                    row_values = [str(cell) for cell in row if cell is not None and str(cell).strip()]
-                    if row_values:
-                        sheet_text.append(" | ".join(row_values))
-                        total_non_empty_cells += len(row_values)
+                # Extract text from all sheets
+                for sheet_name in workbook.sheetnames:
+                    sheet = workbook[sheet_name]
+                    sheet_text = []
+                    
+                    # Add sheet name as header
+                    sheet_text.append(f"=== Sheet: {sheet_name} ===")
+                    
+                    # Read-only sheets only yield cells inside the stored
+                    # <dimension> record, which writers may leave truncated
+                    # or omit; drop it so every stored cell is read, and
+                    # measure the sheet from the rows actually read
+                    sheet.reset_dimensions()
+                    row_count = 0
+                    column_count = 0
+                    
+                    # Extract cell values
+                    for row in sheet.iter_rows(values_only=True):
+                        row_count += 1
+                        column_count = max(column_count, len(row))
+                        
+                        # Filter out None values and convert to strings
+                        row_values = [str(cell) for cell in row if cell is not None and str(cell).strip()]
+                        if row_values:
+                            sheet_text.append(" | ".join(row_values))
+                            total_non_empty_cells += len(row_values)
+                    
+                    if len(sheet_text) > 1:  # More than just the header
+                        text_content.extend(sheet_text)
+                        sheet_info.append({
+                            "name": sheet_name,
+                            "rows": row_count,
+                            "columns": column_count
+                        })
                 
-                if len(sheet_text) > 1:  # More than just the header
-                    text_content.extend(sheet_text)
-                    sheet_info.append({
-                        "name": sheet_name,
-                        "rows": sheet.max_row,
-                        "columns": sheet.max_column
-                    })
-            
-            # Combine all text
-            full_text = "\n".join(text_content)
-            
-            if not full_text.strip() or total_non_empty_cells == 0:
-                raise DocumentParsingError(
-                    "No content found in XLSX file",
-                    error_code="NO_CONTENT"
-                )
-            
-            # Extract metadata
-            metadata = {
-                "format": "XLSX",
-                "sheet_count": len(workbook.sheetnames),
-                "sheet_names": workbook.sheetnames,
-            }
-            
-            workbook.close()
+                # Combine all text
+                full_text = "\n".join(text_content)
+                
+                if not full_text.strip() or total_non_empty_cells == 0:
+                    raise DocumentParsingError(
+                        "No content found in XLSX file",
+                        error_code="NO_CONTENT"
+                    )
+                
+                # Extract metadata
+                metadata = {
+                    "format": "XLSX",
+                    "sheet_count": len(workbook.sheetnames),
+                    "sheet_names": workbook.sheetnames,
+                }
+            finally:
+                workbook.close()
             
             return ParsedDocument(
                 content=full_text,
@@ -329,12 +387,12 @@ class DocumentParser:
                 details={"original_error": str(e)}
             )
     
-    def parse_txt(self, file_path: str) -> ParsedDocument:
+    def parse_txt(self, file_path: DocumentSource) -> ParsedDocument:
         """
         Parse TXT document with encoding detection.
         
         Args:
-            file_path: Path to the TXT file
+            file_path: Path to the TXT file or a binary stream
             
         Returns:
             ParsedDocument with extracted text content
@@ -344,8 +402,11 @@ class DocumentParser:
         """
         try:
             # First, detect the encoding
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
+            if isinstance(file_path, str):
+                with open(file_path, 'rb') as f:
+                    raw_data = f.read()
+            else:
+                raw_data = file_path.read()
             
             if not raw_data:
                 raise DocumentParsingError(
@@ -8,9 +8,12 @@ to various file formats.
 from typing import Dict, Any, Optional
 from datetime import datetime
 from io import BytesIO
-from docx import Document
-from docx.shared import Pt
-from openpyxl import Workbook
+
+# python-docx and openpyxl are imported by the export method that needs them
+
+# Deletion table for control characters (0x00-0x1F except tab, newline and
+# carriage return), which are not allowed in XML
+_XML_CONTROL_CHARS = dict.fromkeys(i for i in range(0x20) if chr(i) not in '\t\n\r')
 
 
 class FileExportError(Exception):
@@ -41,11 +44,7 @@ class FileExporter:
         """
         # Remove control characters (0x00-0x1F except tab, newline, carriage return)
         # and other problematic characters
-        sanitized = ''.join(
-            char for char in text
-            if ord(char) >= 0x20 or char in '\t\n\r'
-        )
-        return sanitized
+        return text.translate(_XML_CONTROL_CHARS)
     
     def export(
         self,
@@ -182,6 +181,9 @@ class FileExporter:
         Returns:
             DOCX file bytes
         """
+        from docx import Document
+        from docx.shared import Pt
+        
         doc = Document()
         
         # Set document properties if metadata available
@@ -268,18 +270,16 @@ class FileExporter:
         Returns:
             XLSX file bytes
         """
-        workbook = Workbook()
+        from openpyxl import Workbook
         
-        # Remove default sheet
-        if "Sheet" in workbook.sheetnames:
-            default_sheet = workbook["Sheet"]
-            workbook.remove(default_sheet)
+        # Write-only workbooks stream rows out instead of keeping every cell
+        # in memory, and start without a default sheet
+        workbook = Workbook(write_only=True)
         
         # Process content
         lines = content.split('\n')
         
         current_sheet = None
-        current_row = 1
         
         for line in lines:
             stripped = line.strip()
@@ -289,7 +289,6 @@ class FileExporter:
                 sheet_name = stripped.replace("=== Sheet:", "").replace("===", "").strip()
                 # Create new sheet
                 current_sheet = workbook.create_sheet(title=sheet_name[:31])  # Excel limit
-                current_row = 1
                 continue
             
             # Skip empty lines
@@ -307,18 +306,11 @@ class FileExporter:
                 row_data = [stripped]
             
             # Write to sheet
-            for col_idx, cell_value in enumerate(row_data, start=1):
-                current_sheet.cell(row=current_row, column=col_idx, value=cell_value)
-            
-            current_row += 1
+            current_sheet.append(row_data)
         
-        # If no sheets were created, create a default one with content
+        # If no sheets were created, the content was blank: export one empty sheet
         if not workbook.sheetnames:
-            sheet = workbook.create_sheet(title="Sheet1")
-            lines = content.split('\n')
-            for row_idx, line in enumerate(lines, start=1):
-                if line.strip():
-                    sheet.cell(row=row_idx, column=1, value=line.strip())
+            workbook.create_sheet(title="Sheet1")
         
         # Save to BytesIO
         buffer = BytesIO()
@@ -353,8 +345,12 @@ class FileExporter:
         else:
             base_name = original_filename
         
-        # Format timestamp
-        time_str = timestamp.strftime('%Y%m%d_%H%M%S')
+        # Format timestamp as YYYYMMDD_HHMMSS (an f-string skips strftime's
+        # format parsing)
+        time_str = (
+            f"{timestamp.year:04d}{timestamp.month:02d}{timestamp.day:02d}_"
+            f"{timestamp.hour:02d}{timestamp.minute:02d}{timestamp.second:02d}"
+        )
         
         # Generate filename
         filename = f"{base_name}_desensitized_{time_str}.{output_format}"
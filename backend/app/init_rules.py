@@ -4,6 +4,7 @@ Database initialization script for pre-configured desensitization rules.
 This script inserts the default desensitization rules into the database
 according to Requirement 4.1.
 """
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models import DesensitizationRule
 from app.database import SessionLocal, engine, Base
@@ -15,7 +16,7 @@ logger = get_logger(__name__)
 
 # Pre-configured desensitization rules
 # Requirements: 4.1 - Pre-configured rules for common sensitive data types
-PRECONFIGURED_RULES = [
+PRECONFIGURED_RULES = (
     {
         "id": "rule-name-mask",
         "name": "姓名脱敏（掩码）",
@@ -64,7 +65,11 @@ PRECONFIGURED_RULES = [
         "is_system": True,
         "enabled": True,
     },
-]
+)
+
+# Derived invariants of PRECONFIGURED_RULES, computed once at import
+PRECONFIGURED_RULE_COUNT = len(PRECONFIGURED_RULES)
+PRECONFIGURED_DATA_TYPES = frozenset(rule["data_type"] for rule in PRECONFIGURED_RULES)
 
 
 def init_preconfigured_rules(db: Session) -> None:
@@ -79,35 +84,37 @@ def init_preconfigured_rules(db: Session) -> None:
     """
     logger.info("Initializing pre-configured desensitization rules")
     
-    # Check existing rules
-    existing_rules = db.query(DesensitizationRule).filter(
-        DesensitizationRule.is_system == True
-    ).all()
+    # Check existing rules with a single column query
+    existing_data_types = set(db.execute(
+        select(DesensitizationRule.data_type).where(
+            DesensitizationRule.is_system == True
+        )
+    ).scalars())
     
-    existing_data_types = {rule.data_type for rule in existing_rules}
+    # Insert missing rules in one batch; ids come from the model's uuid4
+    # default, so the string ids in PRECONFIGURED_RULES are not stored
+    missing_rules = [
+        {
+            "name": rule_data["name"],
+            "data_type": rule_data["data_type"],
+            "strategy": rule_data["strategy"],
+            "is_system": rule_data["is_system"],
+            "enabled": rule_data["enabled"],
+        }
+        for rule_data in PRECONFIGURED_RULES
+        if rule_data["data_type"] not in existing_data_types
+    ]
     
-    # Insert missing rules
-    inserted_count = 0
-    for rule_data in PRECONFIGURED_RULES:
-        if rule_data["data_type"] not in existing_data_types:
-            rule = DesensitizationRule(
-                name=rule_data["name"],
-                data_type=rule_data["data_type"],
-                strategy=rule_data["strategy"],
-                is_system=rule_data["is_system"],
-                enabled=rule_data["enabled"],
-            )
-            db.add(rule)
-            inserted_count += 1
+    if missing_rules:
+        db.bulk_insert_mappings(DesensitizationRule, missing_rules)
+        db.commit()
+        for rule_data in missing_rules:
             logger.info(
                 "Inserted rule",
                 rule_name=rule_data["name"],
                 data_type=rule_data["data_type"]
             )
-    
-    if inserted_count > 0:
-        db.commit()
-        logger.info(f"Successfully inserted {inserted_count} pre-configured rules")
+        logger.info(f"Successfully inserted {len(missing_rules)} pre-configured rules")
     else:
         logger.info("All pre-configured rules already exist, skipping insertion")
 
@@ -33,22 +33,49 @@ class SensitiveItem:
             raise ValueError(f"end_pos ({self.end_pos}) must be >= start_pos ({self.start_pos})")
 
 
-# Regex patterns for structured sensitive data
+# Regex patterns for structured sensitive data, compiled once at import
 # Order matters: more specific patterns should be checked first
+# All of them are ASCII-only, so re.ASCII keeps \d to the digits 0-9
+# (rather than every Unicode decimal digit such as full-width ones)
 REGEX_PATTERNS = {
-    'id_card': r'\d{17}[\dXx]',  # Check ID card first (18 chars)
-    'bank_card': r'\d{16,19}',   # Then bank card (16-19 chars)
-    'phone': r'1[3-9]\d{9}',     # Phone (11 chars starting with 1[3-9])
-    'email': r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',  # More robust email pattern
+    'id_card': re.compile(r'\d{17}[\dXx]', re.ASCII),  # Check ID card first (18 chars)
+    'bank_card': re.compile(r'\d{16,19}', re.ASCII),   # Then bank card (16-19 chars)
+    'phone': re.compile(r'1[3-9]\d{9}', re.ASCII),     # Phone (11 chars starting with 1[3-9])
+    # Email; the local part is capped at 64 chars (RFC 5321), which keeps the
+    # scan linear on long runs of local-part characters without an '@'. A
+    # longer local part matches on its last 64 chars and is then extended to
+    # the start of the run (see _EMAIL_LOCAL_CHARS)
+    'email': re.compile(r'[a-zA-Z0-9._%+-]{1,64}@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', re.ASCII),
 }
 
+# Cheap literal check run before the regex patterns: every pattern above
+# needs either a run of at least 11 digits (phone is the shortest) or an '@'.
+# Text without either cannot match, so the scan below is skipped.
+_REGEX_PREFILTER = re.compile(r'\d{11,}|@', re.ASCII)
+
+# Characters of an email local part, used to extend an email match backwards
+# over a local part longer than the pattern's 64-char cap, so none of it is
+# left unreported
+_EMAIL_LOCAL_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-')
+
+# All patterns fused into one alternation with a named group per data type,
+# so the text is scanned once instead of once per pattern. At each position
+# the alternatives are tried in REGEX_PATTERNS order, which keeps the more
+# specific patterns ahead of the looser ones; match.lastgroup names the type.
+# A digit run longer than one match is split into back-to-back matches (e.g.
+# an 18-digit id_card followed directly by an 11-digit phone), so no digit
+# between two matches is left unreported.
+_FUSED_REGEX = re.compile(
+    '|'.join(f'(?P<{data_type}>{pattern.pattern})' for data_type, pattern in REGEX_PATTERNS.items()),
+    re.ASCII
+)
+
 
 class RecognitionEngine:
     """Engine for identifying sensitive information in text"""
     
     def __init__(self):
         """Initialize the recognition engine"""
-        self.regex_patterns = REGEX_PATTERNS
         self.nlp_model = None
     
     def _regex_recognition(self, text: str) -> List[SensitiveItem]:
@@ -62,33 +89,27 @@ class RecognitionEngine:
             List of identified sensitive items
         """
         items = []
-        matched_positions = set()  # Track matched positions to avoid overlaps
-        
-        # Process patterns in order (more specific first)
-        for data_type, pattern in self.regex_patterns.items():
-            # Find all matches for this pattern
-            for match in re.finditer(pattern, text):
-                start, end = match.start(), match.end()
-                
-                # Check if this position overlaps with already matched positions
-                overlaps = any(
-                    pos in matched_positions 
-                    for pos in range(start, end)
-                )
-                
-                if not overlaps:
-                    item = SensitiveItem(
-                        type=data_type,
-                        value=match.group(),
-                        start_pos=start,
-                        end_pos=end,
-                        confidence=1.0  # Regex matches have 100% confidence
-                    )
-                    items.append(item)
-                    
-                    # Mark these positions as matched
-                    for pos in range(start, end):
-                        matched_positions.add(pos)
+        
+        if not _REGEX_PREFILTER.search(text):
+            return items
+        
+        # A single left-to-right scan; matches never overlap
+        previous_end = 0
+        for match in _FUSED_REGEX.finditer(text):
+            start, end = match.span()
+            if match.lastgroup == 'email':
+                # Walk back over the rest of an overlong local part, up to the
+                # previous match; each character is walked over at most once
+                while start > previous_end and text[start - 1] in _EMAIL_LOCAL_CHARS:
+                    start -= 1
+            items.append(SensitiveItem(
+                type=match.lastgroup,
+                value=text[start:end],
+                start_pos=start,
+                end_pos=end,
+                confidence=1.0  # Regex matches have 100% confidence
+            ))
+            previous_end = end
         
         return items
     
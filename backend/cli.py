@@ -10,48 +10,97 @@ Usage:
     python cli.py -d ./documents                     # Process directory
     python cli.py -f document.pdf --output ./results # Custom output directory
     python cli.py -d ./docs --rules phone,id_card    # Specific rules only
+    python cli.py -d ./docs --dry-run                # Report findings, write nothing
+    python cli.py -d ./docs --summary-json sum.json  # Also write counts as JSON
+
+When installed (`pip install .`), the same interface is available as the
+`data-veil` console script.
 """
 
 import argparse
+import contextlib
+import itertools
+import json
+import multiprocessing
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, FrozenSet, Iterable, Iterator, NamedTuple, Tuple
 import logging
 
-from app.document_parser import DocumentParser, ParsedDocument
-from app.recognition_engine import RecognitionEngine, SensitiveItem
+# Only lightweight modules are imported here. The parser/exporter stack
+# (PyMuPDF, python-docx, openpyxl) and the database layer are imported where
+# they are used, so `--help` and argument errors return without loading them.
 from app.desensitization_processor import DesensitizationProcessor, DesensitizationRule
-from app.file_exporter import FileExporter
 from app.exceptions import DocumentParsingError, RecognitionError
-from app.database import SessionLocal
-from app.models import DesensitizationRule as DBDesensitizationRule
+
+
+# File extensions picked up when processing a directory
+_SUPPORTED_EXTENSIONS = frozenset({'.pdf', '.docx', '.xlsx', '.txt', '.md'})
+
+# Directories with fewer files than this are processed serially; below it
+# the process pool start-up costs more than it saves
+_PARALLEL_MIN_FILES = 4
+
+# Fork lets pool workers inherit already-initialized engines; it is not used
+# on macOS, where forking a process with system frameworks loaded is unsafe
+_FORK_AVAILABLE = (
+    'fork' in multiprocessing.get_all_start_methods() and sys.platform != 'darwin'
+)
+
+
+class FileError(NamedTuple):
+    """A file that failed to process and the reason why"""
+    file: str
+    error: str
 
 
 class CLIProcessor:
     """Processor for CLI-based document desensitization"""
     
-    def __init__(self, output_dir: str = "./output", rules: Optional[List[str]] = None):
+    def __init__(
+        self,
+        output_dir: str = "./output",
+        rules: Optional[Iterable[str]] = None,
+        jobs: int = 0,
+        chunk_size: int = 8,
+        dry_run: bool = False
+    ):
         """
         Initialize CLI processor.
         
         Args:
             output_dir: Directory for output files (default: ./output)
-            rules: List of rule data types to apply (default: all enabled rules)
+            rules: Rule data types to apply (default: all enabled rules)
+            jobs: Worker processes for directory processing (0 = CPU count, 1 = serial)
+            chunk_size: Number of files handed to a worker at a time
+            dry_run: Only run recognition and report findings, write no output
         """
+        from app.document_parser import DocumentParser
+        from app.recognition_engine import RecognitionEngine
+        from app.file_exporter import FileExporter
+        
         self.output_dir = Path(output_dir)
-        self.rules = rules or []  # Empty list means use all enabled rules
+        self._output_dir_str = str(self.output_dir)
+        self.rules: FrozenSet[str] = frozenset(rules or ())  # Empty set means use all enabled rules
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
         self.parser = DocumentParser()
         self.recognition_engine = RecognitionEngine()
         self.desensitization_processor = DesensitizationProcessor()
         self.file_exporter = FileExporter()
         self.logger = self._setup_logger()
         
+        # Rules are resolved once per CLI run, not once per file
+        self._rules_cache: Optional[List[DesensitizationRule]] = None
+        
         # Statistics
         self.total_files = 0
         self.successful_files = 0
         self.failed_files = 0
-        self.errors: List[Dict] = []
+        self.errors: List[FileError] = []
     
     def _setup_logger(self) -> logging.Logger:
         """
@@ -77,7 +126,8 @@ class CLIProcessor:
         logger.addHandler(console_handler)
         
         # File handler
-        file_handler = logging.FileHandler('desensitization.log')
+        from app.config import settings
+        file_handler = logging.FileHandler(settings.cli_log_file)
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
         logger.addHandler(file_handler)
@@ -103,27 +153,17 @@ class CLIProcessor:
             parsed_doc = self.parser.parse(str(file_path), file_type)
             
             # Identify sensitive data
-            # Try with NLP first, fall back to regex-only if NLP fails
-            try:
-                sensitive_items = self.recognition_engine.identify_sensitive_data(
-                    parsed_doc.content,
-                    use_nlp=True
-                )
-            except RecognitionError as e:
-                self.logger.warning(f"NLP recognition failed, falling back to regex-only: {e.message}")
-                sensitive_items = self.recognition_engine.identify_sensitive_data(
-                    parsed_doc.content,
-                    use_nlp=False
-                )
+            sensitive_items = self._identify(parsed_doc.content)
             
             self.logger.info(f"Identified {len(sensitive_items)} sensitive items")
             
+            if self.dry_run:
+                self._report_findings(file_path, sensitive_items)
+                self.successful_files += 1
+                return True
+            
             # Load rules
-            if not self.rules:
-                # Use all enabled rules
-                rules = self._load_default_rules()
-            else:
-                rules = self._load_selected_rules(self.rules)
+            rules = self._get_rules()
             
             # Apply desensitization
             desensitized_content = self.desensitization_processor.process(
@@ -144,8 +184,7 @@ class CLIProcessor:
                 parsed_doc.metadata
             )
             
-            with open(output_path, 'wb') as f:
-                f.write(output_data)
+            self._write_atomic(output_path, output_data)
             
             self.logger.info(f"Successfully processed: {file_path} -> {output_path}")
             self.successful_files += 1
@@ -153,29 +192,94 @@ class CLIProcessor:
             
         except DocumentParsingError as e:
             self.logger.error(f"Failed to parse {file_path}: {e.message}")
-            self.errors.append({
-                'file': str(file_path),
-                'error': f"Parsing error: {e.message}"
-            })
+            self.errors.append(FileError(str(file_path), f"Parsing error: {e.message}"))
             self.failed_files += 1
             return False
         except RecognitionError as e:
             self.logger.error(f"Failed to recognize sensitive data in {file_path}: {e.message}")
-            self.errors.append({
-                'file': str(file_path),
-                'error': f"Recognition error: {e.message}"
-            })
+            self.errors.append(FileError(str(file_path), f"Recognition error: {e.message}"))
             self.failed_files += 1
             return False
         except Exception as e:
             self.logger.error(f"Failed to process {file_path}: {str(e)}")
-            self.errors.append({
-                'file': str(file_path),
-                'error': str(e)
-            })
+            self.errors.append(FileError(str(file_path), str(e)))
             self.failed_files += 1
             return False
     
+    def _identify(self, text: str) -> List:
+        """
+        Identify sensitive items in text.
+        
+        Tries NLP recognition first and falls back to regex-only if it fails.
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            List of identified sensitive items
+        """
+        try:
+            return self.recognition_engine.identify_sensitive_data(text, use_nlp=True)
+        except RecognitionError as e:
+            self.logger.warning(f"NLP recognition failed, falling back to regex-only: {e.message}")
+            return self.recognition_engine.identify_sensitive_data(text, use_nlp=False)
+    
+    def desensitize_text(self, text: str) -> str:
+        """
+        Desensitize plain text with this processor's rules.
+        
+        Runs the same recognition and desensitization steps as process_file,
+        without parsing or exporting a document.
+        
+        Args:
+            text: Text to desensitize
+            
+        Returns:
+            Desensitized text
+        """
+        return self.desensitization_processor.process(
+            text,
+            self._identify(text),
+            self._get_rules()
+        )
+    
+    def _report_findings(self, file_path: Path, sensitive_items: List) -> None:
+        """
+        Print a one-line JSON report of identified items for dry runs.
+        
+        Args:
+            file_path: Path of the processed file
+            sensitive_items: Items identified in the file
+        """
+        count_by_type: Dict[str, int] = {}
+        for item in sensitive_items:
+            count_by_type[item.type] = count_by_type.get(item.type, 0) + 1
+        
+        print(json.dumps(
+            {"file": str(file_path), "count_by_type": count_by_type},
+            ensure_ascii=False
+        ), flush=True)
+    
+    def _write_atomic(self, output_path: Path, data: bytes) -> None:
+        """
+        Write data to output_path atomically.
+        
+        The bytes are written to a temporary sibling file which is then
+        renamed over the target, so a crash never leaves a half-written
+        output file behind.
+        
+        Args:
+            output_path: Final path of the output file
+            data: File content to write
+        """
+        tmp_path = output_path.with_name(f"{output_path.name}.tmp.{os.getpid()}")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    
     def process_directory(self, dir_path: Path, base_dir: Optional[Path] = None) -> None:
         """
         Recursively process all supported files in directory.
@@ -187,15 +291,78 @@ class CLIProcessor:
         if base_dir is None:
             base_dir = dir_path
         
-        supported_extensions = {'.pdf', '.docx', '.xlsx', '.txt', '.md'}
+        files = self._collect_files(dir_path)
+        self.total_files += len(files)
         
+        if self.jobs == 1 or len(files) < _PARALLEL_MIN_FILES:
+            for file_path in files:
+                self.process_file(file_path, base_dir)
+        else:
+            self._process_parallel(files, base_dir)
+    
+    def _collect_files(self, dir_path: Path) -> List[Path]:
+        """
+        Recursively collect all supported files in directory.
+        
+        Args:
+            dir_path: Directory path to scan
+            
+        Returns:
+            List of supported file paths, in traversal order
+        """
+        files = []
         for item in dir_path.iterdir():
-            if item.is_file() and item.suffix.lower() in supported_extensions:
-                self.total_files += 1
-                self.process_file(item, base_dir)
+            if item.is_file() and item.suffix.lower() in _SUPPORTED_EXTENSIONS:
+                files.append(item)
             elif item.is_dir():
-                # Recursively process subdirectories
-                self.process_directory(item, base_dir)
+                # Recursively scan subdirectories
+                files.extend(self._collect_files(item))
+        return files
+    
+    def _process_parallel(self, files: List[Path], base_dir: Path) -> None:
+        """
+        Process files in a pool of worker processes.
+        
+        Where fork is available the workers inherit this processor (parser,
+        recognition engine and loaded NLP model included) copy-on-write;
+        elsewhere each worker builds its own processor once at start-up.
+        Rules are resolved once here in both cases, and the per-file results
+        are folded back into this processor's statistics.
+        
+        Args:
+            files: Files to process
+            base_dir: Base directory for preserving structure
+        """
+        max_workers = self.jobs or os.cpu_count()
+        self.logger.info(f"Processing {len(files)} files with {max_workers} workers")
+        
+        rules = self._get_rules()
+        if _FORK_AVAILABLE:
+            mp_context = multiprocessing.get_context('fork')
+            initializer, initargs = _adopt_worker_processor, (self,)
+        else:
+            mp_context = multiprocessing.get_context('spawn')
+            initializer = _init_worker
+            initargs = (str(self.output_dir), self.rules, rules, self.dry_run)
+        
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=initializer,
+            initargs=initargs
+        ) as executor:
+            results = executor.map(
+                _process_one,
+                files,
+                itertools.repeat(base_dir),
+                chunksize=self.chunk_size
+            )
+            for success, error in results:
+                if success:
+                    self.successful_files += 1
+                else:
+                    self.failed_files += 1
+                    self.errors.append(error)
     
     def _generate_output_path(self, input_path: Path, base_dir: Optional[Path] = None) -> Path:
         """
@@ -209,24 +376,55 @@ class CLIProcessor:
         Returns:
             Output file path with _desensitized suffix
         """
-        stem = input_path.stem
-        suffix = input_path.suffix
-        new_name = f"{stem}_desensitized{suffix}"
+        # Insert the suffix before the extension using plain string ops;
+        # a leading dot (".env") or trailing dot ("name.") is not an extension
+        name = input_path.name
+        dot = name.rfind('.')
+        if 0 < dot < len(name) - 1:
+            new_name = f"{name[:dot]}_desensitized{name[dot:]}"
+        else:
+            new_name = f"{name}_desensitized"
         
         # If base_dir is provided, preserve directory structure
         if base_dir is not None:
-            # Calculate relative path from base_dir
-            try:
-                relative_path = input_path.relative_to(base_dir)
-                # Preserve directory structure in output
-                output_relative = relative_path.parent / new_name
-                return self.output_dir / output_relative
-            except ValueError:
-                # If input_path is not relative to base_dir, just use filename
-                pass
+            relative_path = os.path.relpath(input_path, base_dir)
+            # Paths outside base_dir just use the filename
+            if relative_path != os.pardir and not relative_path.startswith(os.pardir + os.sep):
+                return Path(self._output_dir_str, os.path.dirname(relative_path), new_name)
         
         # Default: place in output directory root
-        return self.output_dir / new_name
+        return Path(self._output_dir_str, new_name)
+    
+    @contextlib.contextmanager
+    def _session(self) -> Iterator:
+        """
+        Provide a database session that is always closed, even on error.
+        
+        Yields:
+            SQLAlchemy session bound to the shared application engine
+        """
+        from app.database import SessionLocal
+        
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    def _get_rules(self) -> List[DesensitizationRule]:
+        """
+        Get the rules to apply, loading them on first use.
+        
+        Returns:
+            List of desensitization rules for this CLI run
+        """
+        if self._rules_cache is None:
+            if not self.rules:
+                # Use all enabled rules
+                self._rules_cache = self._load_default_rules()
+            else:
+                self._rules_cache = self._load_selected_rules(self.rules)
+        return self._rules_cache
     
     def _load_default_rules(self) -> List[DesensitizationRule]:
         """
@@ -237,11 +435,12 @@ class CLIProcessor:
         """
         # Try to load from database first
         try:
-            db = SessionLocal()
-            db_rules = db.query(DBDesensitizationRule).filter(
-                DBDesensitizationRule.enabled == True
-            ).all()
-            db.close()
+            from app.models import DesensitizationRule as DBDesensitizationRule
+            
+            with self._session() as db:
+                db_rules = db.query(DBDesensitizationRule).filter(
+                    DBDesensitizationRule.enabled == True
+                ).all()
             
             if db_rules:
                 return [
@@ -303,12 +502,12 @@ class CLIProcessor:
             ),
         ]
     
-    def _load_selected_rules(self, rule_names: List[str]) -> List[DesensitizationRule]:
+    def _load_selected_rules(self, rule_names: FrozenSet[str]) -> List[DesensitizationRule]:
         """
         Load specific rules by data type name.
         
         Args:
-            rule_names: List of data type names (e.g., ['phone', 'id_card'])
+            rule_names: Set of data type names (e.g., {'phone', 'id_card'})
             
         Returns:
             List of selected desensitization rules
@@ -327,14 +526,97 @@ class CLIProcessor:
         
         if self.errors:
             print("\n失败详情 / Error Details:")
-            for error in self.errors:
-                print(f"  - {error['file']}: {error['error']}")
+            for file, error in self.errors:
+                print(f"  - {file}: {error}")
         
         print("="*60)
+    
+    def write_summary_json(self, path: Path) -> None:
+        """
+        Write the processing summary counts as JSON.
+        
+        Args:
+            path: File to write {"total", "successful", "failed"} to
+        """
+        summary = {
+            "total": self.total_files,
+            "successful": self.successful_files,
+            "failed": self.failed_files
+        }
+        path.write_text(json.dumps(summary), encoding='utf-8')
 
 
-def main():
-    """Main entry point for CLI"""
+# Processor owned by a pool worker process (see _init_worker)
+_worker_processor: Optional[CLIProcessor] = None
+
+
+def _adopt_worker_processor(processor: CLIProcessor) -> None:
+    """
+    Initialize a forked pool worker with the parent's processor.
+    
+    Args:
+        processor: Processor inherited from the parent process
+    """
+    global _worker_processor
+    _worker_processor = processor
+    
+    # Don't reuse database connections opened by the parent
+    database = sys.modules.get('app.database')
+    if database is not None:
+        database.engine.dispose(close=False)
+
+
+def _init_worker(
+    output_dir: str,
+    rules: FrozenSet[str],
+    resolved_rules: List[DesensitizationRule],
+    dry_run: bool
+) -> None:
+    """
+    Initialize a spawned pool worker with its own serial CLIProcessor.
+    
+    Args:
+        output_dir: Directory for output files
+        rules: Rule data types selected on the command line
+        resolved_rules: Rules already loaded by the parent process
+        dry_run: Only run recognition and report findings
+    """
+    global _worker_processor
+    _worker_processor = CLIProcessor(
+        output_dir=output_dir,
+        rules=rules,
+        jobs=1,
+        dry_run=dry_run
+    )
+    _worker_processor._rules_cache = resolved_rules
+
+
+def _process_one(file_path: Path, base_dir: Path) -> Tuple[bool, Optional[FileError]]:
+    """
+    Process a single file inside a pool worker.
+    
+    Args:
+        file_path: Path to the file to process
+        base_dir: Base directory for preserving structure
+        
+    Returns:
+        Tuple of (success, error); error is None on success
+    """
+    success = _worker_processor.process_file(file_path, base_dir)
+    return success, (None if success else _worker_processor.errors.pop())
+
+
+def run_cli(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the CLI with the given arguments
+    
+    Args:
+        argv: Command line arguments, excluding the program name
+              (defaults to sys.argv[1:])
+        
+    Returns:
+        Exit code: 0 if every file was processed, 1 otherwise
+    """
     parser = argparse.ArgumentParser(
         description='文档脱敏命令行工具 / Document Desensitization CLI Tool',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -351,6 +633,12 @@ def main():
   
   # 指定脱敏规则 / Specify desensitization rules
   python cli.py -f document.pdf --rules phone,id_card,email
+  
+  # 使用4个进程并行处理目录 / Process directory with 4 worker processes
+  python cli.py -d ./documents --jobs 4
+  
+  # 仅识别并输出统计，不写文件 / Only report findings, write no files
+  python cli.py -d ./documents --dry-run
         """
     )
     
@@ -380,20 +668,54 @@ def main():
         help='指定脱敏规则，逗号分隔（默认: 全部）/ Specify rules, comma-separated (default: all)'
     )
     
-    args = parser.parse_args()
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=0,
+        help='目录处理的并行进程数（0=自动, 1=串行）/ Worker processes for directories (0=auto, 1=serial)'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=8,
+        help='每次分发给进程的文件数（默认: 8）/ Files handed to a worker at a time (default: 8)'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='仅识别敏感信息并输出统计，不写文件 / Only identify sensitive data and print stats, write no files'
+    )
+    parser.add_argument(
+        '--summary-json',
+        type=str,
+        help='将处理统计以JSON写入指定文件 / Also write the summary counts as JSON to this file'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    if args.jobs < 0:
+        parser.error('--jobs must be >= 0')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be >= 1')
     
     # Parse rules
-    rules = args.rules.split(',') if args.rules else []
+    rules = frozenset(args.rules.split(',')) if args.rules else frozenset()
     
     # Initialize processor
-    processor = CLIProcessor(output_dir=args.output, rules=rules)
+    processor = CLIProcessor(
+        output_dir=args.output,
+        rules=rules,
+        jobs=args.jobs,
+        chunk_size=args.chunk_size,
+        dry_run=args.dry_run
+    )
     
     # Process files
     if args.file:
         file_path = Path(args.file)
         if not file_path.exists():
             print(f"错误: 文件不存在 / Error: File not found: {args.file}")
-            sys.exit(1)
+            return 1
         
         processor.total_files = 1
         processor.process_file(file_path)
@@ -402,15 +724,21 @@ def main():
         dir_path = Path(args.directory)
         if not dir_path.exists() or not dir_path.is_dir():
             print(f"错误: 目录不存在 / Error: Directory not found: {args.directory}")
-            sys.exit(1)
+            return 1
         
         processor.process_directory(dir_path)
     
     # Print summary
     processor.print_summary()
+    if args.summary_json:
+        processor.write_summary_json(Path(args.summary_json))
     
-    # Exit with appropriate code
-    sys.exit(0 if processor.failed_files == 0 else 1)
+    return 0 if processor.failed_files == 0 else 1
+
+
+def main():
+    """Main entry point for CLI"""
+    sys.exit(run_cli())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,78 @@
+"""
+Long-lived CLI worker process for the test suite
+
+Started once per session by the `cli_worker` fixture (see conftest.py). Reads
+length-prefixed JSON requests ({"argv": [...]}) from stdin, runs each one
+through cli.run_cli and replies with a length-prefixed JSON message
+({"returncode": N, "stdout": "..."}). Interpreter start-up and module imports
+are paid once instead of once per CLI invocation.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cli import run_cli
+
+
+def read_message(stream):
+    """
+    Read one length-prefixed JSON message
+
+    Args:
+        stream: Binary stream to read from
+
+    Returns:
+        Decoded message, or None at end of stream
+    """
+    header = stream.readline()
+    if not header:
+        return None
+    return json.loads(stream.read(int(header)).decode('utf-8'))
+
+
+def write_message(stream, message):
+    """
+    Write one length-prefixed JSON message
+
+    Args:
+        stream: Binary stream to write to
+        message: JSON-serializable message
+    """
+    payload = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    stream.write(b'%d\n' % len(payload))
+    stream.write(payload)
+    stream.flush()
+
+
+def main():
+    """Serve CLI requests until stdin is closed"""
+    # Keep a private handle on the real stdout for replies and point fd 1 at
+    # stderr, so nothing else (structlog, forked pool workers) can write into
+    # the reply channel
+    replies = os.fdopen(os.dup(1), 'wb')
+    os.dup2(2, 1)
+
+    while True:
+        request = read_message(sys.stdin.buffer)
+        if request is None:
+            break
+
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            try:
+                returncode = run_cli(request['argv'])
+            except SystemExit as e:
+                # argparse reports usage errors via SystemExit
+                returncode = e.code if isinstance(e.code, int) else 1
+
+        write_message(replies, {'returncode': returncode, 'stdout': stdout.getvalue()})
+
+
+if __name__ == '__main__':
+    main()
@@ -1,54 +1,217 @@
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from hypothesis import HealthCheck, settings
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 from app.database import Base
 from app.models import Task, SensitiveItem, DesensitizationRule, OperationLog
+from pathlib import Path
+import asyncio
+import httpx
 import os
+import subprocess
+import sys
+
+from tests.cli_worker import read_message, write_message
 
 # Use in-memory SQLite for testing
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
+# Default Hypothesis profile: a bounded number of deterministic examples, so
+# every pytest-xdist worker and every re-run draws the same examples instead
+# of searching afresh. Tests that need more set max_examples themselves; pick
+# another profile with HYPOTHESIS_PROFILE ("nightly" for a wider random search)
+settings.register_profile("fast", max_examples=25, derandomize=True, deadline=None)
+settings.register_profile("nightly", max_examples=200, deadline=None)
+settings.load_profile(os.getenv("HYPOTHESIS_PROFILE", "fast"))
 
-@pytest.fixture(scope="function")
+# Profile for tests that drive the CLI end to end (tests/test_cli.py uses it
+# as the parent of its settings): a few deterministic examples, no example
+# database, and fixtures shared across examples
+settings.register_profile(
+    "cli",
+    max_examples=3,
+    deadline=None,
+    derandomize=True,
+    database=None,
+    suppress_health_check=[HealthCheck.function_scoped_fixture]
+)
+
+
+def pytest_configure(config):
+    """
+    Register the suite's custom markers.
+    
+    Select only the property tests with `-m property_test`, or skip the
+    long-running ones with `-m "not slow"`.
+    """
+    config.addinivalue_line("markers", "property_test: Hypothesis property-based test")
+    config.addinivalue_line("markers", "slow: long-running test")
+
+
+@pytest.fixture(scope="session")
 def test_engine():
-    """Create a test database engine"""
-    engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+    """
+    Create the test database engine once per session.
+    
+    StaticPool keeps the single in-memory database alive across connections.
+    pysqlite's own transaction handling breaks SAVEPOINT, so it is switched
+    off and SQLAlchemy emits BEGIN itself (see the SQLAlchemy SQLite dialect
+    docs), which lets test_db isolate each test in a rolled-back transaction.
+    """
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
     Base.metadata.create_all(bind=engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
+    engine.dispose()
 
 
-@pytest.fixture(scope="function")
-def test_db(test_engine):
-    """Create a test database session"""
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-    db = TestingSessionLocal()
+@pytest.fixture(scope="session")
+def test_inspector(test_engine):
+    """Schema inspector for the test engine; it caches reflection results"""
+    return inspect(test_engine)
+
+
+def _rollback_session(engine):
+    """
+    Yield a session inside a transaction that is rolled back afterwards.
+    Commits made through the session release SAVEPOINTs instead of ending
+    the outer transaction.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
     try:
         yield db
     finally:
         db.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="function")
+def test_db(test_engine):
+    """Create a test database session that is rolled back after the test"""
+    yield from _rollback_session(test_engine)
+
+
+@pytest.fixture(scope="module")
+def test_db_module(test_engine):
+    """Create a test database session shared by a module and rolled back after it"""
+    yield from _rollback_session(test_engine)
 
 
-# Setup for API tests - ensure test_api.db exists and has tables
 @pytest.fixture(scope="session", autouse=True)
-def setup_api_test_database():
-    """Ensure API test database is properly initialized"""
-    api_db_path = "test_api.db"
+def cli_log_file(tmp_path_factory):
+    """Send the CLI's log file to a temporary directory instead of the working tree"""
+    from app.config import settings as app_settings
     
-    # Create new database with tables
-    from sqlalchemy import create_engine
-    engine = create_engine(f"sqlite:///./{api_db_path}", connect_args={"check_same_thread": False})
+    path = tmp_path_factory.mktemp("cli_logs") / "desensitization.log"
+    previous = app_settings.cli_log_file
+    app_settings.cli_log_file = str(path)
+    yield path
+    app_settings.cli_log_file = previous
+
+
+class CLIWorker:
+    """Client for the persistent CLI worker process (tests/cli_worker.py)"""
     
-    # Drop and recreate all tables to ensure clean state
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
-    engine.dispose()
+    def __init__(self, log_file):
+        """
+        Start the worker process
+        
+        Args:
+            log_file: Path the worker's CLI runs write their log file to
+        """
+        backend_dir = Path(__file__).resolve().parent.parent
+        self._proc = subprocess.Popen(
+            [sys.executable, "-u", str(backend_dir / "tests" / "cli_worker.py")],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=backend_dir,
+            env={**os.environ, "CLI_LOG_FILE": str(log_file)}
+        )
+    
+    def run(self, argv):
+        """
+        Run the CLI with the given arguments in the worker process
+        
+        Args:
+            argv: Command line arguments, excluding the program name
+            
+        Returns:
+            subprocess.CompletedProcess with returncode and captured stdout
+        """
+        write_message(self._proc.stdin, {"argv": argv})
+        reply = read_message(self._proc.stdout)
+        if reply is None:
+            raise RuntimeError(f"CLI worker exited with code {self._proc.wait()}")
+        return subprocess.CompletedProcess(argv, reply["returncode"], reply["stdout"], "")
+    
+    def close(self):
+        """Stop the worker process"""
+        self._proc.stdin.close()
+        self._proc.wait(timeout=10)
+
+
+@pytest.fixture(scope="session")
+def cli_worker(cli_log_file):
+    """Start one CLI worker process for the whole test session"""
+    worker = CLIWorker(cli_log_file)
+    yield worker
+    worker.close()
+
+
+class ASGIClient:
+    """
+    Synchronous facade over an in-process httpx.AsyncClient.
+    
+    Requests go straight to the ASGI app on one event loop owned by the
+    client, without TestClient's per-request hop through a worker thread.
+    """
+    
+    def __init__(self, asgi_app):
+        self._loop = asyncio.new_event_loop()
+        self._client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=asgi_app),
+            base_url="http://testserver"
+        )
+    
+    def post(self, url, **kwargs):
+        """Send a POST request and wait for the response"""
+        return self._loop.run_until_complete(self._client.post(url, **kwargs))
+    
+    def close(self):
+        """Close the client and its event loop"""
+        self._loop.run_until_complete(self._client.aclose())
+        self._loop.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    Create one in-process ASGI client for every example in the session.
     
-    yield
+    The app lifespan is not run: its startup connects to the configured
+    production database, which the tests replace via get_db overrides.
+    """
+    # Imported here so test modules that never call the API don't load the app
+    from main import app
     
-    # Cleanup - remove database after all tests complete
-    if os.path.exists(api_db_path):
-        try:
-            os.remove(api_db_path)
-        except:
-            pass
+    c = ASGIClient(app)
+    yield c
+    c.close()
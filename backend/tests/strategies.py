@@ -0,0 +1,48 @@
+"""
+Hypothesis strategies shared by the property-based tests
+
+Built once at import, so every module that uses them (and every example
+they draw) reuses the same strategy objects.
+"""
+
+from hypothesis import strategies as st
+
+
+# Character alphabets
+CHINESE = st.characters(
+    whitelist_categories=('Lo',),
+    min_codepoint=0x4E00,
+    max_codepoint=0x9FFF
+)
+ASCII = st.characters(min_codepoint=32, max_codepoint=126)
+MIXED_ALPHABET = st.one_of(CHINESE, ASCII)
+
+# Text content with mixed Chinese and English, stripped and never blank
+TEXT_CONTENT = st.text(alphabet=MIXED_ALPHABET, min_size=10, max_size=500).map(str.strip).filter(bool)
+
+# The two halves of a mixed-language document
+CHINESE_TEXT = st.text(alphabet=CHINESE, min_size=5, max_size=100)
+ENGLISH_TEXT = st.text(
+    alphabet=st.characters(min_codepoint=65, max_codepoint=122),
+    min_size=5,
+    max_size=100
+)
+
+
+@st.composite
+def metadata_dict(draw):
+    """Generate metadata dictionary"""
+    metadata = {}
+
+    # Optional fields
+    if draw(st.booleans()):
+        metadata['title'] = draw(st.text(min_size=1, max_size=50))
+    if draw(st.booleans()):
+        metadata['author'] = draw(st.text(min_size=1, max_size=50))
+    if draw(st.booleans()):
+        metadata['subject'] = draw(st.text(min_size=1, max_size=50))
+
+    return metadata
+
+
+METADATA_DICT = metadata_dict()
@@ -8,17 +8,21 @@ import pytest
 import subprocess
 import sys
 import tempfile
+import json
+import os
+import random
+import re
 import shutil
 from pathlib import Path
-from hypothesis import given, strategies as st, settings, assume
-from hypothesis import HealthCheck
-import os
+from hypothesis import given, strategies as st, settings, assume, Phase
 
 # Import document creation libraries for property tests
 import fitz  # PyMuPDF
 from docx import Document
 from openpyxl import Workbook
 
+from cli import CLIProcessor, run_cli
+
 
 class TestCLIHelp:
     """Test CLI help information"""
@@ -57,27 +61,18 @@ class TestCLIIntegration:
     """Integration tests for CLI"""
     
     @pytest.fixture
-    def temp_dir(self):
-        """Create temporary directory for test files"""
-        temp_path = Path(tempfile.mkdtemp())
-        yield temp_path
-        # Cleanup
-        if temp_path.exists():
-            shutil.rmtree(temp_path)
-    
-    @pytest.fixture
-    def sample_txt_file(self, temp_dir):
+    def sample_txt_file(self, tmp_path):
         """Create a sample TXT file with sensitive data"""
-        file_path = temp_dir / "test.txt"
+        file_path = tmp_path / "test.txt"
         content = "张三的手机号是13812345678，身份证号是110101199001011234。"
         file_path.write_text(content, encoding='utf-8')
         return file_path
     
     @pytest.fixture
-    def sample_directory(self, temp_dir):
+    def sample_directory(self, tmp_path):
         """Create a sample directory structure with multiple files"""
         # Create directory structure
-        dir_path = temp_dir / "documents"
+        dir_path = tmp_path / "documents"
         dir_path.mkdir()
         
         subdir = dir_path / "subdir"
@@ -92,24 +87,19 @@ class TestCLIIntegration:
         
         return dir_path
     
-    def test_single_file_processing(self, sample_txt_file, temp_dir):
+    def test_single_file_processing(self, sample_txt_file, tmp_path, cli_worker):
         """
         Test single file processing complete flow.
         
         Requirements: 11.2
         """
-        output_dir = temp_dir / "output"
+        output_dir = tmp_path / "output"
         
-        # Run CLI
-        result = subprocess.run(
-            [
-                sys.executable, "cli.py",
-                "-f", str(sample_txt_file),
-                "--output", str(output_dir)
-            ],
-            capture_output=True,
-            text=True
-        )
+        # Run CLI in the session worker
+        result = cli_worker.run([
+            "-f", str(sample_txt_file),
+            "--output", str(output_dir)
+        ])
         
         # Should succeed
         assert result.returncode == 0
@@ -123,24 +113,19 @@ class TestCLIIntegration:
         assert "138****5678" in output_content or "13812345678" not in output_content
         assert "110101********1234" in output_content or "110101199001011234" not in output_content
     
-    def test_directory_processing(self, sample_directory, temp_dir):
+    def test_directory_processing(self, sample_directory, tmp_path, cli_worker):
         """
         Test directory processing complete flow.
         
         Requirements: 11.3
         """
-        output_dir = temp_dir / "output"
+        output_dir = tmp_path / "output"
         
-        # Run CLI
-        result = subprocess.run(
-            [
-                sys.executable, "cli.py",
-                "-d", str(sample_directory),
-                "--output", str(output_dir)
-            ],
-            capture_output=True,
-            text=True
-        )
+        # Run CLI in the session worker
+        result = cli_worker.run([
+            "-d", str(sample_directory),
+            "--output", str(output_dir)
+        ])
         
         # Should succeed
         assert result.returncode == 0
@@ -159,14 +144,43 @@ class TestCLIIntegration:
         content2 = output_file2.read_text(encoding='utf-8')
         assert "220101********1234" in content2 or "220101198501011234" not in content2
     
-    def test_error_handling_continues_processing(self, temp_dir):
+    def test_dry_run_reports_without_writing(self, sample_txt_file, tmp_path, cli_worker):
+        """
+        Test --dry-run reports identified items and writes no output files.
+        """
+        output_dir = tmp_path / "output"
+        
+        # Run CLI in the session worker
+        result = cli_worker.run([
+            "-f", str(sample_txt_file),
+            "--output", str(output_dir),
+            "--dry-run"
+        ])
+        
+        # Should succeed
+        assert result.returncode == 0
+        
+        # Nothing should be written
+        assert not output_dir.exists()
+        
+        # Should print a JSON report for the file
+        reports = [
+            json.loads(line) for line in result.stdout.splitlines()
+            if line.startswith('{"file"')
+        ]
+        assert len(reports) == 1
+        assert reports[0]["file"] == str(sample_txt_file)
+        assert reports[0]["count_by_type"]["phone"] == 1
+        assert reports[0]["count_by_type"]["id_card"] == 1
+    
+    def test_error_handling_continues_processing(self, tmp_path, cli_worker):
         """
         Test error handling and continue processing logic.
         
         Requirements: 11.12
         """
         # Create directory with valid and invalid files
-        dir_path = temp_dir / "mixed"
+        dir_path = tmp_path / "mixed"
         dir_path.mkdir()
         
         # Valid file
@@ -177,18 +191,13 @@ class TestCLIIntegration:
         invalid_file = dir_path / "invalid.txt"
         invalid_file.write_bytes(b'\x00\x01\x02\x03')  # Binary garbage
         
-        output_dir = temp_dir / "output"
+        output_dir = tmp_path / "output"
         
-        # Run CLI
-        result = subprocess.run(
-            [
-                sys.executable, "cli.py",
-                "-d", str(dir_path),
-                "--output", str(output_dir)
-            ],
-            capture_output=True,
-            text=True
-        )
+        # Run CLI in the session worker
+        result = cli_worker.run([
+            "-d", str(dir_path),
+            "--output", str(output_dir)
+        ])
         
         # Should complete (may have failures but continues)
         # Exit code 1 indicates some failures occurred
@@ -209,413 +218,361 @@ class TestCLIIntegration:
 # Property-Based Tests
 # ============================================================================
 
-# Hypothesis strategies for generating test data
-@st.composite
-def text_with_sensitive_data(draw):
-    """Generate text content with embedded sensitive data"""
-    # Generate a mix of normal text and sensitive data
-    chinese_chars = st.characters(
-        whitelist_categories=('Lo',),
-        min_codepoint=0x4E00,
-        max_codepoint=0x9FFF
+def cli_settings(**overrides):
+    """
+    Hypothesis settings for the CLI property tests.
+    
+    Builds on the "cli" profile (see conftest.py) and skips the shrink and
+    target phases: the CLI is exercised as a black box, so shrinking a
+    failing example only re-runs it many times without a clearer result.
+    
+    Args:
+        **overrides: Settings that differ from the profile (e.g. max_examples)
+    """
+    return settings(
+        settings.get_profile("cli"),
+        phases=(Phase.reuse, Phase.generate),
+        **overrides
     )
+
+
+def _example_dir(tmp_path):
+    """
+    Create a fresh directory for one Hypothesis example.
     
-    # Generate base text
-    base_text = draw(st.text(
-        alphabet=chinese_chars,
-        min_size=5,
-        max_size=50
-    ))
+    tmp_path is shared by every example of a test, so each example works in
+    its own subdirectory; pytest removes the whole tree afterwards.
+    """
+    return Path(tempfile.mkdtemp(dir=tmp_path))
+
+
+def _run_cli(argv, summary_path=None):
+    """
+    Run the CLI in-process.
     
-    # Add some sensitive data
-    phone = draw(st.from_regex(r'1[3-9]\d{9}', fullmatch=True))
+    Property tests invoke the CLI many times; calling run_cli directly avoids
+    paying interpreter start-up and import costs for every example. Results
+    are checked through the output files and --summary-json, so stdout is
+    left to pytest's capture (shown on failure) instead of being buffered.
     
-    # Combine
-    content = f"{base_text}的手机号是{phone}。"
+    Args:
+        argv: Command line arguments, excluding the program name
+        summary_path: If given, passed as --summary-json so the counts can
+                      be read back with _read_summary
     
-    return content
+    Returns:
+        CLI exit code
+    """
+    if summary_path is not None:
+        argv = argv + ["--summary-json", str(summary_path)]
+    return run_cli(argv)
 
 
-# Feature: data-desensitization-platform, Property 22: CLI Multi-format File Processing
-@given(content=text_with_sensitive_data())
-@settings(
-    max_examples=3,  # Minimal examples for CLI tests due to subprocess overhead
-    deadline=None,
-    suppress_health_check=[HealthCheck.function_scoped_fixture]
-)
-@pytest.mark.property_test
-@pytest.mark.slow  # Mark as slow test
-@pytest.mark.skip(reason="PDF processing times out - needs investigation")
-def test_cli_pdf_file_processing(content):
+def _walk(root):
     """
-    Property 22: CLI Multi-format File Processing
-    Validates: Requirements 11.2, 11.5
+    List every entry below root with a single os.scandir pass per directory.
     
-    For any supported file format (PDF) and valid file path,
-    when the CLI is invoked with -f parameter, the file should be
-    successfully parsed, desensitized, and exported.
-    """
-    # Create temporary directories
-    temp_dir = Path(tempfile.mkdtemp())
-    output_dir = temp_dir / "output"
+    DirEntry caches the file type reported by the directory listing, so
+    telling files from directories needs no extra stat call.
     
-    try:
-        # Create a temporary PDF file with the content
-        input_file = temp_dir / "test.pdf"
-        
-        # Create PDF with PyMuPDF
-        doc = fitz.open()
-        page = doc.new_page()
-        
-        try:
-            page.insert_text((50, 50), content, fontsize=12)
-        except:
-            # If insertion fails, skip this example
-            doc.close()
-            assume(False)
-        
-        doc.save(str(input_file))
-        doc.close()
-        
-        # Run CLI with -f parameter
-        result = subprocess.run(
-            [
-                sys.executable, "cli.py",
-                "-f", str(input_file),
-                "--output", str(output_dir)
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        # Verify successful processing
-        # Exit code 0 means success
-        assert result.returncode == 0, f"CLI failed with output: {result.stdout}\n{result.stderr}"
-        
-        # Verify output file was created
-        output_file = output_dir / "test_desensitized.pdf"
-        assert output_file.exists(), f"Output file not created. Output: {result.stdout}"
-        
-        # Verify output file has content
-        assert output_file.stat().st_size > 0, "Output file is empty"
-        
-        # Verify summary shows success
-        assert "成功处理" in result.stdout or "Successful" in result.stdout
-        
-    finally:
-        # Clean up
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+    Returns:
+        List of os.DirEntry objects for all files and directories under root
+    """
+    entries = []
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                entries.append(entry)
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+    return entries
 
 
-@given(content=text_with_sensitive_data())
-@settings(
-    max_examples=5,  # Minimal examples for CLI tests due to subprocess overhead
-    deadline=None,
-    suppress_health_check=[HealthCheck.function_scoped_fixture]
+def _read_summary(summary_path):
+    """Load the {"total", "successful", "failed"} counts written by --summary-json"""
+    return json.loads(summary_path.read_text(encoding='utf-8'))
+
+
+# Hypothesis strategies for generating test data
+
+# Presampled mainland mobile numbers: 1, a second digit 3-9, then 9 digits
+_PHONE_RE = re.compile(r'1[3-9]\d{9}')
+_phone_rng = random.Random(0)
+_PHONES = tuple(
+    f"1{d}{n:09d}"
+    for d in range(3, 10)
+    for n in _phone_rng.sample(range(10**9), 100)
 )
-@pytest.mark.property_test
-def test_cli_docx_file_processing(content):
+
+
+def _build_content_pool(size=64, seed=0):
     """
-    Property 22: CLI Multi-format File Processing
-    Validates: Requirements 11.2, 11.5
+    Build a fixed pool of text contents with embedded sensitive data.
     
-    For any supported file format (DOCX) and valid file path,
-    when the CLI is invoked with -f parameter, the file should be
-    successfully parsed, desensitized, and exported.
+    Each entry is 5-50 CJK characters followed by a phone number, so no
+    entry starts with '=' and XLSX cells never read it as a formula. The pool
+    is generated once at import time with a seeded RNG, so examples sample
+    from it instead of regenerating Chinese text and phone numbers for
+    every example of every test.
     """
-    # Create temporary directories
-    temp_dir = Path(tempfile.mkdtemp())
-    output_dir = temp_dir / "output"
-    
-    try:
-        # Create a temporary DOCX file with the content
-        input_file = temp_dir / "test.docx"
-        
-        # Create DOCX with python-docx
-        doc = Document()
-        doc.add_paragraph(content)
-        doc.save(str(input_file))
-        
-        # Run CLI with -f parameter
-        result = subprocess.run(
-            [
-                sys.executable, "cli.py",
-                "-f", str(input_file),
-                "--output", str(output_dir)
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(size):
+        # Generate base text
+        base_text = ''.join(
+            chr(rng.randint(0x4E00, 0x9FA5))
+            for _ in range(rng.randint(5, 50))
         )
         
-        # Verify successful processing
-        assert result.returncode == 0, f"CLI failed with output: {result.stdout}\n{result.stderr}"
-        
-        # Verify output file was created
-        output_file = output_dir / "test_desensitized.docx"
-        assert output_file.exists(), f"Output file not created. Output: {result.stdout}"
-        
-        # Verify output file has content
-        assert output_file.stat().st_size > 0, "Output file is empty"
+        # Add some sensitive data
+        phone = rng.choice(_PHONES)
         
-        # Verify the output is a valid DOCX and contains desensitized content
-        output_doc = Document(str(output_file))
-        output_text = "\n".join([p.text for p in output_doc.paragraphs])
-        
-        # Should have some content
-        assert len(output_text.strip()) > 0, "Output document has no text"
-        
-        # Verify summary shows success
-        assert "成功处理" in result.stdout or "Successful" in result.stdout
-        
-    finally:
-        # Clean up
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+        # Combine
+        pool.append(f"{base_text}的手机号是{phone}。")
+    return pool
 
 
-@given(content=text_with_sensitive_data())
-@settings(
-    max_examples=5,  # Minimal examples for CLI tests due to subprocess overhead
-    deadline=None,
-    suppress_health_check=[HealthCheck.function_scoped_fixture]
-)
-@pytest.mark.property_test
-def test_cli_xlsx_file_processing(content):
+_CONTENT_POOL = _build_content_pool()
+
+
+# Feature: data-desensitization-platform, Property 22: CLI Multi-format File Processing
+def _write_txt(file_path, content):
+    file_path.write_text(content, encoding='utf-8')
+
+
+def _write_md(file_path, content):
+    file_path.write_text(f"# 测试文档\n\n{content}\n", encoding='utf-8')
+
+
+def _write_docx(file_path, content):
+    doc = Document()
+    doc.add_paragraph(content)
+    doc.save(str(file_path))
+
+
+def _write_xlsx(file_path, content):
+    wb = Workbook()
+    ws = wb.active
+    ws['A1'] = content
+    wb.save(str(file_path))
+    wb.close()
+
+
+def _write_pdf(file_path, content):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((50, 50), content, fontsize=12)
+    doc.save(str(file_path))
+    doc.close()
+
+
+# Input file writers keyed by extension
+_WRITERS = {
+    '.txt': _write_txt,
+    '.md': _write_md,
+    '.docx': _write_docx,
+    '.xlsx': _write_xlsx,
+    '.pdf': _write_pdf,
+}
+
+
+def _read_docx(file_path):
+    return "\n".join(p.text for p in Document(str(file_path)).paragraphs)
+
+
+# Output text readers for formats whose content is checked beyond size
+_READERS = {
+    '.txt': lambda file_path: file_path.read_text(encoding='utf-8'),
+    '.md': lambda file_path: file_path.read_text(encoding='utf-8'),
+    '.docx': _read_docx,
+}
+
+
+def _write_document(file_path, content):
+    """Write content to a new file in the format given by its extension"""
+    _WRITERS[file_path.suffix.lower()](file_path, content)
+
+
+def _run_batch(temp_dir, contents, ext):
     """
-    Property 22: CLI Multi-format File Processing
-    Validates: Requirements 11.2, 11.5
+    Write one file per content into a single input directory and run the
+    CLI once over it with -d, so a whole batch shares one invocation.
     
-    For any supported file format (XLSX) and valid file path,
-    when the CLI is invoked with -f parameter, the file should be
-    successfully parsed, desensitized, and exported.
+    Args:
+        temp_dir: Directory to create the input/ and output/ trees in
+        contents: File contents, one file per entry
+        ext: File extension to create
+        
+    Returns:
+        Expected {stem}_desensitized{ext} output paths, in input order
     """
-    # Skip content that starts with '=' as Excel treats it as a formula
-    assume(not content.startswith('='))
-    
-    # Create temporary directories
-    temp_dir = Path(tempfile.mkdtemp())
+    input_dir = temp_dir / "input"
     output_dir = temp_dir / "output"
+    input_dir.mkdir()
     
-    try:
-        # Create a temporary XLSX file with the content
-        input_file = temp_dir / "test.xlsx"
-        
-        # Create XLSX with openpyxl
-        wb = Workbook()
-        ws = wb.active
-        ws['A1'] = content
-        wb.save(str(input_file))
-        wb.close()
-        
-        # Run CLI with -f parameter
-        result = subprocess.run(
-            [
-                sys.executable, "cli.py",
-                "-f", str(input_file),
-                "--output", str(output_dir)
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        # Verify successful processing
-        assert result.returncode == 0, f"CLI failed with output: {result.stdout}\n{result.stderr}"
-        
-        # Verify output file was created
-        output_file = output_dir / "test_desensitized.xlsx"
-        assert output_file.exists(), f"Output file not created. Output: {result.stdout}"
-        
-        # Verify output file has content
-        assert output_file.stat().st_size > 0, "Output file is empty"
-        
-        # Verify summary shows success
-        assert "成功处理" in result.stdout or "Successful" in result.stdout
-        
-    finally:
-        # Clean up
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+    for i, content in enumerate(contents):
+        _write_document(input_dir / f"test_{i}{ext}", content)
+    
+    summary_path = temp_dir / "summary.json"
+    returncode = _run_cli([
+        "-d", str(input_dir),
+        "--output", str(output_dir)
+    ], summary_path)
+    
+    # Verify successful processing
+    assert returncode == 0, f"CLI failed with exit code {returncode}"
+    
+    # Verify an output file was created for every input, and has content
+    output_files = [output_dir / f"test_{i}_desensitized{ext}" for i in range(len(contents))]
+    for output_file in output_files:
+        assert output_file.exists(), f"Output file {output_file.name} not created"
+        assert output_file.stat().st_size > 0, f"Output file {output_file.name} is empty"
+    
+    # Verify summary shows every file succeeded
+    assert _read_summary(summary_path)["successful"] == len(contents)
+    
+    return output_files
 
 
-@given(content=text_with_sensitive_data())
-@settings(
-    max_examples=5,  # Minimal examples for CLI tests due to subprocess overhead
-    deadline=None,
-    suppress_health_check=[HealthCheck.function_scoped_fixture]
-)
+# Contents for the end-to-end per-format tests; the masking property itself
+# is covered over the whole pool by test_cli_text_desensitization
+_E2E_CONTENTS = _CONTENT_POOL[:3]
+
+
+@pytest.fixture(scope="module")
+def text_processor(tmp_path_factory):
+    """CLI processor shared by the in-memory desensitization tests"""
+    return CLIProcessor(output_dir=str(tmp_path_factory.mktemp("text_output")))
+
+
+@given(content=st.sampled_from(_CONTENT_POOL))
+@cli_settings(max_examples=20)  # No file I/O, so many examples stay cheap
 @pytest.mark.property_test
-def test_cli_txt_file_processing(content):
+def test_cli_text_desensitization(content, text_processor):
     """
     Property 22: CLI Multi-format File Processing
     Validates: Requirements 11.2, 11.5
     
-    For any supported file format (TXT) and valid file path,
-    when the CLI is invoked with -f parameter, the file should be
-    successfully parsed, desensitized, and exported.
+    For any text content with sensitive data, the CLI's desensitization
+    pipeline should mask the sensitive values and keep the surrounding text.
+    Runs on strings directly, without a document format round-trip.
     """
-    # Create temporary directories
-    temp_dir = Path(tempfile.mkdtemp())
-    output_dir = temp_dir / "output"
+    phone = _PHONE_RE.search(content).group()
     
-    try:
-        # Create a temporary TXT file with the content
-        input_file = temp_dir / "test.txt"
-        input_file.write_text(content, encoding='utf-8')
-        
-        # Run CLI with -f parameter
-        result = subprocess.run(
-            [
-                sys.executable, "cli.py",
-                "-f", str(input_file),
-                "--output", str(output_dir)
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        # Verify successful processing
-        assert result.returncode == 0, f"CLI failed with output: {result.stdout}\n{result.stderr}"
-        
-        # Verify output file was created
-        output_file = output_dir / "test_desensitized.txt"
-        assert output_file.exists(), f"Output file not created. Output: {result.stdout}"
-        
-        # Verify output file has content
-        assert output_file.stat().st_size > 0, "Output file is empty"
-        
-        # Verify the output contains desensitized content
-        output_content = output_file.read_text(encoding='utf-8')
-        assert len(output_content.strip()) > 0, "Output file has no content"
-        
-        # Verify summary shows success
-        assert "成功处理" in result.stdout or "Successful" in result.stdout
-        
-    finally:
-        # Clean up
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+    result = text_processor.desensitize_text(content)
+    
+    assert "手机号" in result
+    assert phone not in result, f"Phone number not masked: {result}"
 
 
-@given(content=text_with_sensitive_data())
-@settings(
-    max_examples=3,  # Minimal examples for CLI tests due to subprocess overhead
-    deadline=None,
-    suppress_health_check=[HealthCheck.function_scoped_fixture]
-)
-@pytest.mark.property_test
-@pytest.mark.skip(reason="MD processing times out - needs investigation")
-def test_cli_md_file_processing(content):
+@pytest.mark.parametrize("ext", [
+    '.txt',
+    '.docx',
+    '.xlsx',
+    pytest.param('.pdf', marks=pytest.mark.skip(reason="PDF processing times out - needs investigation")),
+    pytest.param('.md', marks=pytest.mark.skip(reason="MD processing times out - needs investigation")),
+])
+def test_cli_file_processing(ext, tmp_path):
     """
-    Property 22: CLI Multi-format File Processing
+    End-to-end CLI run over a small fixed batch of files in each format.
     Validates: Requirements 11.2, 11.5
     
-    For any supported file format (MD) and valid file path,
-    when the CLI is invoked with -f parameter, the file should be
-    successfully parsed, desensitized, and exported.
+    Integration example for Property 22 (see test_cli_text_desensitization
+    for the property itself): every file in the batch should be parsed,
+    desensitized, and exported to a non-empty output in the same format.
     """
-    # Create temporary directories
-    temp_dir = Path(tempfile.mkdtemp())
-    output_dir = temp_dir / "output"
+    output_files = _run_batch(tmp_path, _E2E_CONTENTS, ext)
     
-    try:
-        # Create a temporary MD file with the content
-        input_file = temp_dir / "test.md"
-        md_content = f"# 测试文档\n\n{content}\n"
-        input_file.write_text(md_content, encoding='utf-8')
-        
-        # Run CLI with -f parameter
-        result = subprocess.run(
-            [
-                sys.executable, "cli.py",
-                "-f", str(input_file),
-                "--output", str(output_dir)
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        # Verify successful processing
-        assert result.returncode == 0, f"CLI failed with output: {result.stdout}\n{result.stderr}"
-        
-        # Verify output file was created
-        output_file = output_dir / "test_desensitized.md"
-        assert output_file.exists(), f"Output file not created. Output: {result.stdout}"
-        
-        # Verify output file has content
-        assert output_file.stat().st_size > 0, "Output file is empty"
-        
-        # Verify the output contains desensitized content
-        output_content = output_file.read_text(encoding='utf-8')
-        assert len(output_content.strip()) > 0, "Output file has no content"
-        
-        # Verify summary shows success
-        assert "成功处理" in result.stdout or "Successful" in result.stdout
-        
-    finally:
-        # Clean up
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+    # Verify the outputs are readable and contain text
+    read_text = _READERS.get(ext)
+    if read_text is not None:
+        for output_file in output_files:
+            assert len(read_text(output_file).strip()) > 0, \
+                f"Output file {output_file.name} has no content"
 
 
 # Feature: data-desensitization-platform, Property 23: CLI Directory Recursive Processing
-@st.composite
-def directory_structure(draw):
+
+# Number of pre-built directory trees per directory property
+_TREE_COUNT = 5
+
+# Extensions used for files in the directory trees
+_TREE_EXTENSIONS = ['.txt', '.docx', '.xlsx']
+
+
+def _directory_structure(rng):
     """
-    Generate a directory structure with files at various nesting levels.
+    Build a directory structure with files at various nesting levels.
     
-    Returns a tuple of (directory_structure_dict, expected_file_count)
-    where directory_structure_dict maps relative paths to file contents.
+    Args:
+        rng: Random number generator to draw the layout from
+        
+    Returns:
+        Dict mapping relative paths to file contents
     """
-    # Generate number of nesting levels (1-3 levels deep)
-    max_depth = draw(st.integers(min_value=1, max_value=3))
+    # Number of nesting levels (1-3 levels deep)
+    max_depth = rng.randint(1, 3)
     
-    # Generate number of files per level (1-3 files)
-    files_per_level = draw(st.integers(min_value=1, max_value=3))
-    
-    # Supported extensions
-    extensions = ['.txt', '.docx', '.xlsx']
+    # Number of files per level (1-3 files)
+    files_per_level = rng.randint(1, 3)
     
     structure = {}
-    file_count = 0
     
-    # Generate files at root level
+    # Files at root level
     for i in range(files_per_level):
-        ext = draw(st.sampled_from(extensions))
-        filename = f"file_{i}{ext}"
-        content = draw(text_with_sensitive_data())
-        structure[filename] = content
-        file_count += 1
+        ext = rng.choice(_TREE_EXTENSIONS)
+        structure[f"file_{i}{ext}"] = rng.choice(_CONTENT_POOL)
     
-    # Generate nested directories and files
+    # Nested directories and files
     for depth in range(1, max_depth + 1):
-        # Create subdirectory name
         subdir = "/".join([f"level{d}" for d in range(1, depth + 1)])
-        
-        # Add files in this subdirectory
         for i in range(files_per_level):
-            ext = draw(st.sampled_from(extensions))
-            filename = f"{subdir}/file_{depth}_{i}{ext}"
-            content = draw(text_with_sensitive_data())
-            structure[filename] = content
-            file_count += 1
+            ext = rng.choice(_TREE_EXTENSIONS)
+            structure[f"{subdir}/file_{depth}_{i}{ext}"] = rng.choice(_CONTENT_POOL)
     
-    return structure, file_count
+    return structure
 
 
-@given(dir_structure=directory_structure())
-@settings(
-    max_examples=5,  # Minimal examples due to subprocess overhead
-    deadline=None,
-    suppress_health_check=[HealthCheck.function_scoped_fixture]
-)
+def _materialize_trees(root, build_structure, seed):
+    """
+    Write _TREE_COUNT directory trees to disk.
+    
+    The trees only serve as CLI input and are never modified, so they are
+    built once per session and shared by every example that picks them.
+    
+    Args:
+        root: Directory to create the trees in
+        build_structure: Function returning a {relative_path: content} dict
+        seed: Seed for the layout RNG
+        
+    Returns:
+        List of (input_dir, structure) tuples
+    """
+    rng = random.Random(seed)
+    trees = []
+    for n in range(_TREE_COUNT):
+        structure = build_structure(rng)
+        input_dir = root / f"tree_{n}"
+        for relative_path, content in structure.items():
+            file_path = input_dir / relative_path
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_document(file_path, content)
+        trees.append((input_dir, structure))
+    return trees
+
+
+@pytest.fixture(scope="session")
+def directory_trees(tmp_path_factory):
+    """Directory trees for Property 23, written once per session"""
+    return _materialize_trees(tmp_path_factory.mktemp("shared"), _directory_structure, seed=23)
+
+
+@given(tree_index=st.sampled_from(range(_TREE_COUNT)))
+@cli_settings()
 @pytest.mark.property_test
-def test_cli_directory_recursive_processing(dir_structure):
+@pytest.mark.slow
+def test_cli_directory_recursive_processing(tree_index, directory_trees, tmp_path):
     """
     Property 23: CLI Directory Recursive Processing
     Validates: Requirements 11.3, 11.4
@@ -624,108 +581,49 @@ def test_cli_directory_recursive_processing(dir_structure):
     when the CLI is invoked with -d parameter, all supported files in all
     subdirectories should be processed.
     """
-    structure, expected_file_count = dir_structure
+    input_dir, structure = directory_trees[tree_index]
+    created_files = list(structure)
     
-    # Create temporary directories
-    temp_dir = Path(tempfile.mkdtemp())
-    input_dir = temp_dir / "input"
+    # Create a fresh directory for this example
+    temp_dir = _example_dir(tmp_path)
     output_dir = temp_dir / "output"
-    input_dir.mkdir()
     
-    try:
-        # Create the directory structure with files
-        created_files = []
-        for relative_path, content in structure.items():
-            file_path = input_dir / relative_path
-            
-            # Create parent directories if needed
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Create file based on extension
-            ext = file_path.suffix.lower()
-            
-            if ext == '.txt':
-                file_path.write_text(content, encoding='utf-8')
-                created_files.append(relative_path)
-            
-            elif ext == '.docx':
-                doc = Document()
-                doc.add_paragraph(content)
-                doc.save(str(file_path))
-                created_files.append(relative_path)
-            
-            elif ext == '.xlsx':
-                # Skip content that starts with '=' as Excel treats it as a formula
-                if not content.startswith('='):
-                    wb = Workbook()
-                    ws = wb.active
-                    ws['A1'] = content
-                    wb.save(str(file_path))
-                    wb.close()
-                    created_files.append(relative_path)
-                else:
-                    # Skip this file
-                    expected_file_count -= 1
-        
-        # Skip test if no files were created
-        assume(len(created_files) > 0)
-        
-        # Run CLI with -d parameter
-        result = subprocess.run(
-            [
-                sys.executable, "cli.py",
-                "-d", str(input_dir),
-                "--output", str(output_dir)
-            ],
-            capture_output=True,
-            text=True,
-            timeout=60  # Longer timeout for directory processing
-        )
-        
-        # Verify successful processing (exit code 0 or 1 if some files failed)
-        assert result.returncode in [0, 1], f"CLI failed with unexpected exit code: {result.returncode}\nOutput: {result.stdout}\n{result.stderr}"
-        
-        # Verify all files were processed (check summary)
-        output = result.stdout
-        assert "总文件数" in output or "Total Files" in output, f"Summary not found in output: {output}"
-        
-        # Extract the total files count from summary
-        # The summary should show the number of files processed
-        import re
-        total_match = re.search(r'总文件数.*?(\d+)|Total Files.*?(\d+)', output)
-        if total_match:
-            total_processed = int(total_match.group(1) or total_match.group(2))
-            # Should process all created files
-            assert total_processed == len(created_files), \
-                f"Expected {len(created_files)} files to be processed, but got {total_processed}. Output: {output}"
-        
-        # Verify output files were created for each input file
-        for relative_path in created_files:
-            # Generate expected output filename
-            input_path = Path(relative_path)
-            stem = input_path.stem
-            suffix = input_path.suffix
-            output_filename = f"{stem}_desensitized{suffix}"
-            
-            # Output file should exist
-            output_file = output_dir / output_filename
-            assert output_file.exists(), \
-                f"Output file not created for {relative_path}. Expected: {output_file}. Output: {output}"
-            
-            # Output file should have content
-            assert output_file.stat().st_size > 0, \
-                f"Output file is empty for {relative_path}"
+    # Run CLI with -d parameter
+    summary_path = temp_dir / "summary.json"
+    returncode = _run_cli([
+        "-d", str(input_dir),
+        "--output", str(output_dir)
+    ], summary_path)
+    
+    # Verify successful processing (exit code 0 or 1 if some files failed)
+    assert returncode in [0, 1], f"CLI failed with unexpected exit code: {returncode}"
+    
+    # Verify all files were processed (check summary)
+    summary = _read_summary(summary_path)
+    
+    # Should process all created files
+    assert summary["total"] == len(created_files), \
+        f"Expected {len(created_files)} files to be processed, but got {summary['total']}"
+    
+    # Verify output files were created for each input file
+    for relative_path in created_files:
+        # Generate expected output path (relative directories are preserved)
+        input_path = Path(relative_path)
+        stem = input_path.stem
+        suffix = input_path.suffix
+        output_filename = f"{stem}_desensitized{suffix}"
         
-        # Verify at least some files were successfully processed
-        success_match = re.search(r'成功处理.*?(\d+)|Successful.*?(\d+)', output)
-        if success_match:
-            successful = int(success_match.group(1) or success_match.group(2))
-            assert successful > 0, f"No files were successfully processed. Output: {output}"
+        # Output file should exist
+        output_file = output_dir / input_path.parent / output_filename
+        assert output_file.exists(), \
+            f"Output file not created for {relative_path}. Expected: {output_file}"
         
-    finally:
-        # Clean up
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+        # Output file should have content
+        assert output_file.stat().st_size > 0, \
+            f"Output file is empty for {relative_path}"
+    
+    # Verify at least some files were successfully processed
+    assert summary["successful"] > 0, f"No files were successfully processed. Summary: {summary}"
 
 
 
@@ -771,22 +669,41 @@ def filename_and_content(draw):
     assume(len(filename_stem) > 0)
     
     # Generate content with sensitive data
-    content = draw(text_with_sensitive_data())
+    content = draw(st.sampled_from(_CONTENT_POOL))
     
     return filename_stem, content
 
 
+@pytest.fixture(scope="session")
+def rendered_documents(tmp_path_factory):
+    """
+    Render each (extension, content) pair to a document once per session.
+    
+    Returns a function giving the path of the rendered file. Examples copy it
+    into place instead of rebuilding the DOCX/XLSX package every time.
+    """
+    cache_dir = tmp_path_factory.mktemp("rendered")
+    cache = {}
+    
+    def render(extension, content):
+        path = cache.get((extension, content))
+        if path is None:
+            path = cache_dir / f"{len(cache)}{extension}"
+            _write_document(path, content)
+            cache[(extension, content)] = path
+        return path
+    
+    return render
+
+
 @given(
     file_data=filename_and_content(),
     extension=st.sampled_from(['.txt', '.docx', '.xlsx'])
 )
-@settings(
-    max_examples=10,  # Test multiple filename patterns
-    deadline=None,
-    suppress_health_check=[HealthCheck.function_scoped_fixture]
-)
+@cli_settings()
 @pytest.mark.property_test
-def test_cli_output_file_naming_convention(file_data, extension):
+@pytest.mark.slow
+def test_cli_output_file_naming_convention(file_data, extension, rendered_documents, tmp_path):
     """
     Property 24: CLI Output File Creation with Correct Naming
     Validates: Requirements 11.7, 11.10
@@ -797,142 +714,108 @@ def test_cli_output_file_naming_convention(file_data, extension):
     """
     filename_stem, content = file_data
     
-    # Skip content that starts with '=' for Excel files
-    if extension == '.xlsx' and content.startswith('='):
-        assume(False)
-    
-    # Create temporary directories
-    temp_dir = Path(tempfile.mkdtemp())
+    # Create a fresh directory for this example
+    temp_dir = _example_dir(tmp_path)
     output_dir = temp_dir / "output"
     
-    try:
-        # Create input file with the generated filename
-        input_filename = f"{filename_stem}{extension}"
-        input_file = temp_dir / input_filename
-        
-        # Create file based on extension
-        if extension == '.txt':
-            input_file.write_text(content, encoding='utf-8')
-        
-        elif extension == '.docx':
-            doc = Document()
-            doc.add_paragraph(content)
-            doc.save(str(input_file))
-        
-        elif extension == '.xlsx':
-            wb = Workbook()
-            ws = wb.active
-            ws['A1'] = content
-            wb.save(str(input_file))
-            wb.close()
-        
-        # Run CLI with -f parameter
-        result = subprocess.run(
-            [
-                sys.executable, "cli.py",
-                "-f", str(input_file),
-                "--output", str(output_dir)
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        # Verify successful processing
-        assert result.returncode == 0, \
-            f"CLI failed with output: {result.stdout}\n{result.stderr}"
-        
-        # Verify output directory was created
-        assert output_dir.exists(), \
-            f"Output directory not created. Output: {result.stdout}"
-        
-        # Verify output file follows naming convention: {stem}_desensitized{ext}
-        expected_output_filename = f"{filename_stem}_desensitized{extension}"
-        expected_output_file = output_dir / expected_output_filename
-        
-        assert expected_output_file.exists(), \
-            f"Output file not found with expected name: {expected_output_filename}\n" \
-            f"Files in output dir: {list(output_dir.iterdir())}\n" \
-            f"CLI output: {result.stdout}"
-        
-        # Verify output file has content (not empty)
-        assert expected_output_file.stat().st_size > 0, \
-            f"Output file {expected_output_filename} is empty"
-        
-        # Verify the file is in the correct location (output directory)
-        assert expected_output_file.parent == output_dir, \
-            f"Output file not in correct directory. Expected: {output_dir}, Got: {expected_output_file.parent}"
-        
-        # Verify only one file was created (no extra files)
-        output_files = list(output_dir.iterdir())
-        assert len(output_files) == 1, \
-            f"Expected exactly 1 output file, but found {len(output_files)}: {output_files}"
-        
-        # Verify the created file matches our expected filename exactly
-        assert output_files[0].name == expected_output_filename, \
-            f"Output filename mismatch. Expected: {expected_output_filename}, Got: {output_files[0].name}"
-        
-        # Verify summary shows success
-        assert "成功处理" in result.stdout or "Successful" in result.stdout, \
-            f"Success message not found in output: {result.stdout}"
-        
-    finally:
-        # Clean up
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+    # Create input file with the generated filename
+    input_filename = f"{filename_stem}{extension}"
+    input_file = temp_dir / input_filename
+    
+    # Create file based on extension
+    shutil.copyfile(rendered_documents(extension, content), input_file)
+    
+    # Run CLI with -f parameter
+    summary_path = temp_dir / "summary.json"
+    returncode = _run_cli([
+        "-f", str(input_file),
+        "--output", str(output_dir)
+    ], summary_path)
+    
+    # Verify successful processing
+    assert returncode == 0, f"CLI failed with exit code {returncode}"
+    
+    # Verify output directory was created
+    assert output_dir.exists(), \
+        "Output directory not created"
+    
+    # Verify output file follows naming convention: {stem}_desensitized{ext}
+    expected_output_filename = f"{filename_stem}_desensitized{extension}"
+    expected_output_file = output_dir / expected_output_filename
+    
+    assert expected_output_file.exists(), \
+        f"Output file not found with expected name: {expected_output_filename}\n" \
+        f"Files in output dir: {list(output_dir.iterdir())}"
+    
+    # Verify output file has content (not empty)
+    assert expected_output_file.stat().st_size > 0, \
+        f"Output file {expected_output_filename} is empty"
+    
+    # Verify the file is in the correct location (output directory)
+    assert expected_output_file.parent == output_dir, \
+        f"Output file not in correct directory. Expected: {output_dir}, Got: {expected_output_file.parent}"
+    
+    # Verify only one file was created (no extra files)
+    output_files = list(output_dir.iterdir())
+    assert len(output_files) == 1, \
+        f"Expected exactly 1 output file, but found {len(output_files)}: {output_files}"
+    
+    # Verify the created file matches our expected filename exactly
+    assert output_files[0].name == expected_output_filename, \
+        f"Output filename mismatch. Expected: {expected_output_filename}, Got: {output_files[0].name}"
+    
+    # Verify summary shows success
+    summary = _read_summary(summary_path)
+    assert summary["successful"] == 1, f"Unexpected summary: {summary}"
 
 
 # Feature: data-desensitization-platform, Property 25: CLI Directory Structure Preservation
-@st.composite
-def nested_directory_structure(draw):
+def _nested_directory_structure(rng):
     """
-    Generate a nested directory structure with files at various levels.
+    Build a nested directory structure with files at various levels.
     
-    Returns a dict mapping relative paths to file contents.
     The structure will have subdirectories to test structure preservation.
-    """
-    # Generate number of subdirectory levels (1-3 levels)
-    max_depth = draw(st.integers(min_value=1, max_value=3))
     
-    # Generate number of files per directory (1-2 files to keep it manageable)
-    files_per_dir = draw(st.integers(min_value=1, max_value=2))
+    Args:
+        rng: Random number generator to draw the layout from
+        
+    Returns:
+        Dict mapping relative paths to file contents
+    """
+    # Number of subdirectory levels (1-3 levels)
+    max_depth = rng.randint(1, 3)
     
-    # Supported extensions
-    extensions = ['.txt', '.docx', '.xlsx']
+    # Number of files per directory (1-2 files to keep it manageable)
+    files_per_dir = rng.randint(1, 2)
     
     structure = {}
     
-    # Generate files at root level
+    # Files at root level
     for i in range(files_per_dir):
-        ext = draw(st.sampled_from(extensions))
-        filename = f"root_file_{i}{ext}"
-        content = draw(text_with_sensitive_data())
-        structure[filename] = content
+        ext = rng.choice(_TREE_EXTENSIONS)
+        structure[f"root_file_{i}{ext}"] = rng.choice(_CONTENT_POOL)
     
-    # Generate nested directories with files
+    # Nested directories with files
     for depth in range(1, max_depth + 1):
-        # Create subdirectory path
-        subdir_parts = [f"subdir_{d}" for d in range(1, depth + 1)]
-        subdir = "/".join(subdir_parts)
-        
-        # Add files in this subdirectory
+        subdir = "/".join([f"subdir_{d}" for d in range(1, depth + 1)])
         for i in range(files_per_dir):
-            ext = draw(st.sampled_from(extensions))
-            filename = f"{subdir}/nested_file_{depth}_{i}{ext}"
-            content = draw(text_with_sensitive_data())
-            structure[filename] = content
+            ext = rng.choice(_TREE_EXTENSIONS)
+            structure[f"{subdir}/nested_file_{depth}_{i}{ext}"] = rng.choice(_CONTENT_POOL)
     
     return structure
 
 
-@given(dir_structure=nested_directory_structure())
-@settings(
-    max_examples=5,  # Minimal examples due to subprocess overhead
-    deadline=None,
-    suppress_health_check=[HealthCheck.function_scoped_fixture]
-)
+@pytest.fixture(scope="session")
+def nested_directory_trees(tmp_path_factory):
+    """Directory trees for Property 25, written once per session"""
+    return _materialize_trees(tmp_path_factory.mktemp("shared"), _nested_directory_structure, seed=25)
+
+
+@given(tree_index=st.sampled_from(range(_TREE_COUNT)))
+@cli_settings()
 @pytest.mark.property_test
-def test_cli_directory_structure_preservation(dir_structure):
+@pytest.mark.slow
+def test_cli_directory_structure_preservation(tree_index, nested_directory_trees, tmp_path):
     """
     Property 25: CLI Directory Structure Preservation
     Validates: Requirements 11.9
@@ -956,140 +839,86 @@ def test_cli_directory_structure_preservation(dir_structure):
           subdir2/
             file3_desensitized.txt
     """
-    # Create temporary directories
-    temp_dir = Path(tempfile.mkdtemp())
-    input_dir = temp_dir / "input"
+    input_dir, structure = nested_directory_trees[tree_index]
+    created_files = list(structure)
+    
+    # Create a fresh directory for this example
+    temp_dir = _example_dir(tmp_path)
     output_dir = temp_dir / "output"
-    input_dir.mkdir()
     
-    try:
-        # Create the directory structure with files
-        created_files = {}  # Maps relative path to expected output path
-        
-        for relative_path, content in dir_structure.items():
-            file_path = input_dir / relative_path
-            
-            # Create parent directories if needed
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Create file based on extension
-            ext = file_path.suffix.lower()
-            
-            if ext == '.txt':
-                file_path.write_text(content, encoding='utf-8')
-                created_files[relative_path] = relative_path
-            
-            elif ext == '.docx':
-                doc = Document()
-                doc.add_paragraph(content)
-                doc.save(str(file_path))
-                created_files[relative_path] = relative_path
-            
-            elif ext == '.xlsx':
-                # Skip content that starts with '=' as Excel treats it as a formula
-                if not content.startswith('='):
-                    wb = Workbook()
-                    ws = wb.active
-                    ws['A1'] = content
-                    wb.save(str(file_path))
-                    wb.close()
-                    created_files[relative_path] = relative_path
-        
-        # Skip test if no files were created
-        assume(len(created_files) > 0)
-        
-        # Run CLI with -d parameter
-        result = subprocess.run(
-            [
-                sys.executable, "cli.py",
-                "-d", str(input_dir),
-                "--output", str(output_dir)
-            ],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-        
-        # Verify successful processing (exit code 0 or 1 if some files failed)
-        assert result.returncode in [0, 1], \
-            f"CLI failed with unexpected exit code: {result.returncode}\nOutput: {result.stdout}\n{result.stderr}"
-        
-        # Verify output directory was created
-        assert output_dir.exists(), \
-            f"Output directory not created. Output: {result.stdout}"
-        
-        # For each input file, verify the output file exists with preserved directory structure
-        for input_relative_path in created_files.keys():
-            input_path = Path(input_relative_path)
-            
-            # Calculate expected output path with preserved directory structure
-            # The directory structure should be preserved, with _desensitized suffix added to filename
-            parent_dirs = input_path.parent
-            stem = input_path.stem
-            suffix = input_path.suffix
-            
-            # Expected output: same directory structure, filename with _desensitized suffix
-            expected_output_relative = parent_dirs / f"{stem}_desensitized{suffix}"
-            expected_output_path = output_dir / expected_output_relative
-            
-            # Verify the output file exists at the expected location
-            assert expected_output_path.exists(), \
-                f"Output file not found at expected location with preserved structure.\n" \
-                f"Input: {input_relative_path}\n" \
-                f"Expected output: {expected_output_relative}\n" \
-                f"Full path: {expected_output_path}\n" \
-                f"Output dir contents: {list(output_dir.rglob('*'))}\n" \
-                f"CLI output: {result.stdout}"
-            
-            # Verify the output file has content
-            assert expected_output_path.stat().st_size > 0, \
-                f"Output file is empty: {expected_output_relative}"
-            
-            # Verify parent directory structure is preserved
-            if parent_dirs != Path('.'):
-                # Check that the subdirectory exists in output
-                expected_subdir = output_dir / parent_dirs
-                assert expected_subdir.exists() and expected_subdir.is_dir(), \
-                    f"Subdirectory not preserved in output: {parent_dirs}\n" \
-                    f"Expected: {expected_subdir}\n" \
-                    f"Output dir structure: {list(output_dir.rglob('*'))}"
-        
-        # Verify the directory structure depth is preserved
-        # Count directory levels in input
-        input_max_depth = max(
-            len(Path(p).parts) - 1  # -1 because we don't count the filename
-            for p in created_files.keys()
-        )
-        
-        # Count directory levels in output (excluding files)
-        output_dirs = [p for p in output_dir.rglob('*') if p.is_dir()]
-        if output_dirs:
-            output_max_depth = max(
-                len(p.relative_to(output_dir).parts)
-                for p in output_dirs
-            )
+    # Run CLI with -d parameter
+    summary_path = temp_dir / "summary.json"
+    returncode = _run_cli([
+        "-d", str(input_dir),
+        "--output", str(output_dir)
+    ], summary_path)
+    
+    # Verify successful processing (exit code 0 or 1 if some files failed)
+    assert returncode in [0, 1], \
+        f"CLI failed with unexpected exit code: {returncode}"
+    
+    # Verify output directory was created
+    assert output_dir.exists(), \
+        "Output directory not created"
+    
+    # Index the output tree in one walk: relative path -> stat result for
+    # files, and the set of relative directories
+    output_files = {}
+    output_dirs = set()
+    for entry in _walk(output_dir):
+        relative = Path(os.path.relpath(entry.path, output_dir))
+        if entry.is_dir(follow_symlinks=False):
+            output_dirs.add(relative)
         else:
-            output_max_depth = 0
-        
-        # Output should have the same directory depth as input
-        assert output_max_depth == input_max_depth, \
-            f"Directory depth not preserved. Input depth: {input_max_depth}, Output depth: {output_max_depth}\n" \
-            f"Input structure: {list(created_files.keys())}\n" \
-            f"Output structure: {[str(p.relative_to(output_dir)) for p in output_dir.rglob('*')]}"
-        
-        # Verify summary shows success for at least some files
-        output = result.stdout
-        assert "总文件数" in output or "Total Files" in output, \
-            f"Summary not found in output: {output}"
-        
-        import re
-        success_match = re.search(r'成功处理.*?(\d+)|Successful.*?(\d+)', output)
-        if success_match:
-            successful = int(success_match.group(1) or success_match.group(2))
-            assert successful > 0, \
-                f"No files were successfully processed. Output: {output}"
-        
-    finally:
-        # Clean up
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+            output_files[relative] = entry.stat(follow_symlinks=False)
+    
+    # For each input file, verify the output file exists with preserved directory structure
+    for input_relative_path in created_files:
+        input_path = Path(input_relative_path)
+        
+        # Calculate expected output path with preserved directory structure
+        # The directory structure should be preserved, with _desensitized suffix added to filename
+        parent_dirs = input_path.parent
+        stem = input_path.stem
+        suffix = input_path.suffix
+        
+        # Expected output: same directory structure, filename with _desensitized suffix
+        expected_output_relative = parent_dirs / f"{stem}_desensitized{suffix}"
+        output_stat = output_files.get(expected_output_relative)
+        
+        # Verify the output file exists at the expected location
+        assert output_stat is not None, \
+            f"Output file not found at expected location with preserved structure.\n" \
+            f"Input: {input_relative_path}\n" \
+            f"Expected output: {expected_output_relative}\n" \
+            f"Output files: {sorted(map(str, output_files))}"
+        
+        # Verify the output file has content
+        assert output_stat.st_size > 0, \
+            f"Output file is empty: {expected_output_relative}"
+        
+        # Verify parent directory structure is preserved
+        if parent_dirs != Path('.'):
+            # Check that the subdirectory exists in output
+            assert parent_dirs in output_dirs, \
+                f"Subdirectory not preserved in output: {parent_dirs}\n" \
+                f"Output directories: {sorted(map(str, output_dirs))}"
+    
+    # Verify the directory structure depth is preserved
+    # Count directory levels in input
+    # (structure keys always use '/' separators, one per directory level)
+    input_max_depth = max(p.count('/') for p in created_files)
+    
+    # Count directory levels in output (excluding files)
+    output_max_depth = max((len(d.parts) for d in output_dirs), default=0)
+    
+    # Output should have the same directory depth as input
+    assert output_max_depth == input_max_depth, \
+        f"Directory depth not preserved. Input depth: {input_max_depth}, Output depth: {output_max_depth}\n" \
+        f"Input structure: {list(created_files)}\n" \
+        f"Output structure: {sorted(map(str, output_dirs | set(output_files)))}"
+    
+    # Verify summary shows success for at least some files
+    summary = _read_summary(summary_path)
+    assert summary["successful"] > 0, \
+        f"No files were successfully processed. Summary: {summary}"
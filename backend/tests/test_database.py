@@ -1,5 +1,5 @@
 import pytest
-from sqlalchemy import inspect
+from sqlalchemy import insert
 from app.models import Task, SensitiveItem, DesensitizationRule, OperationLog
 from app.schemas import FileType, TaskStatus, DataType, StrategyType
 
@@ -12,9 +12,9 @@ def test_database_connection(test_engine):
     connection.close()
 
 
-def test_tables_created(test_engine):
+def test_tables_created(test_inspector):
     """Test that all required tables are created"""
-    inspector = inspect(test_engine)
+    inspector = test_inspector
     tables = inspector.get_table_names()
     
     assert "tasks" in tables
@@ -23,77 +23,47 @@ def test_tables_created(test_engine):
     assert "operation_logs" in tables
 
 
-def test_task_table_structure(test_engine):
-    """Test that tasks table has correct columns"""
-    inspector = inspect(test_engine)
-    columns = {col['name']: col for col in inspector.get_columns('tasks')}
-    
-    assert 'id' in columns
-    assert 'filename' in columns
-    assert 'file_size' in columns
-    assert 'file_type' in columns
-    assert 'upload_time' in columns
-    assert 'status' in columns
-    assert 'content' in columns
-    assert 'file_metadata' in columns
-    assert 'created_at' in columns
-    assert 'updated_at' in columns
-
-
-def test_sensitive_items_table_structure(test_engine):
-    """Test that sensitive_items table has correct columns"""
-    inspector = inspect(test_engine)
-    columns = {col['name']: col for col in inspector.get_columns('sensitive_items')}
-    
-    assert 'id' in columns
-    assert 'task_id' in columns
-    assert 'type' in columns
-    assert 'value' in columns
-    assert 'start_pos' in columns
-    assert 'end_pos' in columns
-    assert 'confidence' in columns
-    assert 'created_at' in columns
-
-
-def test_desensitization_rules_table_structure(test_engine):
-    """Test that desensitization_rules table has correct columns"""
-    inspector = inspect(test_engine)
-    columns = {col['name']: col for col in inspector.get_columns('desensitization_rules')}
-    
-    assert 'id' in columns
-    assert 'name' in columns
-    assert 'data_type' in columns
-    assert 'strategy' in columns
-    assert 'is_system' in columns
-    assert 'enabled' in columns
-    assert 'created_at' in columns
-    assert 'updated_at' in columns
-
-
-def test_operation_logs_table_structure(test_engine):
-    """Test that operation_logs table has correct columns"""
-    inspector = inspect(test_engine)
-    columns = {col['name']: col for col in inspector.get_columns('operation_logs')}
-    
-    assert 'id' in columns
-    assert 'task_id' in columns
-    assert 'operation_type' in columns
-    assert 'user_id' in columns
-    assert 'details' in columns
-    assert 'created_at' in columns
+@pytest.fixture(scope="module")
+def table_columns(test_inspector):
+    """Column names of every table, reflected in a single pass"""
+    return {
+        table: {col['name'] for col in columns}
+        for (_, table), columns in test_inspector.get_multi_columns().items()
+    }
+
+
+@pytest.mark.parametrize("table,expected_columns", [
+    ("tasks", {
+        'id', 'filename', 'file_size', 'file_type', 'upload_time', 'status',
+        'content', 'file_metadata', 'created_at', 'updated_at'
+    }),
+    ("sensitive_items", {
+        'id', 'task_id', 'type', 'value', 'start_pos', 'end_pos',
+        'confidence', 'created_at'
+    }),
+    ("desensitization_rules", {
+        'id', 'name', 'data_type', 'strategy', 'is_system', 'enabled',
+        'created_at', 'updated_at'
+    }),
+    ("operation_logs", {
+        'id', 'task_id', 'operation_type', 'user_id', 'details', 'created_at'
+    }),
+])
+def test_table_structure(table_columns, table, expected_columns):
+    """Test that each table has the correct columns"""
+    missing = expected_columns - table_columns[table]
+    assert not missing, f"{table} is missing columns: {sorted(missing)}"
 
 
 def test_create_task(test_db):
     """Test creating a task record"""
-    task = Task(
+    task = test_db.execute(insert(Task).values(
         filename="test.pdf",
         file_size=1024,
         file_type=FileType.PDF.value,
         status=TaskStatus.UPLOADED.value
-    )
-    test_db.add(task)
+    ).returning(Task)).scalar_one()
     test_db.commit()
-    test_db.refresh(task)
     
     assert task.id is not None
     assert task.filename == "test.pdf"
@@ -105,47 +75,40 @@ def test_create_task(test_db):
 def test_create_sensitive_item(test_db):
     """Test creating a sensitive item record"""
     # First create a task
-    task = Task(
+    task_id = test_db.execute(insert(Task).values(
         filename="test.pdf",
         file_size=1024,
         file_type=FileType.PDF.value,
         status=TaskStatus.UPLOADED.value
-    )
-    test_db.add(task)
-    test_db.commit()
-    test_db.refresh(task)
+    ).returning(Task.id)).scalar_one()
     
-    # Create sensitive item
-    item = SensitiveItem(
-        task_id=task.id,
+    # Create sensitive item in the same transaction
+    item = test_db.execute(insert(SensitiveItem).values(
+        task_id=task_id,
         type=DataType.PHONE.value,
         value="13812345678",
         start_pos=0,
         end_pos=11,
         confidence=0.95
-    )
-    test_db.add(item)
+    ).returning(SensitiveItem)).scalar_one()
     test_db.commit()
-    test_db.refresh(item)
     
     assert item.id is not None
-    assert item.task_id == task.id
+    assert item.task_id == task_id
     assert item.type == DataType.PHONE.value
     assert item.value == "13812345678"
 
 
 def test_create_desensitization_rule(test_db):
     """Test creating a desensitization rule record"""
-    rule = DesensitizationRule(
+    rule = test_db.execute(insert(DesensitizationRule).values(
         name="手机号脱敏",
         data_type=DataType.PHONE.value,
         strategy=StrategyType.MASK.value,
         is_system=True,
         enabled=True
-    )
-    test_db.add(rule)
+    ).returning(DesensitizationRule)).scalar_one()
     test_db.commit()
-    test_db.refresh(rule)
     
     assert rule.id is not None
     assert rule.name == "手机号脱敏"
@@ -155,14 +118,12 @@ def test_create_desensitization_rule(test_db):
 
 def test_create_operation_log(test_db):
     """Test creating an operation log record"""
-    log = OperationLog(
+    log = test_db.execute(insert(OperationLog).values(
         operation_type="upload",
         user_id="test_user",
         details={"filename": "test.pdf"}
-    )
-    test_db.add(log)
+    ).returning(OperationLog)).scalar_one()
     test_db.commit()
-    test_db.refresh(log)
     
     assert log.id is not None
     assert log.operation_type == "upload"
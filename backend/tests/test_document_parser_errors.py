@@ -4,9 +4,11 @@ Unit tests for Document Parser error handling
 Tests error conditions and edge cases for document parsing.
 """
 
+import io
+import re
+import zipfile
+
 import pytest
-import tempfile
-import os
 from pathlib import Path
 
 from app.document_parser import DocumentParser, ParsedDocument, DocumentParsingError
@@ -17,260 +19,136 @@ from docx import Document
 from openpyxl import Workbook
 
 
+@pytest.fixture(scope="module")
+def empty_documents(tmp_path_factory):
+    """
+    Smallest valid PDF/DOCX/XLSX files with no text, built once per module
+    
+    Returns:
+        Dict mapping file type to the path of its empty document
+    """
+    root = tmp_path_factory.mktemp("empty_documents")
+    paths = {suffix: str(root / f"empty.{suffix}") for suffix in ("pdf", "docx", "xlsx")}
+    
+    # PyMuPDF can't save a document with zero pages, so use one blank page
+    doc = fitz.open()
+    doc.new_page()
+    doc.save(paths["pdf"])
+    doc.close()
+    
+    # python-docx creates documents with an empty default paragraph
+    Document().save(paths["docx"])
+    
+    # openpyxl creates a sheet with dimensions but no actual content
+    wb = Workbook()
+    wb.save(paths["xlsx"])
+    wb.close()
+    
+    return paths
+
+
+def _xlsx_with_dimension(path, dimension):
+    """
+    Write a sparse XLSX file whose stored <dimension> record is rewritten
+    
+    Args:
+        path: Where to write the workbook
+        dimension: Replacement range (e.g. "A1:A1"), or None to drop the record
+        
+    Returns:
+        Text of every cell written
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws['A1'] = "header"
+    ws['C5'] = "手机13812345678"
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    wb.close()
+    
+    replacement = "" if dimension is None else f'<dimension ref="{dimension}"/>'
+    with zipfile.ZipFile(buffer) as source, zipfile.ZipFile(path, "w") as target:
+        for item in source.infolist():
+            data = source.read(item)
+            if item.filename.startswith("xl/worksheets/sheet"):
+                data = re.sub(rb'<dimension ref="[^"]*"/>', replacement.encode(), data)
+            target.writestr(item, data)
+    
+    return ["header", "手机13812345678"]
+
+
+@pytest.fixture(scope="module")
+def parser():
+    """Document parser shared by the tests in this module"""
+    return DocumentParser()
+
+
 class TestDocumentParserErrors:
     """Test error handling in DocumentParser"""
     
-    def test_unsupported_format(self):
+    def test_unsupported_format(self, parser):
         """Test that unsupported file formats are rejected"""
-        parser = DocumentParser()
-        
         with pytest.raises(DocumentParsingError) as exc_info:
             parser.parse("test.xyz", "xyz")
         
         assert exc_info.value.error_code == "UNSUPPORTED_FORMAT"
         assert "unsupported" in exc_info.value.message.lower()
     
-    def test_parse_nonexistent_file(self):
+    def test_parse_nonexistent_file(self, parser):
         """Test parsing a file that doesn't exist"""
-        parser = DocumentParser()
-        
         with pytest.raises(DocumentParsingError):
             parser.parse("/nonexistent/file.txt", "txt")
     
-    def test_parse_empty_pdf(self):
-        """Test parsing an empty PDF document"""
-        parser = DocumentParser()
-        
-        # Create a PDF with a blank page (can't save with zero pages)
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.pdf', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            
-            try:
-                doc = fitz.open()
-                # Add a blank page (PyMuPDF doesn't allow saving with zero pages)
-                doc.new_page()
-                doc.save(tmp_path)
-                doc.close()
-                
-                # Should raise error for empty document (no text content)
-                with pytest.raises(DocumentParsingError) as exc_info:
-                    parser.parse(tmp_path, 'pdf')
-                
-                assert exc_info.value.error_code == "NO_CONTENT"
-                
-            finally:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-    
-    def test_parse_pdf_with_no_text(self):
-        """Test parsing a PDF with pages but no text content"""
-        parser = DocumentParser()
-        
-        # Create a PDF with a blank page
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.pdf', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            
-            try:
-                doc = fitz.open()
-                doc.new_page()  # Add blank page
-                doc.save(tmp_path)
-                doc.close()
-                
-                # Should raise error for no content
-                with pytest.raises(DocumentParsingError) as exc_info:
-                    parser.parse(tmp_path, 'pdf')
-                
-                assert exc_info.value.error_code == "NO_CONTENT"
-                
-            finally:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-    
-    def test_parse_corrupted_pdf(self):
-        """Test parsing a corrupted PDF file"""
-        parser = DocumentParser()
-        
-        # Create a file with invalid PDF content
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.pdf', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            tmp_file.write("This is not a valid PDF file")
-        
-        try:
-            with pytest.raises(DocumentParsingError) as exc_info:
-                parser.parse(tmp_path, 'pdf')
-            
-            assert exc_info.value.error_code in ["CORRUPTED_FILE", "PARSING_FAILED"]
-            
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-    
-    def test_parse_empty_docx(self):
-        """Test parsing a DOCX with no content"""
-        parser = DocumentParser()
-        
-        # Create a DOCX with no paragraphs
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.docx', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            
-            try:
-                doc = Document()
-                # Don't add any content - python-docx creates a default empty paragraph
-                doc.save(tmp_path)
-                
-                # Should raise error for no content
-                # Note: python-docx creates documents with empty paragraphs by default
-                # So we expect PARSING_FAILED or NO_CONTENT depending on implementation
-                with pytest.raises(DocumentParsingError) as exc_info:
-                    parser.parse(tmp_path, 'docx')
-                
-                # Accept either error code since empty DOCX has empty paragraphs
-                assert exc_info.value.error_code in ["NO_CONTENT", "PARSING_FAILED"]
-                
-            finally:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-    
-    def test_parse_corrupted_docx(self):
-        """Test parsing a corrupted DOCX file"""
-        parser = DocumentParser()
-        
-        # Create a file with invalid DOCX content
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.docx', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            tmp_file.write("This is not a valid DOCX file")
-        
-        try:
-            with pytest.raises(DocumentParsingError) as exc_info:
-                parser.parse(tmp_path, 'docx')
-            
-            assert exc_info.value.error_code in ["CORRUPTED_FILE", "PARSING_FAILED"]
-            
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-    
-    def test_parse_empty_xlsx(self):
-        """Test parsing an XLSX with no content"""
-        parser = DocumentParser()
-        
-        # Create an XLSX with empty sheet
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.xlsx', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            
-            try:
-                wb = Workbook()
-                ws = wb.active
-                # Don't add any content
-                wb.save(tmp_path)
-                wb.close()
-                
-                # Should raise error for no content
-                # Note: openpyxl creates sheets with dimensions but no actual content
-                with pytest.raises(DocumentParsingError) as exc_info:
-                    parser.parse(tmp_path, 'xlsx')
-                
-                # Accept either error code
-                assert exc_info.value.error_code in ["NO_CONTENT", "PARSING_FAILED"]
-                
-            finally:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-    
-    def test_parse_corrupted_xlsx(self):
-        """Test parsing a corrupted XLSX file"""
-        parser = DocumentParser()
-        
-        # Create a file with invalid XLSX content
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.xlsx', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            tmp_file.write("This is not a valid XLSX file")
-        
-        try:
-            with pytest.raises(DocumentParsingError) as exc_info:
-                parser.parse(tmp_path, 'xlsx')
-            
-            assert exc_info.value.error_code in ["CORRUPTED_FILE", "PARSING_FAILED"]
-            
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-    
-    def test_parse_empty_txt(self):
-        """Test parsing an empty TXT file"""
-        parser = DocumentParser()
-        
-        # Create an empty TXT file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as tmp_file:
-            tmp_path = tmp_file.name
-            # Don't write anything
+    @pytest.mark.parametrize("suffix,codes", [
+        ("pdf", {"NO_CONTENT"}),
+        # Empty DOCX/XLSX files still carry empty paragraphs/sheets, so accept
+        # either error code depending on implementation
+        ("docx", {"NO_CONTENT", "PARSING_FAILED"}),
+        ("xlsx", {"NO_CONTENT", "PARSING_FAILED"}),
+    ])
+    def test_parse_empty_document(self, parser, empty_documents, suffix, codes):
+        """Test parsing a valid document with no text content"""
+        with pytest.raises(DocumentParsingError) as exc_info:
+            parser.parse(empty_documents[suffix], suffix)
         
-        try:
-            with pytest.raises(DocumentParsingError) as exc_info:
-                parser.parse(tmp_path, 'txt')
-            
-            assert exc_info.value.error_code == "EMPTY_DOCUMENT"
-            
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        assert exc_info.value.error_code in codes
     
-    def test_parse_txt_with_only_whitespace(self):
-        """Test parsing a TXT file with only whitespace"""
-        parser = DocumentParser()
+    @pytest.mark.parametrize("suffix,payload,codes", [
+        ("pdf", b"This is not a valid PDF file", {"CORRUPTED_FILE", "PARSING_FAILED"}),
+        ("docx", b"This is not a valid DOCX file", {"CORRUPTED_FILE", "PARSING_FAILED"}),
+        ("xlsx", b"This is not a valid XLSX file", {"CORRUPTED_FILE", "PARSING_FAILED"}),
+        ("txt", b"", {"EMPTY_DOCUMENT"}),
+        ("txt", b"   \n\n\t\t   \n", {"NO_CONTENT"}),
+    ], ids=["corrupted-pdf", "corrupted-docx", "corrupted-xlsx", "empty-txt", "whitespace-txt"])
+    def test_parse_invalid_payload(self, parser, tmp_path, suffix, payload, codes):
+        """Test parsing corrupted files and text files without content"""
+        file_path = tmp_path / f"invalid.{suffix}"
+        file_path.write_bytes(payload)
         
-        # Create a TXT file with only whitespace
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as tmp_file:
-            tmp_path = tmp_file.name
-            tmp_file.write("   \n\n\t\t   \n")
+        with pytest.raises(DocumentParsingError) as exc_info:
+            parser.parse(str(file_path), suffix)
         
-        try:
-            with pytest.raises(DocumentParsingError) as exc_info:
-                parser.parse(tmp_path, 'txt')
-            
-            assert exc_info.value.error_code == "NO_CONTENT"
-            
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        assert exc_info.value.error_code in codes
     
-    def test_parse_txt_with_various_encodings(self):
+    @pytest.mark.parametrize("encoding,text,detected", [
+        # UTF-8 (most common)
+        ("utf-8", "测试内容 Test Content", "utf-8"),
+        # ASCII (subset of UTF-8)
+        ("ascii", "Test Content Only", None),
+    ])
+    def test_parse_txt_with_various_encodings(self, parser, tmp_path, encoding, text, detected):
         """Test parsing TXT files with different encodings"""
-        parser = DocumentParser()
-        
-        # Test UTF-8 (most common)
-        test_content_utf8 = "测试内容 Test Content"
-        with tempfile.NamedTemporaryFile(mode='wb', suffix='.txt', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            tmp_file.write(test_content_utf8.encode('utf-8'))
-        
-        try:
-            result = parser.parse(tmp_path, 'txt')
-            assert isinstance(result, ParsedDocument)
-            assert test_content_utf8 == result.content
-            assert result.metadata['encoding'] == 'utf-8'
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-        
-        # Test ASCII (subset of UTF-8)
-        test_content_ascii = "Test Content Only"
-        with tempfile.NamedTemporaryFile(mode='wb', suffix='.txt', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            tmp_file.write(test_content_ascii.encode('ascii'))
-        
-        try:
-            result = parser.parse(tmp_path, 'txt')
-            assert isinstance(result, ParsedDocument)
-            assert test_content_ascii == result.content
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        file_path = tmp_path / "encoded.txt"
+        file_path.write_bytes(text.encode(encoding))
+        
+        result = parser.parse(str(file_path), 'txt')
+        assert isinstance(result, ParsedDocument)
+        assert text == result.content
+        if detected is not None:
+            assert result.metadata['encoding'] == detected
     
-    def test_error_details_preserved(self):
+    def test_error_details_preserved(self, parser):
         """Test that error details are preserved in exceptions"""
-        parser = DocumentParser()
-        
         with pytest.raises(DocumentParsingError) as exc_info:
             parser.parse("nonexistent.txt", "txt")
         
@@ -278,3 +156,17 @@ class TestDocumentParserErrors:
         assert hasattr(exc_info.value, 'message')
         assert hasattr(exc_info.value, 'error_code')
         assert hasattr(exc_info.value, 'details')
+    
+    @pytest.mark.parametrize("dimension", ["A1:A1", None], ids=["truncated", "missing"])
+    def test_parse_xlsx_ignores_stored_dimension(self, parser, tmp_path, dimension):
+        """Test that XLSX cells outside a truncated or missing dimension record are read"""
+        file_path = tmp_path / "sparse.xlsx"
+        cell_texts = _xlsx_with_dimension(file_path, dimension)
+        
+        result = parser.parse(str(file_path), 'xlsx')
+        
+        for text in cell_texts:
+            assert text in result.content
+        assert result.structure['sheets'][0]['rows'] == 5
+        assert result.structure['sheets'][0]['columns'] == 3
+
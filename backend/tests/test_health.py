@@ -9,10 +9,14 @@ from fastapi.testclient import TestClient
 from main import app
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Create test client for API testing"""
-    return TestClient(app)
+    """Create one test client for the session"""
+    # Not entered as a context manager: the health check does not need the
+    # lifespan startup, which connects to the configured production database
+    c = TestClient(app)
+    yield c
+    c.close()
 
 
 def test_health_endpoint_returns_200(client):
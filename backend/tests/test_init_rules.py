@@ -3,12 +3,41 @@ Tests for pre-configured desensitization rules initialization.
 
 Validates Requirement 4.1: Pre-configured rules for common sensitive data types
 """
+import re
+
 import pytest
+from sqlalchemy import func, select
 from app.models import DesensitizationRule
-from app.init_rules import init_preconfigured_rules, PRECONFIGURED_RULES
+from app.init_rules import init_preconfigured_rules, PRECONFIGURED_RULE_COUNT
+
+
+# Chinese characters are in the Unicode range \u4e00-\u9fff
+_CJK_RE = re.compile('[\u4e00-\u9fff]')
+
+_COUNT_SYSTEM_RULES = select(func.count()).select_from(DesensitizationRule).where(
+    DesensitizationRule.is_system == True
+)
+
+
+@pytest.fixture(scope="module")
+def init_counts(test_db_module):
+    """Run the initialization twice and record the system rule count after each run"""
+    counts = []
+    for _ in range(2):
+        init_preconfigured_rules(test_db_module)
+        counts.append(test_db_module.execute(_COUNT_SYSTEM_RULES).scalar_one())
+    return counts
+
+
+@pytest.fixture(scope="module")
+def system_rules(test_db_module, init_counts):
+    """System rules in the database after initialization, queried once"""
+    return test_db_module.query(DesensitizationRule).filter(
+        DesensitizationRule.is_system == True
+    ).all()
 
 
-def test_preconfigured_rules_exist(test_db):
+def test_preconfigured_rules_exist(system_rules):
     """
     Test that all expected pre-configured rules are created in the database.
     
@@ -16,17 +45,9 @@ def test_preconfigured_rules_exist(test_db):
     desensitization rules for common sensitive data types including names, 
     ID cards, phone numbers, addresses, and bank cards.
     """
-    # Initialize the pre-configured rules
-    init_preconfigured_rules(test_db)
-    
-    # Query all system rules
-    rules = test_db.query(DesensitizationRule).filter(
-        DesensitizationRule.is_system == True
-    ).all()
-    
     # Verify we have the expected number of rules
-    assert len(rules) == len(PRECONFIGURED_RULES), \
-        f"Expected {len(PRECONFIGURED_RULES)} rules, found {len(rules)}"
+    assert len(system_rules) == PRECONFIGURED_RULE_COUNT, \
+        f"Expected {PRECONFIGURED_RULE_COUNT} rules, found {len(system_rules)}"
     
     # Verify all expected data types are present
     expected_data_types = {
@@ -38,13 +59,13 @@ def test_preconfigured_rules_exist(test_db):
         "email"
     }
     
-    actual_data_types = {rule.data_type for rule in rules}
+    actual_data_types = {rule.data_type for rule in system_rules}
     
     assert actual_data_types == expected_data_types, \
         f"Missing data types: {expected_data_types - actual_data_types}"
 
 
-def test_preconfigured_rules_properties(test_db):
+def test_preconfigured_rules_properties(system_rules):
     """
     Test that pre-configured rules have correct properties.
     
@@ -55,15 +76,7 @@ def test_preconfigured_rules_properties(test_db):
     - Is marked as system rule
     - Is enabled by default
     """
-    # Initialize the pre-configured rules
-    init_preconfigured_rules(test_db)
-    
-    # Query all system rules
-    rules = test_db.query(DesensitizationRule).filter(
-        DesensitizationRule.is_system == True
-    ).all()
-    
-    for rule in rules:
+    for rule in system_rules:
         # Verify rule has a name
         assert rule.name, f"Rule for {rule.data_type} has no name"
         
@@ -84,38 +97,24 @@ def test_preconfigured_rules_properties(test_db):
             f"Rule {rule.name} is not enabled by default"
 
 
-def test_preconfigured_rules_idempotent(test_db):
+def test_preconfigured_rules_idempotent(init_counts):
     """
     Test that initializing rules multiple times is idempotent.
     
     Running the initialization multiple times should not create duplicate rules.
     """
-    # Initialize rules first time
-    init_preconfigured_rules(test_db)
-    
-    # Count rules after first initialization
-    first_count = test_db.query(DesensitizationRule).filter(
-        DesensitizationRule.is_system == True
-    ).count()
-    
-    # Initialize rules second time
-    init_preconfigured_rules(test_db)
-    
-    # Count rules after second initialization
-    second_count = test_db.query(DesensitizationRule).filter(
-        DesensitizationRule.is_system == True
-    ).count()
+    first_count, second_count = init_counts
     
     # Verify count is the same
     assert first_count == second_count, \
         "Initializing rules multiple times created duplicates"
     
     # Verify we still have the expected number
-    assert first_count == len(PRECONFIGURED_RULES), \
-        f"Expected {len(PRECONFIGURED_RULES)} rules, found {first_count}"
+    assert first_count == PRECONFIGURED_RULE_COUNT, \
+        f"Expected {PRECONFIGURED_RULE_COUNT} rules, found {first_count}"
 
 
-def test_each_data_type_has_rule(test_db):
+def test_each_data_type_has_rule(system_rules):
     """
     Test that each required data type has at least one rule.
     
@@ -127,8 +126,7 @@ def test_each_data_type_has_rule(test_db):
     - bank cards
     - emails
     """
-    # Initialize the pre-configured rules
-    init_preconfigured_rules(test_db)
+    rules_by_type = {rule.data_type: rule for rule in system_rules}
     
     # Required data types from Requirement 4.1
     required_data_types = [
@@ -141,10 +139,7 @@ def test_each_data_type_has_rule(test_db):
     ]
     
     for data_type in required_data_types:
-        rule = test_db.query(DesensitizationRule).filter(
-            DesensitizationRule.data_type == data_type,
-            DesensitizationRule.is_system == True
-        ).first()
+        rule = rules_by_type.get(data_type)
         
         assert rule is not None, \
             f"No pre-configured rule found for data type: {data_type}"
@@ -153,45 +148,27 @@ def test_each_data_type_has_rule(test_db):
             f"Pre-configured rule for {data_type} is not enabled"
 
 
-def test_default_strategy_is_mask(test_db):
+def test_default_strategy_is_mask(system_rules):
     """
     Test that all pre-configured rules use masking strategy by default.
     
     This ensures consistent behavior across all rule types.
     """
-    # Initialize the pre-configured rules
-    init_preconfigured_rules(test_db)
-    
-    # Query all system rules
-    rules = test_db.query(DesensitizationRule).filter(
-        DesensitizationRule.is_system == True
-    ).all()
-    
-    for rule in rules:
+    for rule in system_rules:
         assert rule.strategy == "mask", \
             f"Rule {rule.name} does not use mask strategy (uses {rule.strategy})"
 
 
-def test_rule_names_are_descriptive(test_db):
+def test_rule_names_are_descriptive(system_rules):
     """
     Test that rule names are descriptive and in Chinese.
     
     This ensures the UI can display meaningful names to users.
     """
-    # Initialize the pre-configured rules
-    init_preconfigured_rules(test_db)
-    
-    # Query all system rules
-    rules = test_db.query(DesensitizationRule).filter(
-        DesensitizationRule.is_system == True
-    ).all()
-    
-    for rule in rules:
+    for rule in system_rules:
         # Verify name is not empty
         assert len(rule.name) > 0, f"Rule for {rule.data_type} has empty name"
         
         # Verify name contains Chinese characters (basic check)
-        # Chinese characters are in the Unicode range \u4e00-\u9fff
-        has_chinese = any('\u4e00' <= char <= '\u9fff' for char in rule.name)
-        assert has_chinese, \
+        assert _CJK_RE.search(rule.name), \
             f"Rule name '{rule.name}' does not contain Chinese characters"
@@ -5,45 +5,42 @@ This test verifies that the init_rules module can be imported and used
 without requiring a running PostgreSQL instance.
 """
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.database import Base
-from app.init_rules import init_preconfigured_rules, PRECONFIGURED_RULES, run_migration
+from app.init_rules import (
+    init_preconfigured_rules,
+    PRECONFIGURED_RULES,
+    PRECONFIGURED_RULE_COUNT,
+    PRECONFIGURED_DATA_TYPES,
+)
 from app.models import DesensitizationRule
 
 
-def test_migration_script_with_sqlite():
+_REQUIRED_TYPES = frozenset({"name", "id_card", "phone", "address", "bank_card", "email"})
+_REQUIRED_FIELDS = frozenset({"id", "name", "data_type", "strategy", "is_system", "enabled"})
+
+# Key set of each rule, computed once at import
+_KEYSETS = [frozenset(rule) for rule in PRECONFIGURED_RULES]
+
+
+def test_migration_script_with_sqlite(test_db):
     """
     Test that the migration script works with SQLite database.
     
-    This simulates running the migration in a test environment.
+    This simulates running the migration in a test environment, using the
+    shared in-memory SQLite test database.
     """
-    # Create in-memory SQLite database
-    engine = create_engine("sqlite:///:memory:")
-    Base.metadata.create_all(bind=engine)
+    # Run the initialization
+    init_preconfigured_rules(test_db)
     
-    # Create session
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    db = SessionLocal()
+    # Verify rules were created
+    rules = test_db.query(DesensitizationRule).filter(
+        DesensitizationRule.is_system == True
+    ).all()
     
-    try:
-        # Run the initialization
-        init_preconfigured_rules(db)
-        
-        # Verify rules were created
-        rules = db.query(DesensitizationRule).filter(
-            DesensitizationRule.is_system == True
-        ).all()
-        
-        assert len(rules) == len(PRECONFIGURED_RULES)
-        
-        # Verify all expected data types exist
-        data_types = {rule.data_type for rule in rules}
-        expected_types = {"name", "id_card", "phone", "address", "bank_card", "email"}
-        assert data_types == expected_types
-        
-    finally:
-        db.close()
+    assert len(rules) == PRECONFIGURED_RULE_COUNT
+    
+    # Verify all expected data types exist
+    data_types = {rule.data_type for rule in rules}
+    assert data_types == _REQUIRED_TYPES
 
 
 def test_preconfigured_rules_constant():
@@ -53,15 +50,14 @@ def test_preconfigured_rules_constant():
     This ensures the migration data is properly defined.
     """
     # Verify we have rules defined
-    assert len(PRECONFIGURED_RULES) > 0
+    assert PRECONFIGURED_RULE_COUNT > 0
     
     # Verify each rule has required fields
-    required_fields = {"id", "name", "data_type", "strategy", "is_system", "enabled"}
+    for rule, keys in zip(PRECONFIGURED_RULES, _KEYSETS):
+        assert keys == _REQUIRED_FIELDS, \
+            f"Rule {rule.get('name')} missing required fields"
     
     for rule in PRECONFIGURED_RULES:
-        assert set(rule.keys()) == required_fields, \
-            f"Rule {rule.get('name')} missing required fields"
-        
         # Verify field types
         assert isinstance(rule["name"], str)
         assert isinstance(rule["data_type"], str)
@@ -82,16 +78,5 @@ def test_all_required_data_types_in_preconfigured_rules():
     Validates Requirement 4.1: Pre-configured rules for names, ID cards,
     phone numbers, addresses, bank cards, and emails.
     """
-    data_types = {rule["data_type"] for rule in PRECONFIGURED_RULES}
-    
-    required_types = {
-        "name",
-        "id_card",
-        "phone",
-        "address",
-        "bank_card",
-        "email"
-    }
-    
-    assert data_types == required_types, \
-        f"Missing required data types: {required_types - data_types}"
+    assert PRECONFIGURED_DATA_TYPES == _REQUIRED_TYPES, \
+        f"Missing required data types: {set(_REQUIRED_TYPES - PRECONFIGURED_DATA_TYPES)}"
@@ -5,94 +5,114 @@ Feature: data-desensitization-platform
 """
 
 import pytest
-from hypothesis import given, strategies as st, settings
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from hypothesis import strategies as st, settings
+from hypothesis.stateful import RuleBasedStateMachine, invariant, rule, run_state_machine_as_test
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+import hashlib
 import io
 import os
-import tempfile
+from unittest.mock import patch
 
 from app.database import Base, get_db
 from main import app
-from app.models import Task, DesensitizationRule, SensitiveItem, OperationLog
-from app.schemas import DataType, StrategyType
 
 
-# Test database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test_api.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Test database setup: in-memory SQLite, private to each process (and so to
+# each pytest-xdist worker). StaticPool keeps the single connection, and with
+# it the schema, alive for the whole session
+SQLALCHEMY_DATABASE_URL = "sqlite://"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
 
-# Note: Tables are created by the setup_api_test_database fixture in conftest.py
 
+# pysqlite's own transaction handling breaks SAVEPOINTs; let SQLAlchemy emit
+# BEGIN itself (same workaround as the test_engine fixture in conftest.py)
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
 
-
-app.dependency_overrides[get_db] = override_get_db
-client = TestClient(app)
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
 
 
 @pytest.fixture(scope="session", autouse=True)
-def setup_test_environment():
+def setup_test_environment(tmp_path_factory):
     """Setup test environment once for the entire test session"""
     # Ensure database tables exist
     Base.metadata.create_all(bind=engine)
     
-    # Create test upload directory
-    os.makedirs("/tmp/test_uploads", exist_ok=True)
-    
-    # Set upload directory for tests
+    # Upload into a pytest-managed directory (per xdist worker, cleaned up
+    # by pytest's temporary directory retention)
     from app.config import settings
-    settings.upload_dir = "/tmp/test_uploads"
+    original_upload_dir = settings.upload_dir
+    settings.upload_dir = str(tmp_path_factory.mktemp("uploads"))
     
     yield
     
-    # Cleanup at end of session - don't drop tables, just clean data
-    db = TestingSessionLocal()
-    try:
-        db.query(Task).delete()
-        db.query(SensitiveItem).delete()
-        db.query(DesensitizationRule).delete()
-        db.query(OperationLog).delete()
-        db.commit()
-    except:
-        db.rollback()
-    finally:
-        db.close()
-    
-    # Clean up test files
-    if os.path.exists("/tmp/test_uploads"):
-        for file in os.listdir("/tmp/test_uploads"):
-            file_path = os.path.join("/tmp/test_uploads", file)
-            try:
-                os.remove(file_path)
-            except:
-                pass
+    settings.upload_dir = original_upload_dir
 
 
 @pytest.fixture(scope="function", autouse=True)
 def cleanup_test_data():
-    """Clean up test data between tests"""
-    yield
-    # Clean up database records between tests
-    db = TestingSessionLocal()
+    """
+    Run each test inside a transaction that is rolled back afterwards.
+    
+    The app's get_db dependency is routed to sessions joined to that
+    transaction, so commits made by the endpoints only release SAVEPOINTs.
+    The override is installed here rather than at import, so it only
+    applies while this module's tests run.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    
+    def override_get_db():
+        db = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
     try:
-        db.query(Task).delete()
-        db.query(SensitiveItem).delete()
-        db.query(DesensitizationRule).delete()
-        db.query(OperationLog).delete()
-        db.commit()
-    except:
-        db.rollback()
+        yield
     finally:
-        db.close()
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+        transaction.rollback()
+        connection.close()
+
+
+# Upload buffer reused by every example; the client reads it in full while
+# building the multipart body, so it can be refilled for the next request
+_UPLOAD_BUF = io.BytesIO()
+
+
+def _payload(content):
+    """Refill the shared upload buffer with content and rewind it"""
+    _UPLOAD_BUF.seek(0)
+    _UPLOAD_BUF.truncate()
+    _UPLOAD_BUF.write(content)
+    _UPLOAD_BUF.seek(0)
+    return _UPLOAD_BUF
+
+
+def _fingerprint(path):
+    """blake2b digest of a file, read in chunks so memory use stays constant"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.digest()
 
 
 # Strategies for generating test data
@@ -101,207 +121,166 @@ unsupported_formats = st.sampled_from([".exe", ".zip", ".jpg", ".png", ".mp4", "
 
 file_content_strategy = st.binary(min_size=1, max_size=1024)  # Small files for testing
 
-
-# Feature: data-desensitization-platform, Property 1: Multi-format Upload Support
-@given(
-    file_extension=supported_formats,
-    file_content=file_content_strategy,
-    filename_base=st.text(
-        alphabet=st.characters(whitelist_categories=('Lu', 'Ll', 'Nd')),
-        min_size=1,
-        max_size=20
-    )
+filename_bases = st.text(
+    alphabet=st.characters(whitelist_categories=('Lu', 'Ll', 'Nd')),
+    min_size=1,
+    max_size=20
 )
-@settings(max_examples=20, deadline=None)
-@pytest.mark.property_test
-def test_multi_format_upload_support(file_extension, file_content, filename_base):
-    """
-    Property 1: Multi-format Upload Support
-    
-    For any supported document format (PDF, DOCX, XLSX, TXT, MD), 
-    when a valid file of that format is uploaded, the system should 
-    accept the upload and return a successful task creation response.
-    
-    Validates: Requirements 1.1, 1.2, 1.3, 1.4
-    """
-    # Create a file-like object
-    filename = f"{filename_base}{file_extension}"
-    file = io.BytesIO(file_content)
-    
-    # Upload file
-    response = client.post(
-        "/api/v1/upload",
-        files={"file": (filename, file, "application/octet-stream")}
-    )
-    
-    # Should accept the upload
-    assert response.status_code == 200
-    
-    # Should return task response
-    data = response.json()
-    assert "id" in data
-    assert data["filename"] == filename
-    assert data["file_size"] == len(file_content)
-    assert data["file_type"] in ["pdf", "docx", "xlsx", "txt", "md"]
-    assert data["status"] == "uploaded"
-    assert "upload_time" in data
-
-
 
-# Feature: data-desensitization-platform, Property 2: Unsupported Format Rejection
-@given(
-    file_extension=unsupported_formats,
-    file_content=file_content_strategy,
-    filename_base=st.text(
-        alphabet=st.characters(whitelist_categories=('Lu', 'Ll', 'Nd')),
-        min_size=1,
-        max_size=20
-    )
-)
-@settings(max_examples=20, deadline=None)
-@pytest.mark.property_test
-def test_unsupported_format_rejection(file_extension, file_content, filename_base):
-    """
-    Property 2: Unsupported Format Rejection
-    
-    For any file with an unsupported format extension, when uploaded, 
-    the system should reject the upload and return an error response.
-    
-    Validates: Requirements 1.5
-    """
-    # Create a file-like object
-    filename = f"{filename_base}{file_extension}"
-    file = io.BytesIO(file_content)
-    
-    # Upload file
-    response = client.post(
-        "/api/v1/upload",
-        files={"file": (filename, file, "application/octet-stream")}
-    )
-    
-    # Should reject the upload
-    assert response.status_code == 400
-    
-    # Should return error message
-    data = response.json()
-    assert "error" in data or "message" in data
-    if "message" in data:
-        assert "unsupported" in data["message"].lower() or "format" in data["message"].lower()
-    elif "detail" in data:
-        assert "unsupported" in data["detail"].lower() or "format" in data["detail"].lower()
 
+# Upload limit used by the size property. The endpoint reads the whole body
+# and compares its length with settings.max_file_size, so a small limit
+# exercises the same check without building 50MB payloads for every example
+_SMALL_UPLOAD_LIMIT = 1024
 
 
-# Feature: data-desensitization-platform, Property 3: File Size Validation
-@given(
-    file_extension=supported_formats,
-    excess_size=st.integers(min_value=1, max_value=10 * 1024 * 1024),  # 1 byte to 10MB over limit
-    filename_base=st.text(
-        alphabet=st.characters(whitelist_categories=('Lu', 'Ll', 'Nd')),
-        min_size=1,
-        max_size=20
-    )
-)
-@settings(max_examples=20, deadline=None)
-@pytest.mark.property_test
-def test_file_size_validation(file_extension, excess_size, filename_base):
+class UploadMachine(RuleBasedStateMachine):
     """
-    Property 3: File Size Validation
-    
-    For any file exceeding the maximum size limit, when uploaded, 
-    the system should reject the upload and return an error response 
-    indicating the size limit was exceeded.
+    Upload properties as one state machine.
     
-    Validates: Requirements 1.6
+    Each step uploads a supported, unsupported or oversized file through the
+    shared client. Every accepted upload is remembered, and the invariant
+    checks after each step that no stored original has changed since upload.
     """
-    from app.config import settings
     
-    # Create a file that exceeds the limit
-    oversized_content = b"x" * (settings.max_file_size + excess_size)
-    filename = f"{filename_base}{file_extension}"
-    file = io.BytesIO(oversized_content)
-    
-    # Upload file
-    response = client.post(
-        "/api/v1/upload",
-        files={"file": (filename, file, "application/octet-stream")}
+    # Set by test_upload_state_machine before the machine runs
+    client = None
+    
+    def __init__(self):
+        super().__init__()
+        # file path -> (blake2b digest, size, mtime_ns) recorded at upload
+        self.uploaded = {}
+    
+    def _post(self, filename, file):
+        return self.client.post(
+            "/api/v1/upload",
+            files={"file": (filename, file, "application/octet-stream")}
+        )
+    
+    # Feature: data-desensitization-platform, Property 1: Multi-format Upload Support
+    @rule(file_extension=supported_formats, file_content=file_content_strategy, filename_base=filename_bases)
+    def upload_supported_format(self, file_extension, file_content, filename_base):
+        """
+        Property 1: Multi-format Upload Support
+        
+        For any supported document format (PDF, DOCX, XLSX, TXT, MD), 
+        when a valid file of that format is uploaded, the system should 
+        accept the upload and return a successful task creation response.
+        
+        Validates: Requirements 1.1, 1.2, 1.3, 1.4
+        """
+        from app.config import settings
+        
+        filename = f"{filename_base}{file_extension}"
+        response = self._post(filename, _payload(file_content))
+        
+        # Should accept the upload
+        assert response.status_code == 200
+        
+        # Should return task response
+        data = response.json()
+        assert "id" in data
+        assert data["filename"] == filename
+        assert data["file_size"] == len(file_content)
+        assert data["file_type"] in ["pdf", "docx", "xlsx", "txt", "md"]
+        assert data["status"] == "uploaded"
+        assert "upload_time" in data
+        
+        # The stored original should hold exactly the uploaded bytes
+        file_path = os.path.join(settings.upload_dir, f"{data['id']}{file_extension}")
+        digest = _fingerprint(file_path)
+        assert digest == hashlib.blake2b(file_content, digest_size=16).digest()
+        
+        stat = os.stat(file_path)
+        self.uploaded[file_path] = (digest, stat.st_size, stat.st_mtime_ns)
+    
+    # Feature: data-desensitization-platform, Property 2: Unsupported Format Rejection
+    @rule(file_extension=unsupported_formats, file_content=file_content_strategy, filename_base=filename_bases)
+    def upload_unsupported_format(self, file_extension, file_content, filename_base):
+        """
+        Property 2: Unsupported Format Rejection
+        
+        For any file with an unsupported format extension, when uploaded, 
+        the system should reject the upload and return an error response.
+        
+        Validates: Requirements 1.5
+        """
+        response = self._post(f"{filename_base}{file_extension}", _payload(file_content))
+        
+        # Should reject the upload
+        assert response.status_code == 400
+        
+        # Should return error message
+        data = response.json()
+        assert "error" in data or "message" in data
+        if "message" in data:
+            assert "unsupported" in data["message"].lower() or "format" in data["message"].lower()
+        elif "detail" in data:
+            assert "unsupported" in data["detail"].lower() or "format" in data["detail"].lower()
+    
+    # Feature: data-desensitization-platform, Property 3: File Size Validation
+    @rule(
+        file_extension=supported_formats,
+        excess_size=st.integers(min_value=1, max_value=1024),  # 1 byte to 1KB over limit
+        filename_base=filename_bases
     )
-    
-    # Should reject the upload
-    assert response.status_code == 400
-    
-    # Should return error message about size limit
-    data = response.json()
-    assert "error" in data or "message" in data
-    if "message" in data:
-        assert "size" in data["message"].lower() or "limit" in data["message"].lower()
-    elif "detail" in data:
-        assert "size" in data["detail"].lower() or "limit" in data["detail"].lower()
-
+    def upload_oversized_file(self, file_extension, excess_size, filename_base):
+        """
+        Property 3: File Size Validation
+        
+        For any file exceeding the maximum size limit, when uploaded, 
+        the system should reject the upload and return an error response 
+        indicating the size limit was exceeded.
+        
+        Validates: Requirements 1.6
+        """
+        from app.config import settings
+        
+        with patch.object(settings, "max_file_size", _SMALL_UPLOAD_LIMIT):
+            # Create a file that exceeds the limit
+            oversized_content = b"x" * (settings.max_file_size + excess_size)
+            response = self._post(f"{filename_base}{file_extension}", _payload(oversized_content))
+        
+        # Should reject the upload
+        assert response.status_code == 400
+        
+        # Should return error message about size limit
+        data = response.json()
+        assert "error" in data or "message" in data
+        if "message" in data:
+            assert "size" in data["message"].lower() or "limit" in data["message"].lower()
+        elif "detail" in data:
+            assert "size" in data["detail"].lower() or "limit" in data["detail"].lower()
+    
+    # Feature: data-desensitization-platform, Property 14: Original Document Preservation
+    @invariant()
+    def originals_unchanged(self):
+        """
+        Property 14: Original Document Preservation
+        
+        For any uploaded document, after further uploads and processing, 
+        the original uploaded file should remain unchanged and unmodified.
+        
+        Validates: Requirements 5.2, 5.3
+        """
+        for file_path, (digest, size, mtime_ns) in self.uploaded.items():
+            stat = os.stat(file_path)
+            assert stat.st_size == size
+            assert stat.st_mtime_ns == mtime_ns
+            assert _fingerprint(file_path) == digest
 
 
-# Feature: data-desensitization-platform, Property 14: Original Document Preservation
-@given(
-    file_extension=supported_formats,
-    file_content=st.binary(min_size=100, max_size=1024),
-    filename_base=st.text(
-        alphabet=st.characters(whitelist_categories=('Lu', 'Ll', 'Nd')),
-        min_size=1,
-        max_size=20
-    )
-)
-@settings(max_examples=20, deadline=None)
 @pytest.mark.property_test
-def test_original_document_preservation(file_extension, file_content, filename_base):
+def test_upload_state_machine(client):
     """
-    Property 14: Original Document Preservation
-    
-    For any uploaded document, after desensitization processing, 
-    the original uploaded file should remain unchanged and unmodified.
-    
-    Validates: Requirements 5.2, 5.3
+    Run the upload state machine (Properties 1, 2, 3 and 14) against the
+    shared client and this test's rolled-back database transaction.
     """
-    from app.config import settings
-    
-    # Create a file-like object
-    filename = f"{filename_base}{file_extension}"
-    file = io.BytesIO(file_content)
-    
-    # Upload file
-    response = client.post(
-        "/api/v1/upload",
-        files={"file": (filename, file, "application/octet-stream")}
-    )
-    
-    assert response.status_code == 200
-    data = response.json()
-    task_id = data["id"]
-    
-    # Get the uploaded file path
-    file_path = os.path.join(settings.upload_dir, f"{task_id}{file_extension}")
-    
-    # Read the original file content
-    with open(file_path, "rb") as f:
-        original_content = f.read()
-    
-    # Verify original content matches uploaded content
-    assert original_content == file_content
-    
-    # Get file modification time
-    original_mtime = os.path.getmtime(file_path)
-    
-    # Simulate desensitization process (parse, identify, export)
-    # Note: We can't fully test export without proper document content,
-    # but we can verify the file remains unchanged after upload
-    
-    # Read the file again
-    with open(file_path, "rb") as f:
-        content_after = f.read()
-    
-    # Verify file content is unchanged
-    assert content_after == file_content
-    assert content_after == original_content
-    
-    # Verify file was not modified (mtime should be the same or very close)
-    current_mtime = os.path.getmtime(file_path)
-    assert abs(current_mtime - original_mtime) < 1.0  # Within 1 second
+    UploadMachine.client = client
+    try:
+        run_state_machine_as_test(
+            UploadMachine,
+            settings=settings(max_examples=10, stateful_step_count=10, deadline=None)
+        )
+    finally:
+        UploadMachine.client = None
@@ -4,8 +4,10 @@ Property-based tests for the Desensitization Processor.
 These tests verify universal properties that should hold across all inputs.
 """
 
+import unicodedata
+
 import pytest
-from hypothesis import given, strategies as st, settings, assume
+from hypothesis import given, strategies as st
 from app.desensitization_processor import (
     MaskStrategy, 
     ReplaceStrategy, 
@@ -16,31 +18,52 @@ from app.desensitization_processor import (
 from app.recognition_engine import SensitiveItem
 
 
-# Feature: data-desensitization-platform, Property 10: Masking Strategy Application
-@given(
-    name=st.text(
-        alphabet=st.characters(
-            whitelist_categories=('Lo',),  # Chinese characters
-            min_codepoint=0x4E00,
-            max_codepoint=0x9FFF
-        ),
-        min_size=2,
-        max_size=10
+# Strategies and the processor hold no per-call state, so one instance of
+# each is shared by every example
+MASK_STRATEGY = MaskStrategy()
+REPLACE_STRATEGY = ReplaceStrategy()
+DELETE_STRATEGY = DeleteStrategy()
+PROCESSOR = DesensitizationProcessor()
+
+
+@pytest.fixture(scope="module")
+def mask_rules():
+    """Enabled phone and ID card mask rules, shared by every example"""
+    phone_rule = DesensitizationRule(
+        id='rule1',
+        name='手机号脱敏',
+        data_type='phone',
+        strategy='mask',
+        enabled=True
+    )
+    id_card_rule = DesensitizationRule(
+        id='rule2',
+        name='身份证脱敏',
+        data_type='id_card',
+        strategy='mask',
+        enabled=True
     )
+    return phone_rule, id_card_rule
+
+
+# Sensitive value strategies shared by the properties below
+phone_numbers = st.from_regex(r'1[3-9]\d{9}', fullmatch=True)
+id_card_numbers = st.from_regex(r'\d{17}[\dXx]', fullmatch=True)
+
+# Chinese characters for names: the letters (Lo) of the CJK Unified
+# Ideographs block, materialized once so each draw is a single index
+CJK_CHARACTERS = tuple(
+    char for char in map(chr, range(0x4E00, 0xA000))
+    if unicodedata.category(char) == 'Lo'
 )
-@settings(max_examples=100)
-def test_mask_strategy_name(name):
-    """
-    Property 10: Masking Strategy Application
-    
-    For any name, when masking strategy is applied,
-    the result should keep the first character and mask the rest with asterisks.
-    
-    Validates: Requirements 4.2, 4.5, 4.6, 4.7, 4.8, 4.9
-    """
-    strategy = MaskStrategy()
-    result = strategy.apply(name, 'name')
-    
+
+# Surrounding-text alphabet: no surrogates and no decimal digits, so the
+# all-digit phone and ID card values can never occur inside generated text
+non_digit_characters = st.characters(blacklist_categories=('Cs', 'Nd'))
+
+
+def _check_name_mask(name, result):
+    """Name: keep the first character and mask the rest with asterisks"""
     # Should keep first character
     assert result[0] == name[0], f"First character should be preserved: expected {name[0]}, got {result[0]}"
     
@@ -52,22 +75,8 @@ def test_mask_strategy_name(name):
     assert len(result) == len(name), f"Length should be preserved: expected {len(name)}, got {len(result)}"
 
 
-@given(
-    id_card=st.from_regex(r'\d{17}[\dXx]', fullmatch=True)
-)
-@settings(max_examples=100)
-def test_mask_strategy_id_card(id_card):
-    """
-    Property 10: Masking Strategy Application
-    
-    For any ID card number, when masking strategy is applied,
-    the result should keep first 6 and last 4 digits, masking middle 8 with asterisks.
-    
-    Validates: Requirements 4.2, 4.5, 4.6, 4.7, 4.8, 4.9
-    """
-    strategy = MaskStrategy()
-    result = strategy.apply(id_card, 'id_card')
-    
+def _check_id_card_mask(id_card, result):
+    """ID card: keep first 6 and last 4 digits, mask the middle 8"""
     # Should keep first 6 digits
     assert result[:6] == id_card[:6], f"First 6 digits should be preserved"
     
@@ -81,22 +90,8 @@ def test_mask_strategy_id_card(id_card):
     assert len(result) == 18, f"Length should be 18"
 
 
-@given(
-    phone=st.from_regex(r'1[3-9]\d{9}', fullmatch=True)
-)
-@settings(max_examples=100)
-def test_mask_strategy_phone(phone):
-    """
-    Property 10: Masking Strategy Application
-    
-    For any phone number, when masking strategy is applied,
-    the result should keep first 3 and last 4 digits, masking middle 4 with asterisks.
-    
-    Validates: Requirements 4.2, 4.5, 4.6, 4.7, 4.8, 4.9
-    """
-    strategy = MaskStrategy()
-    result = strategy.apply(phone, 'phone')
-    
+def _check_phone_mask(phone, result):
+    """Phone: keep first 3 and last 4 digits, mask the middle 4"""
     # Should keep first 3 digits
     assert result[:3] == phone[:3], f"First 3 digits should be preserved"
     
@@ -110,22 +105,8 @@ def test_mask_strategy_phone(phone):
     assert len(result) == 11, f"Length should be 11"
 
 
-@given(
-    bank_card=st.from_regex(r'\d{16,19}', fullmatch=True)
-)
-@settings(max_examples=100)
-def test_mask_strategy_bank_card(bank_card):
-    """
-    Property 10: Masking Strategy Application
-    
-    For any bank card number, when masking strategy is applied,
-    the result should keep first 4 and last 4 digits, masking middle with asterisks.
-    
-    Validates: Requirements 4.2, 4.5, 4.6, 4.7, 4.8, 4.9
-    """
-    strategy = MaskStrategy()
-    result = strategy.apply(bank_card, 'bank_card')
-    
+def _check_bank_card_mask(bank_card, result):
+    """Bank card: keep first 4 and last 4 digits, mask the middle"""
     # Should keep first 4 digits
     assert result[:4] == bank_card[:4], f"First 4 digits should be preserved"
     
@@ -140,30 +121,15 @@ def test_mask_strategy_bank_card(bank_card):
     assert len(result) == len(bank_card), f"Length should be preserved"
 
 
-@given(
-    local_part=st.from_regex(r'[a-zA-Z0-9._%+-]+', fullmatch=True).filter(lambda x: 1 <= len(x) <= 20),
-    domain=st.from_regex(r'[a-zA-Z0-9.-]+', fullmatch=True).filter(lambda x: 1 <= len(x) <= 20),
-    tld=st.from_regex(r'[a-zA-Z]{2,}', fullmatch=True).filter(lambda x: 2 <= len(x) <= 10)
-)
-@settings(max_examples=100)
-def test_mask_strategy_email(local_part, domain, tld):
-    """
-    Property 10: Masking Strategy Application
-    
-    For any email address, when masking strategy is applied,
-    the result should keep the domain visible and mask the username.
-    
-    Validates: Requirements 4.2, 4.5, 4.6, 4.7, 4.8, 4.9
-    """
-    email = f"{local_part}@{domain}.{tld}"
-    strategy = MaskStrategy()
-    result = strategy.apply(email, 'email')
+def _check_email_mask(email, result):
+    """Email: keep the domain visible and mask the username"""
+    local_part, domain = email.split('@')
     
     # Should contain @ symbol
     assert '@' in result, f"Result should contain @ symbol"
     
     # Domain should be preserved
-    assert f"@{domain}.{tld}" in result, f"Domain should be preserved"
+    assert f"@{domain}" in result, f"Domain should be preserved"
     
     # Username should be masked
     masked_username = result.split('@')[0]
@@ -176,12 +142,87 @@ def test_mask_strategy_email(local_part, domain, tld):
         assert '***' in masked_username, f"Username should contain ***"
 
 
+# Per data type: value strategy, boundary examples and mask check
+_MASK_CASES = {
+    'name': (
+        st.text(alphabet=st.sampled_from(CJK_CHARACTERS), min_size=2, max_size=10),
+        ["张三", "张三四五六七八九十一"],
+        _check_name_mask,
+    ),
+    'id_card': (
+        id_card_numbers,
+        ["110101199001010000", "11010119900101000X", "11010119900101000x"],
+        _check_id_card_mask,
+    ),
+    'phone': (
+        phone_numbers,
+        ["13800000000", "19999999999"],
+        _check_phone_mask,
+    ),
+    'bank_card': (
+        st.from_regex(r'\d{16,19}', fullmatch=True),
+        ["4" * 16, "4" * 19],
+        _check_bank_card_mask,
+    ),
+    'email': (
+        st.builds(
+            lambda local_part, domain, tld: f"{local_part}@{domain}.{tld}",
+            st.from_regex(r'[a-zA-Z0-9._%+-]{1,20}', fullmatch=True),
+            st.from_regex(r'[a-zA-Z0-9.-]{1,20}', fullmatch=True),
+            st.from_regex(r'[a-zA-Z]{2,10}', fullmatch=True)
+        ),
+        ["a@b.cn", f"{'a' * 20}@{'b' * 20}.{'c' * 10}"],
+        _check_email_mask,
+    ),
+}
+
+
+# Feature: data-desensitization-platform, Property 10: Masking Strategy Application
+@pytest.mark.parametrize("data_type", list(_MASK_CASES))
+@given(data=st.data())
+def test_mask_strategy(data_type, data):
+    """
+    Property 10: Masking Strategy Application
+    
+    For any name, ID card, phone number, bank card or email address, when
+    masking strategy is applied, the result should keep the type's visible
+    parts and mask the rest with asterisks.
+    
+    Validates: Requirements 4.2, 4.5, 4.6, 4.7, 4.8, 4.9
+    """
+    values, _, check = _MASK_CASES[data_type]
+    value = data.draw(values, label=data_type)
+    
+    check(value, MASK_STRATEGY.apply(value, data_type))
+
+
+@pytest.mark.parametrize("data_type,value", [
+    (data_type, value)
+    for data_type, (_, boundaries, _) in _MASK_CASES.items()
+    for value in boundaries
+])
+def test_mask_strategy_boundaries(data_type, value):
+    """
+    Property 10: Masking Strategy Application (length and character boundaries)
+    
+    Validates: Requirements 4.2, 4.5, 4.6, 4.7, 4.8, 4.9
+    """
+    _, _, check = _MASK_CASES[data_type]
+    check(value, MASK_STRATEGY.apply(value, data_type))
+
+
 # Feature: data-desensitization-platform, Property 11: Replacement Strategy Application
 @given(
-    value=st.text(min_size=1, max_size=100),
+    # No brackets and at least 4 characters: the longest bracket-free run in
+    # any placeholder is 3 characters ('身份证', '银行卡'), so the value can
+    # never be a substring of the placeholder
+    value=st.text(
+        alphabet=st.characters(blacklist_categories=('Cs',), blacklist_characters='[]'),
+        min_size=4,
+        max_size=20
+    ),
     data_type=st.sampled_from(['name', 'id_card', 'phone', 'address', 'bank_card', 'email'])
 )
-@settings(max_examples=100)
 def test_replace_strategy(value, data_type):
     """
     Property 11: Replacement Strategy Application
@@ -192,8 +233,7 @@ def test_replace_strategy(value, data_type):
     
     Validates: Requirements 4.3
     """
-    strategy = ReplaceStrategy()
-    result = strategy.apply(value, data_type)
+    result = REPLACE_STRATEGY.apply(value, data_type)
     
     # Expected placeholders
     expected_placeholders = {
@@ -209,11 +249,8 @@ def test_replace_strategy(value, data_type):
     assert result == expected_placeholders[data_type], \
         f"Expected placeholder {expected_placeholders[data_type]}, got {result}"
     
-    # Result should not contain the original value (unless it's a substring of the placeholder)
-    # Note: We skip this check if the original value is very short (1-2 chars) as it might
-    # coincidentally appear in the placeholder (e.g., '[' in '[姓名]')
-    if len(value) > 2:
-        assert value not in result, f"Result should not contain original value"
+    # Result should not contain the original value
+    assert value not in result, f"Result should not contain original value"
 
 
 # Feature: data-desensitization-platform, Property 12: Deletion Strategy Application
@@ -221,7 +258,6 @@ def test_replace_strategy(value, data_type):
     value=st.text(min_size=1, max_size=100),
     data_type=st.sampled_from(['name', 'id_card', 'phone', 'address', 'bank_card', 'email'])
 )
-@settings(max_examples=100)
 def test_delete_strategy(value, data_type):
     """
     Property 12: Deletion Strategy Application
@@ -231,38 +267,33 @@ def test_delete_strategy(value, data_type):
     
     Validates: Requirements 4.4
     """
-    strategy = DeleteStrategy()
-    result = strategy.apply(value, data_type)
+    result = DELETE_STRATEGY.apply(value, data_type)
     
-    # Result should be empty string
+    # Result should be empty string (so it cannot contain the original value)
     assert result == '', f"Expected empty string, got '{result}'"
-    
-    # Result should not contain the original value
-    assert value not in result, f"Result should not contain original value"
 
 
 # Feature: data-desensitization-platform, Property 13: Complete Rule Application
 @given(
-    phone=st.from_regex(r'1[3-9]\d{9}', fullmatch=True),
-    id_card=st.from_regex(r'\d{17}[\dXx]', fullmatch=True),
+    phone=phone_numbers,
+    id_card=id_card_numbers,
     text_before=st.text(
-        alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),
+        alphabet=non_digit_characters,
         min_size=0,
         max_size=50
     ),
     text_middle=st.text(
-        alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),
+        alphabet=non_digit_characters,
         min_size=1,
         max_size=50
     ),
     text_after=st.text(
-        alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),
+        alphabet=non_digit_characters,
         min_size=0,
         max_size=50
     )
 )
-@settings(max_examples=100)
-def test_complete_rule_application(phone, id_card, text_before, text_middle, text_after):
+def test_complete_rule_application(mask_rules, phone, id_card, text_before, text_middle, text_after):
     """
     Property 13: Complete Rule Application
     
@@ -272,14 +303,6 @@ def test_complete_rule_application(phone, id_card, text_before, text_middle, tex
     
     Validates: Requirements 5.1
     """
-    # Ensure phone and id_card don't appear in surrounding text
-    assume(phone not in text_before)
-    assume(phone not in text_middle)
-    assume(phone not in text_after)
-    assume(id_card not in text_before)
-    assume(id_card not in text_middle)
-    assume(id_card not in text_after)
-    
     # Create text with known sensitive data
     text = f"{text_before}{phone}{text_middle}{id_card}{text_after}"
     
@@ -306,27 +329,11 @@ def test_complete_rule_application(phone, id_card, text_before, text_middle, tex
         )
     ]
     
-    # Create rules (both enabled with mask strategy)
-    rules = [
-        DesensitizationRule(
-            id='rule1',
-            name='手机号脱敏',
-            data_type='phone',
-            strategy='mask',
-            enabled=True
-        ),
-        DesensitizationRule(
-            id='rule2',
-            name='身份证脱敏',
-            data_type='id_card',
-            strategy='mask',
-            enabled=True
-        )
-    ]
+    # Rules: both enabled with mask strategy
+    rules = list(mask_rules)
     
     # Process the text
-    processor = DesensitizationProcessor()
-    result = processor.process(text, sensitive_items, rules)
+    result = PROCESSOR.process(text, sensitive_items, rules)
     
     # Original sensitive values should not appear in result
     assert phone not in result, f"Original phone number should not appear in result"
@@ -347,10 +354,10 @@ def test_complete_rule_application(phone, id_card, text_before, text_middle, tex
 
 # Feature: data-desensitization-platform, Property 15: Consistent Value Desensitization
 @given(
-    phone=st.from_regex(r'1[3-9]\d{9}', fullmatch=True),
+    phone=phone_numbers,
     text_parts=st.lists(
         st.text(
-            alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),
+            alphabet=non_digit_characters,
             min_size=1,
             max_size=20
         ),
@@ -358,8 +365,7 @@ def test_complete_rule_application(phone, id_card, text_before, text_middle, tex
         max_size=5
     )
 )
-@settings(max_examples=100)
-def test_consistent_value_desensitization(phone, text_parts):
+def test_consistent_value_desensitization(mask_rules, phone, text_parts):
     """
     Property 15: Consistent Value Desensitization
     
@@ -369,10 +375,6 @@ def test_consistent_value_desensitization(phone, text_parts):
     
     Validates: Requirements 5.5
     """
-    # Ensure phone doesn't appear in text parts
-    for part in text_parts:
-        assume(phone not in part)
-    
     # Create text with multiple occurrences of the same phone number
     # Insert phone between each text part
     text = text_parts[0]
@@ -397,20 +399,12 @@ def test_consistent_value_desensitization(phone, text_parts):
         for start, end in positions
     ]
     
-    # Create rule
-    rules = [
-        DesensitizationRule(
-            id='rule1',
-            name='手机号脱敏',
-            data_type='phone',
-            strategy='mask',
-            enabled=True
-        )
-    ]
+    # Rule: phone masking only
+    phone_rule, _ = mask_rules
+    rules = [phone_rule]
     
     # Process the text
-    processor = DesensitizationProcessor()
-    result = processor.process(text, sensitive_items, rules)
+    result = PROCESSOR.process(text, sensitive_items, rules)
     
     # Original phone should not appear in result
     assert phone not in result, f"Original phone number should not appear in result"
@@ -424,40 +418,22 @@ def test_consistent_value_desensitization(phone, text_parts):
     # Should have same number of masked occurrences as original occurrences
     assert masked_count == len(positions), \
         f"Expected {len(positions)} occurrences of masked phone, found {masked_count}"
-    
-    # All occurrences should be identical (consistency check)
-    # Find all masked phone positions in result
-    masked_positions = []
-    start = 0
-    while True:
-        pos = result.find(masked_phone, start)
-        if pos == -1:
-            break
-        masked_positions.append(pos)
-        start = pos + 1
-    
-    # All found masked values should be identical
-    for pos in masked_positions:
-        found_value = result[pos:pos + len(masked_phone)]
-        assert found_value == masked_phone, \
-            f"All masked values should be identical: expected {masked_phone}, found {found_value}"
 
 
 # Test with disabled rules
 @given(
-    phone=st.from_regex(r'1[3-9]\d{9}', fullmatch=True),
+    phone=phone_numbers,
     text_before=st.text(
-        alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),
+        alphabet=non_digit_characters,
         min_size=0,
         max_size=50
     ),
     text_after=st.text(
-        alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),
+        alphabet=non_digit_characters,
         min_size=0,
         max_size=50
     )
 )
-@settings(max_examples=100)
 def test_disabled_rule_not_applied(phone, text_before, text_after):
     """
     Property 13: Complete Rule Application
@@ -467,9 +443,6 @@ def test_disabled_rule_not_applied(phone, text_before, text_after):
     
     Validates: Requirements 5.1
     """
-    assume(phone not in text_before)
-    assume(phone not in text_after)
-    
     text = f"{text_before}{phone}{text_after}"
     
     # Create sensitive item
@@ -498,8 +471,7 @@ def test_disabled_rule_not_applied(phone, text_before, text_after):
     ]
     
     # Process the text
-    processor = DesensitizationProcessor()
-    result = processor.process(text, sensitive_items, rules)
+    result = PROCESSOR.process(text, sensitive_items, rules)
     
     # Original text should be unchanged (rule was disabled)
     assert result == text, f"Text should be unchanged when rule is disabled"
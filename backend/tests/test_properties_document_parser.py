@@ -5,53 +5,95 @@ Feature: data-desensitization-platform
 """
 
 import pytest
-from hypothesis import given, strategies as st, settings, assume
+from hypothesis import given, example, strategies as st, settings, assume
 from hypothesis import HealthCheck
 import tempfile
-import os
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
 
 from app.document_parser import DocumentParser, ParsedDocument, DocumentParsingError
+from tests.strategies import CHINESE, MIXED_ALPHABET, TEXT_CONTENT, CHINESE_TEXT, ENGLISH_TEXT
 
-# Import document creation libraries
-import fitz  # PyMuPDF
-from docx import Document
-from openpyxl import Workbook
 
+@pytest.fixture(scope="module")
+def parser():
+    """Document parser shared by every example in this module"""
+    return DocumentParser()
 
-# Hypothesis strategies for generating test data
-@st.composite
-def text_content(draw):
-    """Generate text content with mixed Chinese and English"""
-    # Generate a mix of ASCII and Chinese characters
-    chinese_chars = st.characters(
-        whitelist_categories=('Lo',),
-        min_codepoint=0x4E00,
-        max_codepoint=0x9FFF
-    )
-    ascii_chars = st.characters(min_codepoint=32, max_codepoint=126)
+
+# Document builders, memoized on content: Hypothesis replays and shrinks
+# towards inputs it has already tried, so repeated contents are common. Each
+# imports its document library on first use, like the parser itself
+@lru_cache(maxsize=256)
+def _pdf_bytes(content: str) -> bytes:
+    """
+    Build a one-page PDF containing content with PyMuPDF
+    
+    Uses the built-in "china-s" CJK font: it is not embedded, and unlike the
+    default Helvetica it covers the Chinese characters, so MuPDF does not
+    search for a fallback glyph for each of them.
+    """
+    import fitz  # PyMuPDF
+    
+    doc = fitz.open()
+    try:
+        doc.new_page().insert_text((50, 50), content, fontsize=12, fontname="china-s")
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+@lru_cache(maxsize=256)
+def _docx_bytes(content: str) -> bytes:
+    """Build a DOCX with content as its only paragraph with python-docx"""
+    from docx import Document
     
-    # Mix of Chinese and English text
-    text = draw(st.text(
-        alphabet=st.one_of(chinese_chars, ascii_chars),
-        min_size=10,
-        max_size=500
-    ))
+    doc = Document()
+    doc.add_paragraph(content)
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=256)
+def _xlsx_bytes(content: str) -> bytes:
+    """Build an XLSX with content in cell A1 with openpyxl"""
+    from openpyxl import Workbook
     
-    # Ensure we have some non-whitespace content
-    assume(text.strip())
-    return text
+    wb = Workbook()
+    wb.active['A1'] = content
+    buffer = BytesIO()
+    wb.save(buffer)
+    wb.close()
+    return buffer.getvalue()
+
+
+# Text content for XLSX cells: Excel treats strings starting with '=' as
+# formulas, so the first character is drawn from the alphabet without it
+XLSX_TEXT = st.builds(
+    lambda head, tail: (head + tail).rstrip(),
+    st.one_of(CHINESE, st.characters(min_codepoint=33, max_codepoint=126, blacklist_characters='=')),
+    st.text(alphabet=MIXED_ALPHABET, min_size=9, max_size=499)
+)
+
+# Pathological contents checked on every run, whatever the profile draws
+CHINESE_ONLY = "中文内容脱敏测试数据"
+ASCII_ONLY = "plain ASCII text only"
+FORMULA_LIKE = "=SUM(A1:A2) 公式内容"
 
 
 # Feature: data-desensitization-platform, Property 4: Multi-format Document Parsing
-@given(content=text_content())
+@given(content=TEXT_CONTENT)
+@example(content=CHINESE_ONLY)
+@example(content=ASCII_ONLY)
+@example(content=FORMULA_LIKE)
 @settings(
-    max_examples=100,
     deadline=None,
     suppress_health_check=[HealthCheck.function_scoped_fixture]
 )
 @pytest.mark.property_test
-def test_pdf_parsing_preserves_content(content):
+def test_pdf_parsing_preserves_content(parser, content):
     """
     Property 4: Multi-format Document Parsing
     Validates: Requirements 2.1
@@ -63,57 +105,39 @@ def test_pdf_parsing_preserves_content(content):
     due to font embedding issues. This test verifies that parsing succeeds
     and extracts non-empty content.
     """
-    parser = DocumentParser()
+    # Build the PDF in memory (handle potential font issues)
+    try:
+        data = _pdf_bytes(content)
+    except:
+        # If insertion fails, skip this example
+        assume(False)
     
-    # Create a temporary PDF file with the content
-    with tempfile.NamedTemporaryFile(mode='w+b', suffix='.pdf', delete=False) as tmp_file:
-        tmp_path = tmp_file.name
-        
-        try:
-            # Create PDF with PyMuPDF
-            doc = fitz.open()
-            page = doc.new_page()
-            
-            # Insert text (handle potential font issues)
-            try:
-                page.insert_text((50, 50), content, fontsize=12)
-            except:
-                # If insertion fails, skip this example
-                doc.close()
-                assume(False)
-            
-            doc.save(tmp_path)
-            doc.close()
-            
-            # Parse the PDF
-            result = parser.parse(tmp_path, 'pdf')
-            
-            # Verify the result
-            assert isinstance(result, ParsedDocument)
-            assert result.content is not None
-            assert len(result.content.strip()) > 0
-            
-            # Verify metadata
-            assert result.metadata['format'] == 'PDF'
-            assert result.metadata['page_count'] >= 1
-            
-            # Note: We don't strictly verify content match due to PDF rendering limitations
-            # The key property is that parsing succeeds and extracts text
-            
-        finally:
-            # Clean up
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+    # Parse the PDF
+    result = parser.parse_stream(BytesIO(data), 'pdf')
+    
+    # Verify the result
+    assert isinstance(result, ParsedDocument)
+    assert result.content is not None
+    assert len(result.content.strip()) > 0
+    
+    # Verify metadata
+    assert result.metadata['format'] == 'PDF'
+    assert result.metadata['page_count'] >= 1
+    
+    # Note: We don't strictly verify content match due to PDF rendering limitations
+    # The key property is that parsing succeeds and extracts text
 
 
-@given(content=text_content())
+@given(content=TEXT_CONTENT)
+@example(content=CHINESE_ONLY)
+@example(content=ASCII_ONLY)
+@example(content=FORMULA_LIKE)
 @settings(
-    max_examples=100,
     deadline=None,
     suppress_health_check=[HealthCheck.function_scoped_fixture]
 )
 @pytest.mark.property_test
-def test_docx_parsing_preserves_content(content):
+def test_docx_parsing_preserves_content(parser, content):
     """
     Property 4: Multi-format Document Parsing
     Validates: Requirements 2.2
@@ -121,47 +145,32 @@ def test_docx_parsing_preserves_content(content):
     For any DOCX document with known text content,
     when parsed, the extracted text should match the original content.
     """
-    parser = DocumentParser()
+    # Parse a DOCX built in memory
+    result = parser.parse_stream(BytesIO(_docx_bytes(content)), 'docx')
     
-    # Create a temporary DOCX file with the content
-    with tempfile.NamedTemporaryFile(mode='w+b', suffix='.docx', delete=False) as tmp_file:
-        tmp_path = tmp_file.name
-        
-        try:
-            # Create DOCX with python-docx
-            doc = Document()
-            doc.add_paragraph(content)
-            doc.save(tmp_path)
-            
-            # Parse the DOCX
-            result = parser.parse(tmp_path, 'docx')
-            
-            # Verify the result
-            assert isinstance(result, ParsedDocument)
-            assert result.content is not None
-            assert len(result.content.strip()) > 0
-            
-            # The content should match the original
-            assert content in result.content
-            
-            # Verify metadata
-            assert result.metadata['format'] == 'DOCX'
-            assert result.metadata['paragraph_count'] >= 1
-            
-        finally:
-            # Clean up
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+    # Verify the result
+    assert isinstance(result, ParsedDocument)
+    assert result.content is not None
+    assert len(result.content.strip()) > 0
+    
+    # The content should match the original
+    assert len(result.content) >= len(content)
+    assert content in result.content
+    
+    # Verify metadata
+    assert result.metadata['format'] == 'DOCX'
+    assert result.metadata['paragraph_count'] >= 1
 
 
-@given(content=text_content())
+@given(content=XLSX_TEXT)
+@example(content=CHINESE_ONLY)
+@example(content=ASCII_ONLY)
 @settings(
-    max_examples=100,
     deadline=None,
     suppress_health_check=[HealthCheck.function_scoped_fixture]
 )
 @pytest.mark.property_test
-def test_xlsx_parsing_preserves_content(content):
+def test_xlsx_parsing_preserves_content(parser, content):
     """
     Property 4: Multi-format Document Parsing
     Validates: Requirements 2.3
@@ -170,54 +179,35 @@ def test_xlsx_parsing_preserves_content(content):
     when parsed, the extracted text should contain the original content.
     
     Note: Excel treats strings starting with '=' as formulas, which may
-    result in empty cells. We filter such cases.
+    result in empty cells. XLSX_TEXT never generates such content.
     """
-    parser = DocumentParser()
+    # Parse an XLSX built in memory
+    result = parser.parse_stream(BytesIO(_xlsx_bytes(content)), 'xlsx')
     
-    # Skip content that starts with '=' as Excel treats it as a formula
-    assume(not content.startswith('='))
+    # Verify the result
+    assert isinstance(result, ParsedDocument)
+    assert result.content is not None
+    assert len(result.content.strip()) > 0
     
-    # Create a temporary XLSX file with the content
-    with tempfile.NamedTemporaryFile(mode='w+b', suffix='.xlsx', delete=False) as tmp_file:
-        tmp_path = tmp_file.name
-        
-        try:
-            # Create XLSX with openpyxl
-            wb = Workbook()
-            ws = wb.active
-            ws['A1'] = content
-            wb.save(tmp_path)
-            wb.close()
-            
-            # Parse the XLSX
-            result = parser.parse(tmp_path, 'xlsx')
-            
-            # Verify the result
-            assert isinstance(result, ParsedDocument)
-            assert result.content is not None
-            assert len(result.content.strip()) > 0
-            
-            # The content should contain the original text
-            assert content in result.content
-            
-            # Verify metadata
-            assert result.metadata['format'] == 'XLSX'
-            assert result.metadata['sheet_count'] >= 1
-            
-        finally:
-            # Clean up
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+    # The content should contain the original text
+    assert len(result.content) >= len(content)
+    assert content in result.content
+    
+    # Verify metadata
+    assert result.metadata['format'] == 'XLSX'
+    assert result.metadata['sheet_count'] >= 1
 
 
-@given(content=text_content())
+@given(content=TEXT_CONTENT)
+@example(content=CHINESE_ONLY)
+@example(content=ASCII_ONLY)
+@example(content=FORMULA_LIKE)
 @settings(
-    max_examples=100,
     deadline=None,
     suppress_health_check=[HealthCheck.function_scoped_fixture]
 )
 @pytest.mark.property_test
-def test_txt_parsing_preserves_content(content):
+def test_txt_parsing_preserves_content(parser, content):
     """
     Property 4: Multi-format Document Parsing
     Validates: Requirements 2.4
@@ -225,8 +215,6 @@ def test_txt_parsing_preserves_content(content):
     For any TXT document with known text content,
     when parsed, the extracted text should match the original content.
     """
-    parser = DocumentParser()
-    
     # Create a temporary TXT file with the content
     with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as tmp_file:
         tmp_path = tmp_file.name
@@ -236,13 +224,9 @@ def test_txt_parsing_preserves_content(content):
         # Parse the TXT
         result = parser.parse(tmp_path, 'txt')
         
-        # Verify the result
+        # Verify the result; TEXT_CONTENT is never blank, so equality implies content
         assert isinstance(result, ParsedDocument)
-        assert result.content is not None
-        assert len(result.content.strip()) > 0
-        
-        # The content should match exactly
-        assert content == result.content
+        assert result.content == content
         
         # Verify metadata
         assert result.metadata['format'] == 'TXT'
@@ -250,52 +234,39 @@ def test_txt_parsing_preserves_content(content):
         
     finally:
         # Clean up
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+        Path(tmp_path).unlink(missing_ok=True)
 
 
 
 # Feature: data-desensitization-platform, Property 5: Mixed Language Content Handling
-@given(
-    chinese_text=st.text(
-        alphabet=st.characters(
-            whitelist_categories=('Lo',),
-            min_codepoint=0x4E00,
-            max_codepoint=0x9FFF
-        ),
-        min_size=5,
-        max_size=100
-    ),
-    english_text=st.text(
-        alphabet=st.characters(min_codepoint=65, max_codepoint=122),
-        min_size=5,
-        max_size=100
-    )
-)
+@pytest.mark.parametrize("fmt", ["txt", "docx"])
+@given(chinese_text=CHINESE_TEXT, english_text=ENGLISH_TEXT)
 @settings(
-    max_examples=100,
     deadline=None,
     suppress_health_check=[HealthCheck.function_scoped_fixture]
 )
 @pytest.mark.property_test
-def test_mixed_language_content_handling(chinese_text, english_text):
+def test_mixed_language_content_handling(parser, fmt, chinese_text, english_text):
     """
     Property 5: Mixed Language Content Handling
     Validates: Requirements 2.6
     
-    For any document containing both Chinese and English text,
+    For any TXT or DOCX document containing both Chinese and English text,
     when parsed, the extracted content should preserve all characters
     from both languages correctly.
     """
-    # Ensure we have actual content
-    assume(chinese_text.strip() and english_text.strip())
-    
     # Create mixed content
     mixed_content = f"{chinese_text} {english_text}"
     
-    parser = DocumentParser()
+    if fmt == 'docx':
+        result = parser.parse_stream(BytesIO(_docx_bytes(mixed_content)), 'docx')
+        
+        # Verify both Chinese and English content are preserved
+        assert chinese_text in result.content
+        assert english_text in result.content
+        return
     
-    # Test with TXT format (simplest to verify)
+    # TXT goes through a file on disk, like an uploaded document
     with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as tmp_file:
         tmp_path = tmp_file.name
         tmp_file.write(mixed_content)
@@ -303,72 +274,8 @@ def test_mixed_language_content_handling(chinese_text, english_text):
     try:
         result = parser.parse(tmp_path, 'txt')
         
-        # Verify both Chinese and English content are preserved
-        assert chinese_text in result.content
-        assert english_text in result.content
-        
-        # Verify the full mixed content is present
-        assert mixed_content == result.content
+        # Verify both Chinese and English content are preserved exactly
+        assert result.content == mixed_content
         
     finally:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-
-
-@given(
-    chinese_text=st.text(
-        alphabet=st.characters(
-            whitelist_categories=('Lo',),
-            min_codepoint=0x4E00,
-            max_codepoint=0x9FFF
-        ),
-        min_size=5,
-        max_size=100
-    ),
-    english_text=st.text(
-        alphabet=st.characters(min_codepoint=65, max_codepoint=122),
-        min_size=5,
-        max_size=100
-    )
-)
-@settings(
-    max_examples=100,
-    deadline=None,
-    suppress_health_check=[HealthCheck.function_scoped_fixture]
-)
-@pytest.mark.property_test
-def test_mixed_language_docx_handling(chinese_text, english_text):
-    """
-    Property 5: Mixed Language Content Handling (DOCX)
-    Validates: Requirements 2.6
-    
-    For any DOCX document containing both Chinese and English text,
-    when parsed, the extracted content should preserve all characters
-    from both languages correctly.
-    """
-    # Ensure we have actual content
-    assume(chinese_text.strip() and english_text.strip())
-    
-    # Create mixed content
-    mixed_content = f"{chinese_text} {english_text}"
-    
-    parser = DocumentParser()
-    
-    # Test with DOCX format
-    with tempfile.NamedTemporaryFile(mode='w+b', suffix='.docx', delete=False) as tmp_file:
-        tmp_path = tmp_file.name
-        
-        try:
-            doc = Document()
-            doc.add_paragraph(mixed_content)
-            doc.save(tmp_path)
-            
-            result = parser.parse(tmp_path, 'docx')
-            
-            # Verify both Chinese and English content are preserved
-            assert chinese_text in result.content
-            assert english_text in result.content
-            
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        Path(tmp_path).unlink(missing_ok=True)
@@ -5,69 +5,54 @@ Feature: data-desensitization-platform
 """
 
 import pytest
-from hypothesis import given, strategies as st, settings, assume
+from hypothesis import given, strategies as st, settings
 from hypothesis import HealthCheck
-import tempfile
-import os
+import re
 from datetime import datetime
 from io import BytesIO
 
-from app.file_exporter import FileExporter, FileExportError
+from app.file_exporter import FileExporter
+from tests.strategies import TEXT_CONTENT, METADATA_DICT
 
-# Import document reading libraries for verification
-from docx import Document
-from openpyxl import load_workbook
 
+@pytest.fixture(scope="module")
+def exporter():
+    """File exporter shared by every example in this module"""
+    return FileExporter()
 
-# Hypothesis strategies for generating test data
-@st.composite
-def text_content(draw):
-    """Generate text content with mixed Chinese and English"""
-    chinese_chars = st.characters(
-        whitelist_categories=('Lo',),
-        min_codepoint=0x4E00,
-        max_codepoint=0x9FFF
-    )
-    ascii_chars = st.characters(min_codepoint=32, max_codepoint=126)
-    
-    text = draw(st.text(
-        alphabet=st.one_of(chinese_chars, ascii_chars),
-        min_size=10,
-        max_size=500
-    ))
-    
-    assume(text.strip())
-    return text
 
+# Deletion table for the control characters the exporter strips from metadata
+_CONTROL_CHARS = dict.fromkeys(i for i in range(0x20) if chr(i) not in '\t\n\r')
+
+# Export filename timestamp, YYYYMMDD_HHMMSS
+_TIMESTAMP_RE = re.compile(r'\d{8}_\d{6}')
+
+# Markdown YAML frontmatter block at the start of the export, flagged as desensitized
+_FRONTMATTER_RE = re.compile(r'---\n(?:.*\n)*?desensitized: true\n(?:.*\n)*?---\n')
 
-@st.composite
-def metadata_dict(draw):
-    """Generate metadata dictionary"""
-    metadata = {}
-    
-    # Optional fields
-    if draw(st.booleans()):
-        metadata['title'] = draw(st.text(min_size=1, max_size=50))
-    if draw(st.booleans()):
-        metadata['author'] = draw(st.text(min_size=1, max_size=50))
-    if draw(st.booleans()):
-        metadata['subject'] = draw(st.text(min_size=1, max_size=50))
-    
-    return metadata
+
+def _cell_texts(wb):
+    """Yield the text of every non-blank cell in the workbook, row by row"""
+    for sheet_name in wb.sheetnames:
+        for row in wb[sheet_name].iter_rows(values_only=True):
+            for cell in row:
+                if cell is not None:
+                    text = str(cell)
+                    if text.strip():
+                        yield text
 
 
 # Feature: data-desensitization-platform, Property 16: Format-preserving Export
 @given(
-    content=text_content(),
-    metadata=metadata_dict()
+    content=TEXT_CONTENT,
+    metadata=METADATA_DICT
 )
 @settings(
-    max_examples=100,
     deadline=None,
     suppress_health_check=[HealthCheck.function_scoped_fixture]
 )
 @pytest.mark.property_test
-def test_txt_export_format_preservation(content, metadata):
+def test_txt_export_format_preservation(exporter, content, metadata):
     """
     Property 16: Format-preserving Export
     Validates: Requirements 7.1, 7.6
@@ -76,8 +61,6 @@ def test_txt_export_format_preservation(content, metadata):
     when exported with default settings, the output format should be TXT
     and content should be preserved.
     """
-    exporter = FileExporter()
-    
     # Export to TXT (default for TXT input)
     result = exporter.export(
         content=content,
@@ -95,16 +78,15 @@ def test_txt_export_format_preservation(content, metadata):
 
 
 @given(
-    content=text_content(),
-    metadata=metadata_dict()
+    content=TEXT_CONTENT,
+    metadata=METADATA_DICT
 )
 @settings(
-    max_examples=100,
     deadline=None,
     suppress_health_check=[HealthCheck.function_scoped_fixture]
 )
 @pytest.mark.property_test
-def test_docx_export_format_preservation(content, metadata):
+def test_docx_export_format_preservation(exporter, content, metadata):
     """
     Property 16: Format-preserving Export
     Validates: Requirements 7.1, 7.4
@@ -113,8 +95,6 @@ def test_docx_export_format_preservation(content, metadata):
     when exported with default settings, the output format should be DOCX
     and content should be preserved.
     """
-    exporter = FileExporter()
-    
     # Export to DOCX (default for DOCX input)
     result = exporter.export(
         content=content,
@@ -128,6 +108,8 @@ def test_docx_export_format_preservation(content, metadata):
     assert len(result) > 0
     
     # Verify it's a valid DOCX by reading it back
+    from docx import Document
+    
     buffer = BytesIO(result)
     doc = Document(buffer)
     
@@ -140,24 +122,23 @@ def test_docx_export_format_preservation(content, metadata):
     # Verify metadata if provided
     if metadata.get('title'):
         # Metadata should be sanitized (control characters removed)
-        sanitized_title = ''.join(char for char in metadata['title'] if ord(char) >= 0x20 or char in '\t\n\r')
+        sanitized_title = metadata['title'].translate(_CONTROL_CHARS)
         assert doc.core_properties.title == sanitized_title
     if metadata.get('author'):
-        sanitized_author = ''.join(char for char in metadata['author'] if ord(char) >= 0x20 or char in '\t\n\r')
+        sanitized_author = metadata['author'].translate(_CONTROL_CHARS)
         assert doc.core_properties.author == sanitized_author
 
 
 @given(
-    content=text_content(),
-    metadata=metadata_dict()
+    content=TEXT_CONTENT,
+    metadata=METADATA_DICT
 )
 @settings(
-    max_examples=100,
     deadline=None,
     suppress_health_check=[HealthCheck.function_scoped_fixture]
 )
 @pytest.mark.property_test
-def test_xlsx_export_format_preservation(content, metadata):
+def test_xlsx_export_format_preservation(exporter, content, metadata):
     """
     Property 16: Format-preserving Export
     Validates: Requirements 7.1, 7.5
@@ -166,8 +147,6 @@ def test_xlsx_export_format_preservation(content, metadata):
     when exported with default settings, the output format should be XLSX
     and content should be preserved.
     """
-    exporter = FileExporter()
-    
     # Export to XLSX (default for XLSX input)
     result = exporter.export(
         content=content,
@@ -181,39 +160,30 @@ def test_xlsx_export_format_preservation(content, metadata):
     assert len(result) > 0
     
     # Verify it's a valid XLSX by reading it back
-    buffer = BytesIO(result)
-    wb = load_workbook(buffer)
+    from openpyxl import load_workbook
     
-    # Extract text from workbook
-    extracted_text = []
-    for sheet_name in wb.sheetnames:
-        sheet = wb[sheet_name]
-        for row in sheet.iter_rows(values_only=True):
-            row_values = [str(cell) for cell in row if cell is not None and str(cell).strip()]
-            if row_values:
-                extracted_text.extend(row_values)
-    
-    full_extracted = ' '.join(extracted_text)
+    wb = load_workbook(BytesIO(result), read_only=True, data_only=True)
+    try:
+        full_extracted = ' '.join(_cell_texts(wb))
+    finally:
+        wb.close()
     
     # Verify content is preserved (should contain original content)
-    assert content in full_extracted or any(word in full_extracted for word in content.split()[:5])
-    
-    wb.close()
+    assert content in full_extracted or any(word in full_extracted for word in content.split(None, 5)[:5])
 
 
 # Feature: data-desensitization-platform, Property 17: Markdown Export Support
 @given(
-    content=text_content(),
+    content=TEXT_CONTENT,
     original_format=st.sampled_from(['pdf', 'docx', 'xlsx', 'txt']),
-    metadata=metadata_dict()
+    metadata=METADATA_DICT
 )
 @settings(
-    max_examples=100,
     deadline=None,
     suppress_health_check=[HealthCheck.function_scoped_fixture]
 )
 @pytest.mark.property_test
-def test_markdown_export_support(content, original_format, metadata):
+def test_markdown_export_support(exporter, content, original_format, metadata):
     """
     Property 17: Markdown Export Support
     Validates: Requirements 7.2, 7.7
@@ -222,8 +192,6 @@ def test_markdown_export_support(content, original_format, metadata):
     when exported with MD format selected, the output should be
     a valid Markdown file.
     """
-    exporter = FileExporter()
-    
     # Export to MD regardless of original format
     result = exporter.export(
         content=content,
@@ -240,12 +208,11 @@ def test_markdown_export_support(content, original_format, metadata):
     assert len(decoded_content) > 0
     
     # Verify original content is preserved in markdown
-    assert content in decoded_content or any(word in decoded_content for word in content.split()[:5])
+    assert content in decoded_content or any(word in decoded_content for word in content.split(None, 5)[:5])
     
     # Verify markdown metadata header if metadata provided
     if metadata:
-        assert '---' in decoded_content  # YAML frontmatter
-        assert 'desensitized: true' in decoded_content
+        assert _FRONTMATTER_RE.match(decoded_content)  # YAML frontmatter
         
         if metadata.get('title'):
             # Title should appear in frontmatter or as heading
@@ -253,16 +220,15 @@ def test_markdown_export_support(content, original_format, metadata):
 
 
 @given(
-    content=text_content(),
-    metadata=metadata_dict()
+    content=TEXT_CONTENT,
+    metadata=METADATA_DICT
 )
 @settings(
-    max_examples=100,
     deadline=None,
     suppress_health_check=[HealthCheck.function_scoped_fixture]
 )
 @pytest.mark.property_test
-def test_markdown_export_with_tables(content, metadata):
+def test_markdown_export_with_tables(exporter, content, metadata):
     """
     Property 17: Markdown Export Support (with tables)
     Validates: Requirements 7.2, 7.7
@@ -270,8 +236,6 @@ def test_markdown_export_with_tables(content, metadata):
     For any content with table-like structure (pipe-separated),
     when exported to MD, tables should be formatted correctly.
     """
-    exporter = FileExporter()
-    
     # Create content with table structure
     table_content = f"{content}\nColumn1 | Column2 | Column3\nValue1 | Value2 | Value3"
     
@@ -304,9 +268,9 @@ def test_markdown_export_with_tables(content, metadata):
         max_value=datetime(2030, 12, 31)
     )
 )
-@settings(max_examples=100, deadline=None)
+@settings(deadline=None)
 @pytest.mark.property_test
-def test_export_filename_convention(original_filename, output_format, timestamp):
+def test_export_filename_convention(exporter, original_filename, output_format, timestamp):
     """
     Property 18: Export Filename Convention
     Validates: Requirements 7.8
@@ -314,8 +278,6 @@ def test_export_filename_convention(original_filename, output_format, timestamp)
     For any exported desensitized file, the filename should include
     the original filename and a timestamp in a consistent format.
     """
-    exporter = FileExporter()
-    
     # Add extension to original filename
     original_with_ext = f"{original_filename}.pdf"
     
@@ -355,9 +317,9 @@ def test_export_filename_convention(original_filename, output_format, timestamp)
     ),
     output_format=st.sampled_from(['txt', 'md', 'docx', 'xlsx'])
 )
-@settings(max_examples=100, deadline=None)
+@settings(deadline=None)
 @pytest.mark.property_test
-def test_export_filename_without_timestamp(original_filename, output_format):
+def test_export_filename_without_timestamp(exporter, original_filename, output_format):
     """
     Property 18: Export Filename Convention (default timestamp)
     Validates: Requirements 7.8
@@ -365,8 +327,6 @@ def test_export_filename_without_timestamp(original_filename, output_format):
     For any exported file without explicit timestamp,
     the filename should use current time.
     """
-    exporter = FileExporter()
-    
     # Add extension to original filename
     original_with_ext = f"{original_filename}.pdf"
     
@@ -383,7 +343,4 @@ def test_export_filename_without_timestamp(original_filename, output_format):
     assert result_filename.endswith(f'.{output_format}')
     
     # Should contain a timestamp (8 digits for date + underscore + 6 digits for time)
-    # Pattern: YYYYMMDD_HHMMSS
-    import re
-    timestamp_pattern = r'\d{8}_\d{6}'
-    assert re.search(timestamp_pattern, result_filename) is not None
+    assert _TIMESTAMP_RE.search(result_filename) is not None
@@ -6,11 +6,13 @@ Feature: data-desensitization-platform
 
 import pytest
 from hypothesis import given, strategies as st, settings
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, create_engine, event, select
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 import io
 import os
+import shutil
+import tempfile
 import uuid
 
 from app.database import Base, get_db
@@ -19,10 +21,40 @@ from app.models import Task, OperationLog, DesensitizationRule, SensitiveItem
 from app.schemas import DataType, StrategyType
 
 
-# Test database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test_logging.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Test database setup: an in-memory database, private to each pytest-xdist
+# worker process. StaticPool hands the endpoints' sessions and the test's own
+# sessions the same connection, and therefore the same database
+SQLALCHEMY_DATABASE_URL = "sqlite://"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Drop durability work that is worthless for a throwaway test database"""
+    cursor = dbapi_connection.cursor()
+    cursor.executescript(
+        "PRAGMA synchronous=OFF;"
+        "PRAGMA journal_mode=MEMORY;"
+        "PRAGMA temp_store=MEMORY;"
+    )
+    cursor.close()
+    # pysqlite's own transaction handling breaks SAVEPOINTs; let SQLAlchemy
+    # emit BEGIN itself (same workaround as the test_engine fixture in conftest.py)
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+# Bound to each test's connection by rollback_transaction; commits made through
+# these sessions only release SAVEPOINTs inside that test's transaction
+TestingSessionLocal = sessionmaker(autoflush=False, join_transaction_mode="create_savepoint")
 
 
 def override_get_db():
@@ -33,54 +65,86 @@ def override_get_db():
         db.close()
 
 
-app.dependency_overrides[get_db] = override_get_db
-client = TestClient(app)
-
-
-@pytest.fixture(scope="function", autouse=True)
+@pytest.fixture(scope="module", autouse=True)
 def setup_database():
-    """Setup test database before each test"""
+    """Create the schema and default rules once for the module"""
     Base.metadata.create_all(bind=engine)
     
-    # Create test upload directory
-    os.makedirs("/tmp/test_uploads_logging", exist_ok=True)
+    # Upload into a private directory, on tmpfs where available. Uploads are
+    # named after their task id, so they never collide and the directory is
+    # only removed once, at the end of the module
+    upload_dir = tempfile.mkdtemp(
+        prefix="test_uploads_logging_",
+        dir="/dev/shm" if os.path.isdir("/dev/shm") else None
+    )
     
     # Set upload directory for tests
     from app.config import settings
-    settings.upload_dir = "/tmp/test_uploads_logging"
+    previous_upload_dir = settings.upload_dir
+    settings.upload_dir = upload_dir
     
-    # Create default desensitization rules
-    db = TestingSessionLocal()
-    rules = [
-        DesensitizationRule(
-            name="手机号脱敏",
-            data_type=DataType.PHONE.value,
-            strategy=StrategyType.MASK.value,
-            is_system=True,
-            enabled=True
-        ),
-        DesensitizationRule(
-            name="身份证脱敏",
-            data_type=DataType.ID_CARD.value,
-            strategy=StrategyType.MASK.value,
-            is_system=True,
-            enabled=True
-        ),
-    ]
-    for rule in rules:
-        db.add(rule)
-    db.commit()
-    db.close()
+    # Create default desensitization rules (one Core executemany, no ORM flush)
+    with engine.begin() as connection:
+        connection.execute(
+            DesensitizationRule.__table__.insert(),
+            [
+                {
+                    "name": "手机号脱敏",
+                    "data_type": DataType.PHONE.value,
+                    "strategy": StrategyType.MASK.value,
+                    "is_system": True,
+                    "enabled": True,
+                },
+                {
+                    "name": "身份证脱敏",
+                    "data_type": DataType.ID_CARD.value,
+                    "strategy": StrategyType.MASK.value,
+                    "is_system": True,
+                    "enabled": True,
+                },
+            ]
+        )
     
     yield
     
     # Cleanup
+    settings.upload_dir = previous_upload_dir
+    shutil.rmtree(upload_dir, ignore_errors=True)
     Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def rollback_transaction():
+    """
+    Run each test inside a transaction that is rolled back afterwards.
+    
+    The test's sessions and the endpoints' (via override_get_db) all join it,
+    so nothing a test writes outlives the test and no rows need deleting.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    TestingSessionLocal.configure(bind=connection)
     
-    # Clean up test files
-    if os.path.exists("/tmp/test_uploads_logging"):
-        for file in os.listdir("/tmp/test_uploads_logging"):
-            os.remove(os.path.join("/tmp/test_uploads_logging", file))
+    # Installed per test, like test_properties_api.py, so it never redirects
+    # another module's requests
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+        transaction.rollback()
+        connection.close()
+
+
+# Log entry of one operation type for a task, built once and bound per query
+_LOG_BY_TASK_STMT = select(OperationLog).where(
+    OperationLog.task_id == bindparam("task_id"),
+    OperationLog.operation_type == bindparam("operation_type")
+)
 
 
 # Strategies for generating test data
@@ -98,9 +162,9 @@ file_content_strategy = st.binary(min_size=1, max_size=1024)
         max_size=20
     )
 )
-@settings(max_examples=100, deadline=None)
+@settings(deadline=None)
 @pytest.mark.property_test
-def test_upload_operation_logging(file_extension, file_content, filename_base):
+def test_upload_operation_logging(client, file_extension, file_content, filename_base):
     """
     Property 18: Upload Operation Logging
     
@@ -122,21 +186,20 @@ def test_upload_operation_logging(file_extension, file_content, filename_base):
     # Should accept the upload
     assert response.status_code == 200
     data = response.json()
-    task_id = data["id"]
+    task_id = uuid.UUID(data["id"])
     
     # Query the database for the log entry
     db = TestingSessionLocal()
     try:
-        log_entry = db.query(OperationLog).filter(
-            OperationLog.task_id == uuid.UUID(task_id),
-            OperationLog.operation_type == "upload"
-        ).first()
+        log_entry = db.execute(
+            _LOG_BY_TASK_STMT, {"task_id": task_id, "operation_type": "upload"}
+        ).scalars().first()
         
         # Log entry should exist
         assert log_entry is not None
         
         # Log should contain required fields
-        assert log_entry.task_id == uuid.UUID(task_id)
+        assert log_entry.task_id == task_id
         assert log_entry.operation_type == "upload"
         assert log_entry.created_at is not None  # Timestamp
         
@@ -162,9 +225,9 @@ def test_upload_operation_logging(file_extension, file_content, filename_base):
     text_content=st.text(min_size=50, max_size=500),
     phone_number=st.from_regex(r'1[3-9]\d{9}', fullmatch=True)
 )
-@settings(max_examples=100, deadline=None)
+@settings(deadline=None)
 @pytest.mark.property_test
-def test_desensitization_operation_logging(text_content, phone_number):
+def test_desensitization_operation_logging(client, text_content, phone_number):
     """
     Property 19: Desensitization Operation Logging
     
@@ -202,9 +265,11 @@ def test_desensitization_operation_logging(text_content, phone_number):
         db.refresh(sensitive_item)
         
         # Get a rule
-        rule = db.query(DesensitizationRule).filter(
-            DesensitizationRule.data_type == DataType.PHONE.value
-        ).first()
+        rule = db.execute(
+            select(DesensitizationRule).where(
+                DesensitizationRule.data_type == DataType.PHONE.value
+            )
+        ).scalars().first()
         
         # Call preview endpoint (which triggers desensitization logging)
         response = client.post(
@@ -219,10 +284,9 @@ def test_desensitization_operation_logging(text_content, phone_number):
         assert response.status_code == 200
         
         # Query the database for the log entry
-        log_entry = db.query(OperationLog).filter(
-            OperationLog.task_id == task.id,
-            OperationLog.operation_type == "desensitization"
-        ).first()
+        log_entry = db.execute(
+            _LOG_BY_TASK_STMT, {"task_id": task.id, "operation_type": "desensitization"}
+        ).scalars().first()
         
         # Log entry should exist
         assert log_entry is not None
@@ -264,9 +328,9 @@ def test_desensitization_operation_logging(text_content, phone_number):
     ),
     output_format=st.sampled_from(["txt", "md"])  # Only test formats that handle all text
 )
-@settings(max_examples=100, deadline=None)
+@settings(deadline=None)
 @pytest.mark.property_test
-def test_download_operation_logging(text_content, output_format):
+def test_download_operation_logging(client, text_content, output_format):
     """
     Property 20: Download Operation Logging
     
@@ -291,7 +355,7 @@ def test_download_operation_logging(text_content, output_format):
         db.refresh(task)
         
         # Get a rule
-        rule = db.query(DesensitizationRule).first()
+        rule = db.execute(select(DesensitizationRule).limit(1)).scalars().first()
         
         # Call export endpoint (which triggers download logging)
         response = client.post(
@@ -306,10 +370,9 @@ def test_download_operation_logging(text_content, output_format):
         assert response.status_code == 200
         
         # Query the database for the log entry
-        log_entry = db.query(OperationLog).filter(
-            OperationLog.task_id == task.id,
-            OperationLog.operation_type == "download"
-        ).first()
+        log_entry = db.execute(
+            _LOG_BY_TASK_STMT, {"task_id": task.id, "operation_type": "download"}
+        ).scalars().first()
         
         # Log entry should exist
         assert log_entry is not None
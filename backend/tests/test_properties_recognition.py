@@ -4,27 +4,102 @@ Property-based tests for the Recognition Engine.
 These tests verify universal properties that should hold across all inputs.
 """
 
+from functools import lru_cache
+
 import pytest
 from hypothesis import given, strategies as st, settings, assume
 from app.recognition_engine import RecognitionEngine, SensitiveItem, REGEX_PATTERNS
+from tests.strategies import CHINESE
 
 
-# Feature: data-desensitization-platform, Property 6: Regex-based Sensitive Data Recognition
-@given(
-    phone=st.from_regex(r'1[3-9]\d{9}', fullmatch=True),
-    text_before=st.text(
-        alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),  # Exclude digits
-        min_size=0, 
-        max_size=100
+@pytest.fixture(scope="module")
+def recognition_engine():
+    """Recognition engine shared by every example in this module (the NLP model loads once)"""
+    return RecognitionEngine()
+
+
+@pytest.fixture(scope="module")
+def identify_regex(recognition_engine):
+    """
+    Regex-only recognition, memoized on the text for the module.
+    
+    Regex recognition is deterministic, and Hypothesis often reaches the
+    same text through different draws (especially while shrinking), so
+    repeated texts reuse the first result. The cache goes with the module.
+    """
+    @lru_cache(maxsize=1024)
+    def cached(text):
+        return tuple(recognition_engine.identify_sensitive_data(text, use_nlp=False))
+    
+    def identify(text):
+        return list(cached(text))
+    
+    return identify
+
+
+# Hypothesis strategies shared by the properties below, built once at import.
+# Drawn from the engine's own compiled patterns, so they honour re.ASCII and
+# only produce the digits 0-9
+phone_numbers = st.from_regex(REGEX_PATTERNS['phone'], fullmatch=True)
+id_card_numbers = st.from_regex(REGEX_PATTERNS['id_card'], fullmatch=True)
+bank_card_numbers = st.from_regex(REGEX_PATTERNS['bank_card'], fullmatch=True)
+
+# Surrounding text without digits, so it cannot extend a numeric match
+non_digit_text = st.text(
+    alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),  # Exclude digits
+    min_size=0,
+    max_size=100
+)
+
+# Email parts, and surrounding text without any character an email can contain
+email_local_parts = st.from_regex(r'[a-zA-Z0-9._%+-]{1,20}', fullmatch=True)
+email_domains = st.from_regex(r'[a-zA-Z0-9.-]{1,20}', fullmatch=True)
+email_tlds = st.from_regex(r'[a-zA-Z]{2,10}', fullmatch=True)
+non_email_text = st.text(
+    alphabet=st.characters(
+        blacklist_categories=('Cs',),
+        blacklist_characters='@.0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_%-+'
     ),
-    text_after=st.text(
-        alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),  # Exclude digits
-        min_size=0, 
-        max_size=100
-    )
+    min_size=0,
+    max_size=50
 )
+emails = st.builds(
+    lambda local_part, domain, tld: f"{local_part}@{domain}.{tld}",
+    email_local_parts, email_domains, email_tlds
+)
+
+# Chinese names and address parts, from the shared CJK alphabet, and the
+# arbitrary text a name is embedded in
+chinese_names = st.text(alphabet=CHINESE, min_size=2, max_size=4)
+chinese_address_parts = st.lists(st.text(alphabet=CHINESE, min_size=2, max_size=10), min_size=2, max_size=4)
+any_text = st.text(alphabet=st.characters(blacklist_categories=('Cs',)), min_size=0, max_size=50)
+
+
+@st.composite
+def embedded(draw, values, surrounding):
+    """
+    Draw a value embedded in surrounding text, in one strategy draw.
+    
+    Args:
+        draw: Hypothesis draw function
+        values: Strategy for the embedded value
+        surrounding: Strategy for the text before and after it
+        
+    Returns:
+        Tuple of (text, value); the value does not also appear in the
+        surrounding text
+    """
+    value = draw(values)
+    text_before = draw(surrounding)
+    text_after = draw(surrounding)
+    assume(value not in text_before and value not in text_after)
+    return f"{text_before}{value}{text_after}", value
+
+
+# Feature: data-desensitization-platform, Property 6: Regex-based Sensitive Data Recognition
+@given(sample=embedded(phone_numbers, non_digit_text))
 @settings(max_examples=100)
-def test_phone_number_recognition(phone, text_before, text_after):
+def test_phone_number_recognition(identify_regex, sample):
     """
     Property 6: Regex-based Sensitive Data Recognition
     
@@ -33,14 +108,10 @@ def test_phone_number_recognition(phone, text_before, text_after):
     
     Validates: Requirements 3.2, 3.3, 3.4, 3.5
     """
-    # Ensure the phone number doesn't accidentally appear in the surrounding text
-    assume(phone not in text_before)
-    assume(phone not in text_after)
+    # The phone number doesn't accidentally appear in the surrounding text
+    text, phone = sample
     
-    text = f"{text_before}{phone}{text_after}"
-    recognition_engine = RecognitionEngine()
-    
-    items = recognition_engine.identify_sensitive_data(text, use_nlp=False)
+    items = identify_regex(text)
     
     # Find phone items
     phone_items = [item for item in items if item.type == 'phone']
@@ -58,21 +129,9 @@ def test_phone_number_recognition(phone, text_before, text_after):
         f"Position mismatch: text[{phone_item.start_pos}:{phone_item.end_pos}] = {text[phone_item.start_pos:phone_item.end_pos]}, expected {phone}"
 
 
-@given(
-    id_card=st.from_regex(r'\d{17}[\dXx]', fullmatch=True),
-    text_before=st.text(
-        alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),  # Exclude digits
-        min_size=0, 
-        max_size=100
-    ),
-    text_after=st.text(
-        alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),  # Exclude digits
-        min_size=0, 
-        max_size=100
-    )
-)
+@given(sample=embedded(id_card_numbers, non_digit_text))
 @settings(max_examples=100)
-def test_id_card_recognition(id_card, text_before, text_after):
+def test_id_card_recognition(identify_regex, sample):
     """
     Property 6: Regex-based Sensitive Data Recognition
     
@@ -81,13 +140,9 @@ def test_id_card_recognition(id_card, text_before, text_after):
     
     Validates: Requirements 3.2, 3.3, 3.4, 3.5
     """
-    assume(id_card not in text_before)
-    assume(id_card not in text_after)
+    text, id_card = sample
     
-    text = f"{text_before}{id_card}{text_after}"
-    recognition_engine = RecognitionEngine()
-    
-    items = recognition_engine.identify_sensitive_data(text, use_nlp=False)
+    items = identify_regex(text)
     
     # Find ID card items
     id_card_items = [item for item in items if item.type == 'id_card']
@@ -103,30 +158,10 @@ def test_id_card_recognition(id_card, text_before, text_after):
     assert text[id_card_item.start_pos:id_card_item.end_pos] == id_card
 
 
-@given(
-    # Generate simpler emails that match our regex pattern
-    local_part=st.from_regex(r'[a-zA-Z0-9._%+-]+', fullmatch=True).filter(lambda x: len(x) >= 1 and len(x) <= 20),
-    domain=st.from_regex(r'[a-zA-Z0-9.-]+', fullmatch=True).filter(lambda x: len(x) >= 1 and len(x) <= 20),
-    tld=st.from_regex(r'[a-zA-Z]{2,}', fullmatch=True).filter(lambda x: len(x) >= 2 and len(x) <= 10),
-    text_before=st.text(
-        alphabet=st.characters(
-            blacklist_categories=('Cs',), 
-            blacklist_characters='@.0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_%-+'
-        ),
-        min_size=0, 
-        max_size=50
-    ),
-    text_after=st.text(
-        alphabet=st.characters(
-            blacklist_categories=('Cs',), 
-            blacklist_characters='@.0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_%-+'
-        ),
-        min_size=0, 
-        max_size=50
-    )
-)
+# Generate simpler emails that match our regex pattern
+@given(sample=embedded(emails, non_email_text))
 @settings(max_examples=100)
-def test_email_recognition(local_part, domain, tld, text_before, text_after):
+def test_email_recognition(identify_regex, sample):
     """
     Property 6: Regex-based Sensitive Data Recognition
     
@@ -135,14 +170,9 @@ def test_email_recognition(local_part, domain, tld, text_before, text_after):
     
     Validates: Requirements 3.2, 3.3, 3.4, 3.5
     """
-    email = f"{local_part}@{domain}.{tld}"
-    assume(email not in text_before)
-    assume(email not in text_after)
+    text, email = sample
     
-    text = f"{text_before}{email}{text_after}"
-    recognition_engine = RecognitionEngine()
-    
-    items = recognition_engine.identify_sensitive_data(text, use_nlp=False)
+    items = identify_regex(text)
     
     # Find email items
     email_items = [item for item in items if item.type == 'email']
@@ -155,21 +185,9 @@ def test_email_recognition(local_part, domain, tld, text_before, text_after):
         f"Expected to find exact email {email}, found {[item.value for item in email_items]}"
 
 
-@given(
-    bank_card=st.from_regex(r'\d{16,19}', fullmatch=True),
-    text_before=st.text(
-        alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),  # Exclude digits
-        min_size=0, 
-        max_size=100
-    ),
-    text_after=st.text(
-        alphabet=st.characters(blacklist_categories=('Cs', 'Nd')),  # Exclude digits
-        min_size=0, 
-        max_size=100
-    )
-)
+@given(sample=embedded(bank_card_numbers, non_digit_text))
 @settings(max_examples=100)
-def test_bank_card_recognition(bank_card, text_before, text_after):
+def test_bank_card_recognition(identify_regex, sample):
     """
     Property 6: Regex-based Sensitive Data Recognition
     
@@ -178,16 +196,13 @@ def test_bank_card_recognition(bank_card, text_before, text_after):
     
     Validates: Requirements 3.2, 3.3, 3.4, 3.5
     """
+    text, bank_card = sample
+    
     # Skip if bank card is 18 digits (would match ID card pattern first)
     # or 19 digits (first 18 would match ID card)
     assume(len(bank_card) not in [18, 19])
-    assume(bank_card not in text_before)
-    assume(bank_card not in text_after)
-    
-    text = f"{text_before}{bank_card}{text_after}"
-    recognition_engine = RecognitionEngine()
     
-    items = recognition_engine.identify_sensitive_data(text, use_nlp=False)
+    items = identify_regex(text)
     
     # Find bank card items
     bank_card_items = [item for item in items if item.type == 'bank_card']
@@ -204,11 +219,11 @@ def test_bank_card_recognition(bank_card, text_before, text_after):
 
 
 @given(
-    phone=st.from_regex(r'1[3-9]\d{9}', fullmatch=True),
-    id_card=st.from_regex(r'\d{17}[\dXx]', fullmatch=True),
+    phone=phone_numbers,
+    id_card=id_card_numbers,
 )
 @settings(max_examples=100)
-def test_multiple_sensitive_data_types(phone, id_card):
+def test_multiple_sensitive_data_types(identify_regex, phone, id_card):
     """
     Property 6: Regex-based Sensitive Data Recognition
     
@@ -218,9 +233,8 @@ def test_multiple_sensitive_data_types(phone, id_card):
     Validates: Requirements 3.2, 3.3, 3.4, 3.5
     """
     text = f"联系电话：{phone}，身份证号：{id_card}"
-    recognition_engine = RecognitionEngine()
     
-    items = recognition_engine.identify_sensitive_data(text, use_nlp=False)
+    items = identify_regex(text)
     
     # Should find both phone and ID card
     phone_items = [item for item in items if item.type == 'phone']
@@ -235,22 +249,32 @@ def test_multiple_sensitive_data_types(phone, id_card):
 
 
 
-# Feature: data-desensitization-platform, Property 7: NLP-based Name Recognition
 @given(
-    name=st.text(
-        alphabet=st.characters(
-            whitelist_categories=('Lo',),  # Letter, other (includes Chinese)
-            min_codepoint=0x4E00,  # CJK Unified Ideographs start
-            max_codepoint=0x9FFF   # CJK Unified Ideographs end
-        ),
-        min_size=2,
-        max_size=4
-    ),
-    text_before=st.text(alphabet=st.characters(blacklist_categories=('Cs',)), min_size=0, max_size=50),
-    text_after=st.text(alphabet=st.characters(blacklist_categories=('Cs',)), min_size=0, max_size=50)
+    text=st.text(
+        alphabet=st.characters(blacklist_categories=('Cs', 'Nd'), blacklist_characters='@'),
+        min_size=0,
+        max_size=200
+    )
 )
+@settings(max_examples=100)
+def test_text_without_candidates_has_no_regex_matches(identify_regex, text):
+    """
+    Property 6: Regex-based Sensitive Data Recognition
+    
+    For any text without digits or '@', regex recognition should find
+    no structured sensitive data.
+    
+    Validates: Requirements 3.2, 3.3, 3.4, 3.5
+    """
+    items = identify_regex(text)
+    
+    assert items == []
+
+
+# Feature: data-desensitization-platform, Property 7: NLP-based Name Recognition
+@given(name=chinese_names, text_before=any_text, text_after=any_text)
 @settings(max_examples=100, deadline=None)  # Disable deadline for NLP model loading
-def test_nlp_name_recognition(name, text_before, text_after):
+def test_nlp_name_recognition(recognition_engine, name, text_before, text_after):
     """
     Property 7: NLP-based Name Recognition
     
@@ -264,8 +288,6 @@ def test_nlp_name_recognition(name, text_before, text_after):
     assume(name not in text_after)
     
     text = f"{text_before}{name}{text_after}"
-    recognition_engine = RecognitionEngine()
-    
     try:
         items = recognition_engine.identify_sensitive_data(text, use_nlp=True)
         
@@ -290,23 +312,9 @@ def test_nlp_name_recognition(name, text_before, text_after):
 
 
 # Feature: data-desensitization-platform, Property 8: NLP-based Address Recognition
-@given(
-    address_parts=st.lists(
-        st.text(
-            alphabet=st.characters(
-                whitelist_categories=('Lo',),
-                min_codepoint=0x4E00,
-                max_codepoint=0x9FFF
-            ),
-            min_size=2,
-            max_size=10
-        ),
-        min_size=2,
-        max_size=4
-    )
-)
+@given(address_parts=chinese_address_parts)
 @settings(max_examples=100, deadline=None)  # Disable deadline for NLP model loading
-def test_nlp_address_recognition(address_parts):
+def test_nlp_address_recognition(recognition_engine, address_parts):
     """
     Property 8: NLP-based Address Recognition
     
@@ -319,8 +327,6 @@ def test_nlp_address_recognition(address_parts):
     address = "".join(address_parts)
     text = f"地址：{address}"
     
-    recognition_engine = RecognitionEngine()
-    
     try:
         items = recognition_engine.identify_sensitive_data(text, use_nlp=True)
         
@@ -347,11 +353,11 @@ def test_nlp_address_recognition(address_parts):
 
 # Feature: data-desensitization-platform, Property 9: Recognition Report Completeness
 @given(
-    phone=st.from_regex(r'1[3-9]\d{9}', fullmatch=True),
-    id_card=st.from_regex(r'\d{17}[\dXx]', fullmatch=True),
+    phone=phone_numbers,
+    id_card=id_card_numbers,
 )
 @settings(max_examples=100)
-def test_recognition_report_completeness(phone, id_card):
+def test_recognition_report_completeness(identify_regex, phone, id_card):
     """
     Property 9: Recognition Report Completeness
     
@@ -363,9 +369,8 @@ def test_recognition_report_completeness(phone, id_card):
     """
     # Create text with known sensitive data
     text = f"用户信息：电话 {phone}，身份证 {id_card}"
-    recognition_engine = RecognitionEngine()
     
-    items = recognition_engine.identify_sensitive_data(text, use_nlp=False)
+    items = identify_regex(text)
     
     # Verify all items have required fields
     for item in items:
@@ -391,3 +396,49 @@ def test_recognition_report_completeness(phone, id_card):
     # Should find at least the phone and ID card we inserted
     assert len(phone_items) >= 1, "Should find at least one phone number"
     assert len(id_card_items) >= 1, "Should find at least one ID card"
+
+
+# Digit runs holding more than one structured item: the scan splits them into
+# back-to-back matches, leaving no digit between two matches unreported
+@pytest.mark.parametrize("text, expected", [
+    (
+        '445216205142110219191391114316a610',
+        [('id_card', 0, 18), ('phone', 18, 29)]
+    ),
+    (
+        '1a0a11311756113429881192018830801422424a',
+        [('id_card', 4, 22), ('bank_card', 22, 39)]
+    ),
+    (
+        '71630511446109536535886132196147196a1513a7X 7',
+        [('id_card', 0, 18), ('bank_card', 18, 35)]
+    ),
+])
+def test_adjacent_digit_matches(identify_regex, text, expected):
+    """
+    Regression examples for splitting long digit runs into adjacent matches.
+    
+    Validates: Requirements 3.2, 3.3, 3.4, 3.5
+    """
+    items = identify_regex(text)
+    
+    assert [(item.type, item.start_pos, item.end_pos) for item in items] == expected
+    for item in items:
+        assert text[item.start_pos:item.end_pos] == item.value
+
+
+def test_email_with_overlong_local_part(identify_regex):
+    """
+    An email whose local part exceeds the pattern's 64-char cap is reported
+    whole, so no leading part of it is left unmasked.
+    
+    Validates: Requirements 3.2, 3.3, 3.4, 3.5
+    """
+    email = f"{'a1.b' * 25}@example.com"  # 100-char local part
+    text = f"联系邮箱：{email}，谢谢"
+    
+    items = identify_regex(text)
+    
+    assert [(item.type, item.value) for item in items] == [('email', email)]
+    assert text[items[0].start_pos:items[0].end_pos] == email
+